@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import pandas as pd
+
+# Tabelas de agregação (rollup) de T_LEITURA_SENSOR.
+# Cada granularidade: (tabela, tamanho do prefixo de DATA_HORA, complemento do início, duração do balde)
+GRANULARIDADES = {
+    "minuto": ("T_AGREGADO_MINUTO", 16, ":00", timedelta(minutes=1)),
+    "hora": ("T_AGREGADO_HORA", 13, ":00:00", timedelta(hours=1)),
+    "dia": ("T_AGREGADO_DIA", 10, " 00:00:00", timedelta(days=1)),
+}
+
+_SQL_CRIAR_AGREGADO = '''
+CREATE TABLE IF NOT EXISTS {tabela} (
+    ID_SENSOR INTEGER NOT NULL,
+    TIPO_MEDICAO TEXT NOT NULL,
+    INICIO TIMESTAMP NOT NULL,
+    QTD INTEGER,
+    SOMA DOUBLE,
+    MINIMO DOUBLE,
+    MAXIMO DOUBLE,
+    PRIMARY KEY (ID_SENSOR, TIPO_MEDICAO, INICIO)
+) WITHOUT ROWID
+'''
+
+# Marca d'água: maior ID_LEITURA já incorporado aos agregados
+_SQL_CRIAR_CONTROLE = '''
+CREATE TABLE IF NOT EXISTS T_AGREGADO_CONTROLE (
+    ID INTEGER PRIMARY KEY CHECK (ID = 1),
+    ULTIMO_ID_LEITURA INTEGER NOT NULL
+)
+'''
+
+# Comandos usados pela migração que cria as tabelas (ver banco_dados.MIGRACOES)
+COMANDOS_SCHEMA = tuple(
+    _SQL_CRIAR_AGREGADO.format(tabela=tabela) for tabela, _, _, _ in GRANULARIDADES.values()
+) + (
+    _SQL_CRIAR_CONTROLE,
+    "INSERT OR IGNORE INTO T_AGREGADO_CONTROLE (ID, ULTIMO_ID_LEITURA) VALUES (1, 0)",
+)
+
+_SQL_INCREMENTAR = '''
+    INSERT INTO {tabela} (ID_SENSOR, TIPO_MEDICAO, INICIO, QTD, SOMA, MINIMO, MAXIMO)
+    SELECT ID_SENSOR, TIPO_MEDICAO, substr(DATA_HORA, 1, {prefixo}) || '{complemento}',
+           COUNT(*), SUM(VALOR), MIN(VALOR), MAX(VALOR)
+    FROM T_LEITURA_SENSOR
+    WHERE ID_LEITURA > ? AND ID_LEITURA <= ?
+      AND VALOR IS NOT NULL AND ID_SENSOR IS NOT NULL AND TIPO_MEDICAO IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (ID_SENSOR, TIPO_MEDICAO, INICIO) DO UPDATE SET
+        QTD = QTD + excluded.QTD,
+        SOMA = SOMA + excluded.SOMA,
+        MINIMO = MIN(MINIMO, excluded.MINIMO),
+        MAXIMO = MAX(MAXIMO, excluded.MAXIMO)
+'''
+
+_SQL_APAGAR_BALDE = "DELETE FROM {tabela} WHERE ID_SENSOR = ? AND TIPO_MEDICAO = ? AND INICIO = ?"
+
+_SQL_RECALCULAR_BALDE = '''
+    INSERT INTO {tabela} (ID_SENSOR, TIPO_MEDICAO, INICIO, QTD, SOMA, MINIMO, MAXIMO)
+    SELECT ?, ?, ?, COUNT(*), SUM(VALOR), MIN(VALOR), MAX(VALOR)
+    FROM T_LEITURA_SENSOR
+    WHERE ID_SENSOR = ? AND TIPO_MEDICAO = ? AND substr(DATA_HORA, 1, {prefixo}) || '{complemento}' = ?
+      AND ID_LEITURA <= ? AND VALOR IS NOT NULL
+    HAVING COUNT(*) > 0
+'''
+
+_SQL_BUSCAR = '''
+    SELECT INICIO, SUM(QTD) AS QTD, SUM(SOMA) / SUM(QTD) AS MEDIA, MIN(MINIMO) AS MINIMO, MAX(MAXIMO) AS MAXIMO
+    FROM {tabela}
+    {filtros}
+    GROUP BY INICIO
+    ORDER BY INICIO
+'''
+
+SQL_MARCA_DAGUA = "SELECT ULTIMO_ID_LEITURA FROM T_AGREGADO_CONTROLE WHERE ID = 1"
+SQL_SALVAR_MARCA_DAGUA = "UPDATE T_AGREGADO_CONTROLE SET ULTIMO_ID_LEITURA = ? WHERE ID = 1"
+SQL_DADOS_LEITURA = "SELECT ID_SENSOR, TIPO_MEDICAO, DATA_HORA FROM T_LEITURA_SENSOR WHERE ID_LEITURA = ?"
+
+# Fim do período já arquivado pela retenção (as leituras brutas antes disso saíram do banco)
+SQL_ARQUIVADO_ATE = "SELECT ARQUIVADO_ATE FROM T_AGREGADO_CONTROLE WHERE ID = 1"
+SQL_MARCAR_ARQUIVADO = """
+    UPDATE T_AGREGADO_CONTROLE SET ARQUIVADO_ATE = MAX(COALESCE(ARQUIVADO_ATE, ''), ?) WHERE ID = 1
+"""
+
+
+def inicio_balde(data_hora, granularidade):
+    _, prefixo, complemento, _ = GRANULARIDADES[granularidade]
+    return str(data_hora)[:prefixo] + complemento
+
+
+def atualizar(conn):
+    # Incorpora só as leituras acima da marca d'água. BEGIN IMMEDIATE serializa
+    # atualizações concorrentes, então nenhuma leitura é somada duas vezes.
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        ultimo = conn.execute(SQL_MARCA_DAGUA).fetchone()[0]
+        maximo = conn.execute("SELECT MAX(ID_LEITURA) FROM T_LEITURA_SENSOR").fetchone()[0]
+        if maximo is None or maximo <= ultimo:
+            return 0
+        for tabela, prefixo, complemento, _ in GRANULARIDADES.values():
+            sql = _SQL_INCREMENTAR.format(tabela=tabela, prefixo=prefixo, complemento=complemento)
+            conn.execute(sql, (ultimo, maximo))
+        conn.execute(SQL_SALVAR_MARCA_DAGUA, (maximo,))
+    return maximo - ultimo
+
+
+def ler_leitura(conn, id_leitura):
+    # Chave dos baldes afetados, lida antes de alterar/apagar a leitura
+    return conn.execute(SQL_DADOS_LEITURA, (id_leitura,)).fetchone()
+
+
+def corrigir(conn, id_leitura, id_sensor, tipo_medicao, data_hora):
+    # Chamado dentro da transação de "Atualizar Valor"/"Deletar Leitura".
+    # MIN/MAX não se desfazem por subtração, então os baldes da leitura são
+    # recalculados a partir das leituras brutas já incorporadas. O balde é
+    # selecionado pela mesma chave substr(DATA_HORA) da inserção, não por uma faixa
+    # de horário: uma DATA_HORA fora do formato padrão cai no mesmo balde de antes.
+    # Baldes que começam antes do fim do período arquivado perderam parte das
+    # leituras brutas: recalcular apagaria o que foi arquivado, então ficam como estão.
+    ultimo = conn.execute(SQL_MARCA_DAGUA).fetchone()[0]
+    if id_leitura > ultimo or None in (id_sensor, tipo_medicao, data_hora):
+        return  # ainda não agregada: a próxima atualização já pega o valor novo
+    arquivado_ate = conn.execute(SQL_ARQUIVADO_ATE).fetchone()[0]
+    for granularidade, (tabela, prefixo, complemento, _) in GRANULARIDADES.items():
+        inicio = inicio_balde(data_hora, granularidade)
+        if arquivado_ate is not None and inicio < arquivado_ate:
+            continue
+        conn.execute(_SQL_APAGAR_BALDE.format(tabela=tabela), (id_sensor, tipo_medicao, inicio))
+        conn.execute(
+            _SQL_RECALCULAR_BALDE.format(tabela=tabela, prefixo=prefixo, complemento=complemento),
+            (id_sensor, tipo_medicao, inicio, id_sensor, tipo_medicao, inicio, ultimo),
+        )
+
+
+def marcar_arquivado(conn, fim):
+    # Chamado pela retenção antes de apagar as leituras de um período
+    return conn.execute(SQL_MARCAR_ARQUIVADO, (str(fim),)).rowcount
+
+
+def buscar(conn, granularidade, id_sensor=None, tipo_medicao=None, data_inicio=None, data_fim=None):
+    # Série agregada por balde; sem sensor escolhido, combina todos os sensores
+    tabela = GRANULARIDADES[granularidade][0]
+    filtros, parametros = [], []
+    if id_sensor is not None:
+        filtros.append("ID_SENSOR = ?")
+        parametros.append(id_sensor)
+    if tipo_medicao is not None:
+        filtros.append("TIPO_MEDICAO = ?")
+        parametros.append(tipo_medicao)
+    if data_inicio is not None:
+        filtros.append("INICIO >= ?")
+        parametros.append(str(data_inicio))
+    if data_fim is not None:
+        filtros.append("INICIO < ?")
+        parametros.append(str(data_fim))
+
+    where = "WHERE " + " AND ".join(filtros) if filtros else ""
+    return pd.read_sql(_SQL_BUSCAR.format(tabela=tabela, filtros=where), conn, params=parametros)
@@ -0,0 +1,552 @@
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from functools import lru_cache
+
+import pandas as pd
+
+import agregados
+import metricas
+
+# Arquivo do banco usado pela Fase 2 (pode ser trocado antes do primeiro acesso)
+DB_PATH = "sensores.db"
+
+# Quantidade de comandos preparados mantidos em cache por conexão
+CACHE_COMANDOS = 256
+
+# Ajustes aplicados em toda conexão nova
+PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",  # só vale em bancos novos (ver retencao.converter_vacuum)
+    "PRAGMA journal_mode=WAL",        # leitores não bloqueiam o escritor
+    "PRAGMA synchronous=NORMAL",      # seguro com WAL e bem mais rápido que FULL
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",       # ~16 MB de cache de páginas
+    "PRAGMA mmap_size=268435456",     # 256 MB de leitura via mmap
+    "PRAGMA busy_timeout=5000",       # espera o lock em vez de falhar na hora
+)
+
+# Escritor único: operações por commit em grupo, espera máxima (s) por mais
+# operações depois da primeira e tamanho da fila antes de quem envia esperar
+TAMANHO_LOTE_ESCRITA = 256
+INTERVALO_ESCRITA = 0.005
+CAPACIDADE_FILA_ESCRITA = 10_000
+
+# --- SQL (textos fixos para reaproveitar o cache de comandos do sqlite3) ---
+SQL_CRIAR_SENSOR = '''
+CREATE TABLE IF NOT EXISTS T_SENSOR (
+    ID_SENSOR INTEGER PRIMARY KEY AUTOINCREMENT,
+    TIPO TEXT NOT NULL,
+    STATUS TEXT,
+    DATA_INSTALACAO TIMESTAMP,
+    ID_PLANTACAO INTEGER
+)
+'''
+
+SQL_CRIAR_LEITURA = '''
+CREATE TABLE IF NOT EXISTS T_LEITURA_SENSOR (
+    ID_LEITURA INTEGER PRIMARY KEY AUTOINCREMENT,
+    DATA_HORA TIMESTAMP,
+    VALOR DOUBLE,
+    TIPO_MEDICAO TEXT,
+    ID_SENSOR INTEGER,
+    FOREIGN KEY(ID_SENSOR) REFERENCES T_SENSOR(ID_SENSOR)
+)
+'''
+
+SQL_INSERIR_SENSOR = '''
+    INSERT INTO T_SENSOR (TIPO, STATUS, DATA_INSTALACAO, ID_PLANTACAO)
+    VALUES (?, ?, ?, ?)
+'''
+
+SQL_INSERIR_LEITURA = '''
+    INSERT INTO T_LEITURA_SENSOR (DATA_HORA, VALOR, TIPO_MEDICAO, ID_SENSOR)
+    VALUES (?, ?, ?, ?)
+'''
+
+SQL_ATUALIZAR_LEITURA = "UPDATE T_LEITURA_SENSOR SET VALOR = ? WHERE ID_LEITURA = ?"
+
+SQL_DELETAR_LEITURA = "DELETE FROM T_LEITURA_SENSOR WHERE ID_LEITURA = ?"
+
+SQL_LISTAR_SENSORES = "SELECT * FROM T_SENSOR"
+
+SQL_IDS_SENSORES = "SELECT ID_SENSOR FROM T_SENSOR"
+
+SQL_BUSCAR_LEITURAS = """
+    SELECT L.ID_LEITURA, L.DATA_HORA, L.VALOR, L.TIPO_MEDICAO, L.ID_SENSOR, S.TIPO as MODELO_SENSOR
+    FROM T_LEITURA_SENSOR L
+    LEFT JOIN T_SENSOR S ON L.ID_SENSOR = S.ID_SENSOR
+    {filtros}
+    ORDER BY L.ID_LEITURA DESC
+    LIMIT ?
+"""
+
+SQL_ULTIMAS_LEITURAS = """
+    SELECT S.ID_SENSOR, S.ID_PLANTACAO, S.STATUS, L.ID_LEITURA, L.DATA_HORA, L.VALOR
+    FROM T_SENSOR S
+    JOIN T_LEITURA_SENSOR L ON L.ID_LEITURA = (
+        SELECT MAX(ID_LEITURA) FROM T_LEITURA_SENSOR
+        WHERE ID_SENSOR = S.ID_SENSOR AND TIPO_MEDICAO = ?
+    )
+    {filtro_status}
+"""
+
+SQL_LEITURAS_NOVAS = """
+    SELECT ID_LEITURA, ID_SENSOR, TIPO_MEDICAO, DATA_HORA, VALOR
+    FROM T_LEITURA_SENSOR
+    WHERE ID_LEITURA > ?
+    ORDER BY ID_LEITURA
+    LIMIT ?
+"""
+
+SQL_EXPORTAR_LEITURAS = """
+    SELECT L.ID_LEITURA, L.DATA_HORA, L.VALOR, L.TIPO_MEDICAO, L.ID_SENSOR
+    FROM T_LEITURA_SENSOR L
+    WHERE {filtros}
+    ORDER BY L.ID_LEITURA
+    LIMIT ?
+"""
+
+# Colunas de SQL_EXPORTAR_LEITURAS
+COLUNAS_LEITURA = ["ID_LEITURA", "DATA_HORA", "VALOR", "TIPO_MEDICAO", "ID_SENSOR"]
+
+# Leituras por bloco em iterar_leituras (memória constante em exportações grandes)
+TAMANHO_BLOCO_LEITURAS = 50_000
+
+# Registros por página no painel "Registros Atuais"
+TAMANHO_PAGINA = 50
+
+# Migrações incrementais do schema, controladas por PRAGMA user_version.
+# Cada item é uma versão; nunca altere uma já publicada, só acrescente novas.
+MIGRACOES = (
+    # 1: índices secundários para os filtros e a paginação das leituras
+    # (o índice já carrega o ID_LEITURA, então a ordenação por ele sai de graça)
+    (
+        "CREATE INDEX IF NOT EXISTS IDX_LEITURA_SENSOR ON T_LEITURA_SENSOR (ID_SENSOR)",
+        "CREATE INDEX IF NOT EXISTS IDX_LEITURA_DATA_HORA ON T_LEITURA_SENSOR (DATA_HORA)",
+        "CREATE INDEX IF NOT EXISTS IDX_LEITURA_TIPO ON T_LEITURA_SENSOR (TIPO_MEDICAO)",
+    ),
+    # 2: agregados por minuto/hora/dia e a marca d'água do ID_LEITURA
+    agregados.COMANDOS_SCHEMA,
+    # 3: última leitura de cada sensor por tipo vira uma busca direta no índice
+    (
+        "CREATE INDEX IF NOT EXISTS IDX_LEITURA_SENSOR_TIPO ON T_LEITURA_SENSOR (ID_SENSOR, TIPO_MEDICAO)",
+    ),
+    # 4: registro de culturas da Fase 1 (antes só existia na sessão do navegador)
+    (
+        '''
+        CREATE TABLE IF NOT EXISTS T_CULTURA (
+            ID_CULTURA INTEGER PRIMARY KEY AUTOINCREMENT,
+            CULTURA TEXT NOT NULL,
+            AREA_M2 DOUBLE NOT NULL,
+            INSUMO TEXT NOT NULL,
+            APLICACAO_L DOUBLE NOT NULL,
+            DATA_CADASTRO TIMESTAMP
+        )
+        ''',
+    ),
+    # 5: fim do período arquivado pela retenção (baldes antes dele não são recalculados)
+    (
+        "ALTER TABLE T_AGREGADO_CONTROLE ADD COLUMN ARQUIVADO_ATE TIMESTAMP",
+    ),
+)
+
+# --- MEDIÇÃO DOS COMANDOS SQL ---
+# Com as métricas desligadas, o custo é um teste antes de chamar o sqlite3
+_TABELA = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE|ON)\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=CACHE_COMANDOS)
+def _rotulos_sql(sql):
+    # Comando e tabela principal: poucas séries, mesmo com filtros montados na hora
+    partes = sql.split(None, 1)
+    tabela = _TABELA.search(sql)
+    return {"comando": partes[0].upper() if partes else "", "tabela": tabela.group(1) if tabela else ""}
+
+
+class _CursorMedido(sqlite3.Cursor):
+    # pd.read_sql executa pelo cursor, não pela conexão
+    def execute(self, sql, parametros=()):
+        if not metricas.ativo():
+            return super().execute(sql, parametros)
+        with metricas.medir("sql", **_rotulos_sql(sql)):
+            return super().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        if not metricas.ativo():
+            return super().executemany(sql, parametros)
+        with metricas.medir("sql", **_rotulos_sql(sql)):
+            return super().executemany(sql, parametros)
+
+
+class _ConexaoMedida(sqlite3.Connection):
+    def cursor(self, factory=_CursorMedido):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        if not metricas.ativo():
+            return super().execute(sql, parametros)
+        with metricas.medir("sql", **_rotulos_sql(sql)):
+            return super().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        if not metricas.ativo():
+            return super().executemany(sql, parametros)
+        with metricas.medir("sql", **_rotulos_sql(sql)):
+            return super().executemany(sql, parametros)
+
+
+# --- CONEXÕES ---
+# Uma conexão por thread (o Streamlit roda cada sessão numa thread própria)
+_local = threading.local()
+
+# Caminhos cujo schema já foi criado neste processo
+_schemas_prontos = set()
+_schema_lock = threading.RLock()
+
+
+def _abrir_conexao(caminho):
+    conn = sqlite3.connect(caminho, check_same_thread=False, cached_statements=CACHE_COMANDOS,
+                           factory=_ConexaoMedida)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_db_connection():
+    # Reaproveita a conexão da thread atual; abre uma nova só na primeira vez
+    conexoes = getattr(_local, "conexoes", None)
+    if conexoes is None:
+        conexoes = _local.conexoes = {}
+
+    conn = conexoes.get(DB_PATH)
+    if conn is None:
+        conn = conexoes[DB_PATH] = _abrir_conexao(DB_PATH)
+    init_db(conn)
+    return conn
+
+
+def fechar_conexao():
+    # Fecha a conexão da thread atual (útil em scripts e threads de trabalho)
+    conexoes = getattr(_local, "conexoes", {})
+    conn = conexoes.pop(DB_PATH, None)
+    if conn is not None:
+        conn.close()
+
+
+def init_db(conn=None):
+    # O schema só é criado uma vez por processo para cada arquivo
+    if DB_PATH in _schemas_prontos:
+        return
+    with _schema_lock:
+        if DB_PATH in _schemas_prontos:
+            return
+        conn = conn or get_db_connection()
+        with conn:
+            conn.execute(SQL_CRIAR_SENSOR)
+            conn.execute(SQL_CRIAR_LEITURA)
+        migrar(conn)
+        _schemas_prontos.add(DB_PATH)
+
+
+def migrar(conn):
+    # Aplica, em ordem, só as migrações que o arquivo ainda não recebeu
+    versao = conn.execute("PRAGMA user_version").fetchone()[0]
+    for numero, comandos in enumerate(MIGRACOES[versao:], start=versao + 1):
+        with conn:
+            conn.execute("BEGIN")
+            for comando in comandos:
+                conn.execute(comando)
+            conn.execute(f"PRAGMA user_version = {numero}")
+
+
+# --- ESCRITOR ÚNICO ---
+# Toda escrita das sessões passa por uma fila e é feita por uma thread dona da única
+# conexão de escrita. As operações que chegam juntas viram uma transação só (commit
+# em grupo); cada uma roda num SAVEPOINT, então o erro de uma não desfaz as outras.
+# Quem envia recebe um Future, resolvido só depois do commit.
+class EscritorBanco:
+    def __init__(self, tamanho_lote=TAMANHO_LOTE_ESCRITA, intervalo=INTERVALO_ESCRITA,
+                 capacidade=CAPACIDADE_FILA_ESCRITA):
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.fila = queue.Queue(capacidade)
+        self.latencias = deque(maxlen=10_000)  # ms por commit
+        self.estatisticas = {"operacoes": 0, "commits": 0, "erros": 0, "maior_lote": 0}
+        self._thread = threading.Thread(target=self._executar, name="escritor-sqlite", daemon=True)
+        self._thread.start()
+
+    def vivo(self):
+        return self._thread.is_alive()
+
+    def enviar(self, operacao, *args, isolada=False):
+        # operacao(conn, *args) roda na thread do escritor; isolada=True roda fora do
+        # grupo, sem transação aberta (para quem controla a própria, como os agregados)
+        futuro = Future()
+        self.fila.put((operacao, args, isolada, futuro, time.perf_counter()))
+        return futuro
+
+    def _proximo_lote(self):
+        lote = [self.fila.get()]
+        limite = time.monotonic() + self.intervalo
+        while len(lote) < self.tamanho_lote and not lote[-1][2]:
+            restante = limite - time.monotonic()
+            try:
+                lote.append(self.fila.get(timeout=restante) if restante > 0 else self.fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _executar(self):
+        while True:
+            lote = [item for item in self._proximo_lote() if item[3].set_running_or_notify_cancel()]
+            if not lote:
+                continue
+            conn = get_db_connection()
+            if lote[-1][2]:
+                grupo, isolada = lote[:-1], lote[-1]
+            else:
+                grupo, isolada = lote, None
+            if grupo:
+                self._gravar_grupo(conn, grupo)
+            if isolada is not None:
+                self._gravar_isolada(conn, isolada)
+
+    def _gravar_grupo(self, conn, grupo):
+        inicio = time.perf_counter()
+        resultados = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operacao, args, _, futuro, enviado in grupo:
+                conn.execute("SAVEPOINT operacao")
+                try:
+                    resultados.append((futuro, enviado, operacao(conn, *args), None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO operacao")
+                    resultados.append((futuro, enviado, None, e))
+                conn.execute("RELEASE operacao")
+            conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            self.estatisticas["erros"] += len(grupo)
+            for _, _, _, futuro, _ in grupo:
+                futuro.set_exception(e)
+            return
+
+        segundos = time.perf_counter() - inicio
+        self.latencias.append(segundos * 1000)
+        self.estatisticas["commits"] += 1
+        self.estatisticas["operacoes"] += len(grupo)
+        self.estatisticas["maior_lote"] = max(self.estatisticas["maior_lote"], len(grupo))
+        metricas.observar("escrita_commit", segundos, lote=metricas.faixa_lote(len(grupo)))
+        for futuro, enviado, resultado, erro in resultados:
+            metricas.observar("escrita_espera", time.perf_counter() - enviado)
+            if erro is None:
+                futuro.set_result(resultado)
+            else:
+                self.estatisticas["erros"] += 1
+                futuro.set_exception(erro)
+
+    def _gravar_isolada(self, conn, item):
+        operacao, args, _, futuro, enviado = item
+        try:
+            resultado = operacao(conn, *args)
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            self.estatisticas["erros"] += 1
+            futuro.set_exception(e)
+            return
+        self.estatisticas["operacoes"] += 1
+        metricas.observar("escrita_espera", time.perf_counter() - enviado)
+        futuro.set_result(resultado)
+
+    def resumo(self):
+        resumo = dict(self.estatisticas, fila=self.fila.qsize())
+        if self.latencias:
+            latencias = sorted(self.latencias)
+            resumo["commit_p50_ms"] = latencias[len(latencias) // 2]
+            resumo["commit_p99_ms"] = latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))]
+        return resumo
+
+
+_escritor = None
+_escritor_lock = threading.Lock()
+
+
+def obter_escritor():
+    # Um escritor por processo, criado no primeiro uso (e de novo se a thread morrer)
+    global _escritor
+    with _escritor_lock:
+        if _escritor is None or not _escritor.vivo():
+            _escritor = EscritorBanco()
+        return _escritor
+
+
+def estatisticas_escrita():
+    # Profundidade da fila e latência dos commits (None se nada foi escrito ainda)
+    return _escritor.resumo() if _escritor is not None else None
+
+
+# Operações executadas pelo escritor (recebem a conexão dele, já dentro da transação)
+def _inserir(conn, sql, parametros):
+    return conn.execute(sql, parametros).lastrowid
+
+
+def _inserir_lote(conn, sql, linhas):
+    return conn.executemany(sql, linhas).rowcount
+
+
+def _alterar_leitura(conn, sql, parametros, id_leitura):
+    # Leitura e agregados mudam na mesma transação
+    antiga = agregados.ler_leitura(conn, id_leitura)
+    cursor = conn.execute(sql, parametros)
+    if antiga is not None:
+        agregados.corrigir(conn, id_leitura, *antiga)
+    return cursor.rowcount
+
+
+def _executar(conn, sql, parametros):
+    return conn.execute(sql, parametros).rowcount
+
+
+def executar_escrita(sql, parametros=()):
+    # Future com o rowcount de um comando qualquer (manutenção, lotes de DELETE...)
+    return obter_escritor().enviar(_executar, sql, parametros)
+
+
+def inserir_em_lote(sql, linhas):
+    # Future com a quantidade de linhas gravadas (executemany dentro do grupo do escritor)
+    return obter_escritor().enviar(_inserir_lote, sql, list(linhas))
+
+
+# --- T_SENSOR ---
+def inserir_sensor(tipo, status, id_plantacao, data_instalacao=None):
+    # Future com o ID_SENSOR criado
+    parametros = (tipo, status, data_instalacao or datetime.now(), id_plantacao)
+    return obter_escritor().enviar(_inserir, SQL_INSERIR_SENSOR, parametros)
+
+
+def listar_sensores():
+    return pd.read_sql(SQL_LISTAR_SENSORES, get_db_connection())
+
+
+def listar_ids_sensores():
+    return [linha[0] for linha in get_db_connection().execute(SQL_IDS_SENSORES)]
+
+
+# --- T_LEITURA_SENSOR ---
+def inserir_leitura(id_sensor, tipo_medicao, valor, data_hora=None):
+    # Future com o ID_LEITURA criado
+    parametros = (data_hora or datetime.now(), valor, tipo_medicao, id_sensor)
+    return obter_escritor().enviar(_inserir, SQL_INSERIR_LEITURA, parametros)
+
+
+# Leituras existentes alteradas/apagadas neste processo. O MAX(ID_LEITURA) não
+# muda com elas, então os caches derivados das leituras (risco) olham também isto.
+_alteracoes = 0
+
+
+def _contar_alteracao(futuro):
+    # Callback do Future: roda depois do commit, então quem lê a versão nova já vê o dado novo
+    global _alteracoes
+    _alteracoes += 1
+
+
+def versao_alteracoes():
+    return _alteracoes
+
+
+def _alterar(sql, parametros, id_leitura):
+    futuro = obter_escritor().enviar(_alterar_leitura, sql, parametros, id_leitura)
+    futuro.add_done_callback(_contar_alteracao)
+    return futuro
+
+
+def atualizar_leitura(id_leitura, novo_valor):
+    # Future com a quantidade de linhas alteradas (0 se o ID não existe)
+    return _alterar(SQL_ATUALIZAR_LEITURA, (novo_valor, id_leitura), id_leitura)
+
+
+def deletar_leitura(id_leitura):
+    return _alterar(SQL_DELETAR_LEITURA, (id_leitura,), id_leitura)
+
+
+def _filtros_leituras(id_sensor=None, tipo_medicao=None, data_inicio=None, data_fim=None):
+    # Condições do WHERE e parâmetros (data_inicio é inclusivo e data_fim exclusivo)
+    filtros, parametros = [], []
+    if id_sensor is not None:
+        filtros.append("L.ID_SENSOR = ?")
+        parametros.append(id_sensor)
+    if tipo_medicao is not None:
+        filtros.append("L.TIPO_MEDICAO = ?")
+        parametros.append(tipo_medicao)
+    if data_inicio is not None:
+        filtros.append("L.DATA_HORA >= ?")
+        parametros.append(str(data_inicio))
+    if data_fim is not None:
+        filtros.append("L.DATA_HORA < ?")
+        parametros.append(str(data_fim))
+    return filtros, parametros
+
+
+def buscar_leituras(limite=TAMANHO_PAGINA, antes_de=None, id_sensor=None, tipo_medicao=None,
+                    data_inicio=None, data_fim=None):
+    # Paginação por chave (keyset): a próxima página começa abaixo do menor
+    # ID_LEITURA da anterior, sem OFFSET e sem carregar a tabela inteira.
+    filtros, parametros = _filtros_leituras(id_sensor, tipo_medicao, data_inicio, data_fim)
+    if antes_de is not None:
+        filtros.insert(0, "L.ID_LEITURA < ?")
+        parametros.insert(0, antes_de)
+
+    where = "WHERE " + " AND ".join(filtros) if filtros else ""
+    query = SQL_BUSCAR_LEITURAS.format(filtros=where)
+    return pd.read_sql(query, get_db_connection(), params=parametros + [limite])
+
+
+def iterar_leituras(id_sensor=None, tipo_medicao=None, data_inicio=None, data_fim=None,
+                    tamanho_bloco=TAMANHO_BLOCO_LEITURAS):
+    # Todas as leituras do filtro em blocos (DataFrames), em ordem de ID_LEITURA.
+    # Cada bloco é uma consulta curta a partir do último ID: nenhuma transação de
+    # leitura fica aberta durante a exportação inteira.
+    filtros, parametros = _filtros_leituras(id_sensor, tipo_medicao, data_inicio, data_fim)
+    query = SQL_EXPORTAR_LEITURAS.format(filtros=" AND ".join(["L.ID_LEITURA > ?"] + filtros))
+    conn = get_db_connection()
+    ultimo = 0
+    while True:
+        linhas = conn.execute(query, [ultimo] + parametros + [tamanho_bloco]).fetchall()
+        if not linhas:
+            return
+        yield pd.DataFrame.from_records(linhas, columns=COLUNAS_LEITURA)
+        if len(linhas) < tamanho_bloco:
+            return
+        ultimo = linhas[-1][0]
+
+
+def ultimas_leituras(tipo_medicao, apenas_ativos=True):
+    # Leitura mais recente de cada sensor para um tipo de medição (uma linha por sensor)
+    filtro_status = "WHERE S.STATUS = 'Ativo'" if apenas_ativos else ""
+    query = SQL_ULTIMAS_LEITURAS.format(filtro_status=filtro_status)
+    return pd.read_sql(query, get_db_connection(), params=(tipo_medicao,))
+
+
+def leituras_novas(depois_de, limite=TAMANHO_PAGINA):
+    # Leituras com ID_LEITURA acima de `depois_de`, em ordem (busca pela chave primária)
+    return get_db_connection().execute(SQL_LEITURAS_NOVAS, (depois_de, limite)).fetchall()
+
+
+# --- AGREGADOS (minuto / hora / dia) ---
+def atualizar_agregados():
+    # Incremental: processa só as leituras novas desde a última chamada.
+    # Roda no escritor (transação própria), sem disputar o lock com as sessões.
+    return obter_escritor().enviar(agregados.atualizar, isolada=True).result()
+
+
+def buscar_agregados(granularidade, id_sensor=None, tipo_medicao=None, data_inicio=None, data_fim=None):
+    atualizar_agregados()
+    return agregados.buscar(get_db_connection(), granularidade, id_sensor, tipo_medicao, data_inicio, data_fim)
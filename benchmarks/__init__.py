@@ -0,0 +1,127 @@
+import importlib
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Grupos de benchmarks (nome -> módulo com uma função medir(pasta, **opcoes))
+BENCHMARKS = {
+    "banco": "benchmarks.banco",
+    "modelos": "benchmarks.ml",
+    "compilados": "benchmarks.compilados",
+    "alertas": "benchmarks.alertas",
+    "paginas": "benchmarks.render",
+}
+
+# Pasta padrão dos resultados (um JSON por commit)
+PASTA_RESULTADOS = "resultados_benchmark"
+
+# Variação (fração) a partir da qual a comparação aponta uma regressão
+LIMIAR_REGRESSAO = 0.2
+
+
+def cronometrar(funcao, repeticoes=5, aquecimento=1):
+    # Roda a função algumas vezes e resume os tempos em ms
+    for _ in range(aquecimento):
+        funcao()
+    tempos = np.empty(repeticoes)
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos[i] = (time.perf_counter() - inicio) * 1000
+    return {
+        "repeticoes": repeticoes,
+        "media_ms": float(tempos.mean()),
+        "p50_ms": float(np.percentile(tempos, 50)),
+        "p95_ms": float(np.percentile(tempos, 95)),
+        "min_ms": float(tempos.min()),
+    }
+
+
+def _commit():
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return saida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _versoes():
+    versoes = {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version}
+    for pacote in ("numpy", "pandas", "sklearn", "streamlit"):
+        try:
+            versoes[pacote] = importlib.import_module(pacote).__version__
+        except ImportError:
+            versoes[pacote] = None
+    return versoes
+
+
+def executar(nomes, pasta, opcoes=None):
+    # Roda os grupos pedidos, em ordem; a falha de um grupo não derruba os outros
+    opcoes = opcoes or {}
+    resultados = {}
+    for nome in nomes:
+        inicio = time.perf_counter()
+        try:
+            modulo = importlib.import_module(BENCHMARKS[nome])
+            resultados[nome] = modulo.medir(pasta, **opcoes.get(nome, {}))
+        except Exception as e:
+            resultados[nome] = {"erro": f"{type(e).__name__}: {e}"}
+        print(f"[{nome}] {time.perf_counter() - inicio:.1f} s")
+
+    return {
+        "commit": _commit(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "maquina": {"plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "versoes": _versoes(),
+        "resultados": resultados,
+    }
+
+
+def salvar(relatorio, caminho=None):
+    if caminho is None:
+        nome = relatorio["commit"] or datetime.now().strftime("%Y%m%d-%H%M%S")
+        caminho = os.path.join(PASTA_RESULTADOS, f"{nome}.json")
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    return caminho
+
+
+def _achatar(dados, prefixo=""):
+    # {"banco": {"10000": {"p50_ms": 1}}} -> {"banco.10000.p50_ms": 1}
+    planos = {}
+    for chave, valor in dados.items():
+        caminho = f"{prefixo}.{chave}" if prefixo else str(chave)
+        if isinstance(valor, dict):
+            planos.update(_achatar(valor, caminho))
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            planos[caminho] = valor
+    return planos
+
+
+def comparar(anterior, atual, limiar=LIMIAR_REGRESSAO):
+    # Compara dois relatórios métrica a métrica. Tempos (_ms, _s) pioram quando
+    # sobem; taxas (_por_segundo) pioram quando caem. Das medições repetidas só
+    # a mediana entra (média, mínimo e p95 oscilam demais entre execuções).
+    # Retorna (métrica, antes, depois, variação, regressão).
+    antes = _achatar(anterior["resultados"])
+    depois = _achatar(atual["resultados"])
+    linhas = []
+    for metrica in sorted(antes.keys() & depois.keys()):
+        a, d = antes[metrica], depois[metrica]
+        if metrica.endswith((".media_ms", ".min_ms", ".p95_ms")):
+            continue
+        if metrica.endswith(("_ms", "_s")):
+            variacao = (d - a) / a if a else 0.0
+        elif metrica.endswith("_por_segundo"):
+            variacao = (a - d) / a if a else 0.0
+        else:
+            continue
+        linhas.append((metrica, a, d, variacao, variacao > limiar))
+    return linhas
@@ -0,0 +1,41 @@
+import argparse
+import json
+import tempfile
+import warnings
+
+from benchmarks import BENCHMARKS, LIMIAR_REGRESSAO, comparar, executar, salvar
+from benchmarks.banco import TAMANHOS
+
+# Roda os benchmarks offline (SNS local, bancos temporários) e salva o JSON:
+#   python -m benchmarks
+#   python -m benchmarks --somente banco --tamanhos 10000 --comparar resultados_benchmark/abc1234.json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de banco, modelos, alertas e páginas.")
+    parser.add_argument("--somente", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=list(TAMANHOS),
+                        help="linhas de T_LEITURA_SENSOR em cada rodada do benchmark de banco")
+    parser.add_argument("--saida", help="arquivo JSON (padrão: resultados_benchmark/<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para apontar regressões")
+    parser.add_argument("--limiar", type=float, default=LIMIAR_REGRESSAO)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as pasta:
+        relatorio = executar(args.somente, pasta, {"banco": {"tamanhos": args.tamanhos}})
+    print(f"Resultados salvos em {salvar(relatorio, args.saida)}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+        regressoes = 0
+        for metrica, antes, depois, variacao, regressao in comparar(anterior, relatorio, args.limiar):
+            regressoes += regressao
+            marca = "REGRESSÃO" if regressao else ""
+            print(f"{metrica:<70}{antes:>14.3f}{depois:>14.3f}{variacao:>+9.1%}  {marca}")
+        print(f"{regressoes} regressões acima de {args.limiar:.0%} em relação a {anterior.get('commit')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import wait
+
+import numpy as np
+
+import sns_alerta
+
+# Alertas enviados em cada medição
+MENSAGENS = 2_000
+
+# Latência simulada de uma chamada ao SNS (s); 0 mede só o custo do despachante
+LATENCIAS_SNS = (0.0, 0.02)
+
+
+def _medir_sincrono(mensagens):
+    # enviar_alerta_aws: quem chama espera o MessageId de cada alerta
+    tempos = np.empty(mensagens)
+    inicio = time.perf_counter()
+    for i in range(mensagens):
+        t = time.perf_counter()
+        ok, _ = sns_alerta.enviar_alerta_aws(f"benchmark síncrono {time.time_ns()} #{i}")
+        tempos[i] = (time.perf_counter() - t) * 1000
+        if not ok:
+            raise RuntimeError("falha no envio para o SNS local")
+    decorrido = time.perf_counter() - inicio
+    return {
+        "mensagens": mensagens,
+        "segundos": decorrido,
+        "alertas_por_segundo": mensagens / decorrido,
+        "p50_ms": float(np.percentile(tempos, 50)),
+        "p99_ms": float(np.percentile(tempos, 99)),
+    }
+
+
+def _medir_rajada(despachante, mensagens):
+    # enviar_alerta: todos os Futures de uma vez; o despachante agrupa em PublishBatch
+    inicio = time.perf_counter()
+    futures = [despachante.enviar(f"benchmark rajada {time.time_ns()} #{i}") for i in range(mensagens)]
+    enfileirado = time.perf_counter() - inicio
+    wait(futures)
+    decorrido = time.perf_counter() - inicio
+    return {
+        "mensagens": mensagens,
+        "enfileirar_ms": enfileirado * 1000,
+        "segundos": decorrido,
+        "alertas_por_segundo": mensagens / decorrido,
+    }
+
+
+def medir(pasta, mensagens=MENSAGENS, latencias=LATENCIAS_SNS):
+    resultados = {}
+    anterior = sns_alerta._despachante
+    try:
+        for latencia in latencias:
+            cliente = sns_alerta.SNSLocal(latencia=latencia)
+            despachante = sns_alerta.DespachanteAlertas(
+                criar_cliente=lambda: (cliente, "arn:aws:sns:local:000000000000:FarmTech-Alerts")
+            )
+            # enviar_alerta_aws usa o despachante do processo: aponta para o SNS local
+            sns_alerta._despachante = despachante
+            # Com latência, o envio síncrono é limitado por ela: bastam poucas mensagens
+            sincronas = mensagens if not latencia else min(mensagens, 100)
+            resultados[f"latencia_{int(latencia * 1000)}ms"] = {
+                "sincrono": _medir_sincrono(sincronas),
+                "rajada": _medir_rajada(despachante, mensagens),
+                "publicacoes": len(cliente.mensagens),
+            }
+    finally:
+        sns_alerta._despachante = anterior
+    return resultados
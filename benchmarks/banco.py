@@ -0,0 +1,109 @@
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+import banco_dados
+import ingestao
+from benchmarks import cronometrar
+
+# Linhas de T_LEITURA_SENSOR em cada rodada
+TAMANHOS = (10_000, 1_000_000, 10_000_000)
+
+# Sensores cadastrados em cada banco de teste
+SENSORES = 100
+
+TIPOS = np.array(["umidade", "temperatura", "fosforo", "potassio"])
+
+# Linhas geradas por vez (o gerador nunca tem o banco inteiro em memória)
+TAMANHO_BLOCO = 100_000
+
+
+def usar_banco(caminho):
+    # Troca o arquivo do banco_dados (a conexão da thread é reaberta no próximo acesso)
+    banco_dados.fechar_conexao()
+    banco_dados.DB_PATH = caminho
+
+
+def gerar_leituras(ids_sensores, linhas, inicio=datetime(2024, 1, 1)):
+    # Uma leitura por sensor por minuto, tipos alternados, valores de 0 a 100
+    ids_sensores = np.asarray(ids_sensores)
+    rng = np.random.default_rng(0)
+    base = np.datetime64(inicio, "s")
+    for p in range(0, linhas, TAMANHO_BLOCO):
+        i = np.arange(p, min(p + TAMANHO_BLOCO, linhas))
+        datas = np.datetime_as_string(base + (i // len(ids_sensores)) * 60)
+        datas = np.char.replace(datas, "T", " ")  # mesmo formato de str(datetime)
+        valores = np.round(rng.uniform(0, 100, len(i)), 1)
+        yield from zip(ids_sensores[i % len(ids_sensores)].tolist(), TIPOS[i % len(TIPOS)].tolist(),
+                       valores.tolist(), datas.tolist())
+
+
+def preparar(caminho, linhas):
+    # Banco novo com SENSORES sensores e `linhas` leituras; devolve (ids, relatório da importação)
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    usar_banco(caminho)
+
+    inicio = time.perf_counter()
+    ids = [banco_dados.inserir_sensor("Umidade (DHT22)", "Ativo", 1 + i // 10).result() for i in range(SENSORES)]
+    cadastro_ms = (time.perf_counter() - inicio) * 1000 / SENSORES
+
+    relatorio = ingestao.importar_leituras(gerar_leituras(ids, linhas))
+    relatorio["sensor_unitario_ms"] = cadastro_ms
+    return ids, relatorio
+
+
+def _medir_tamanho(caminho, linhas):
+    ids, importacao = preparar(caminho, linhas)
+    r = {
+        "importacao": {
+            "sensor_unitario_ms": importacao["sensor_unitario_ms"],
+            "segundos": importacao["segundos"],
+            "linhas_por_segundo": importacao["linhas_por_segundo"],
+        },
+    }
+
+    # Inserção unitária (uma transação por leitura, como o formulário da Fase 2)
+    r["leitura_unitaria"] = cronometrar(lambda: banco_dados.inserir_leitura(ids[0], "umidade", 42.0).result(), repeticoes=200)
+
+    meio = linhas // 2
+    r["primeira_pagina"] = cronometrar(lambda: banco_dados.buscar_leituras())
+    r["pagina_profunda"] = cronometrar(lambda: banco_dados.buscar_leituras(antes_de=meio))
+    r["filtro_sensor_tipo"] = cronometrar(lambda: banco_dados.buscar_leituras(id_sensor=ids[0], tipo_medicao="umidade"))
+    r["filtro_periodo"] = cronometrar(
+        lambda: banco_dados.buscar_leituras(data_inicio="2024-01-02 00:00:00", data_fim="2024-01-03 00:00:00")
+    )
+    r["ultimas_leituras"] = cronometrar(lambda: banco_dados.ultimas_leituras("umidade"))
+    r["listar_sensores"] = cronometrar(banco_dados.listar_sensores)
+
+    # Agregados: a primeira atualização processa tudo; as seguintes só o que chegou depois
+    inicio = time.perf_counter()
+    banco_dados.atualizar_agregados()
+    r["agregados_completo_s"] = time.perf_counter() - inicio
+    ingestao.importar_leituras(gerar_leituras(ids, 1000, inicio=datetime(2030, 1, 1)))
+    inicio = time.perf_counter()
+    banco_dados.atualizar_agregados()
+    r["agregados_incremental_ms"] = (time.perf_counter() - inicio) * 1000
+    r["agregados_dia"] = cronometrar(lambda: banco_dados.buscar_agregados("dia", id_sensor=ids[0]))
+
+    banco_dados.fechar_conexao()
+    r["arquivo_mb"] = os.path.getsize(caminho) / 1e6
+    return r
+
+
+def medir(pasta, tamanhos=TAMANHOS, manter=False):
+    anterior = banco_dados.DB_PATH
+    resultados = {}
+    try:
+        for linhas in tamanhos:
+            caminho = os.path.join(pasta, f"leituras_{linhas}.db")
+            resultados[str(linhas)] = _medir_tamanho(caminho, linhas)
+            if not manter:
+                for sufixo in ("", "-wal", "-shm"):
+                    if os.path.exists(caminho + sufixo):
+                        os.remove(caminho + sufixo)
+    finally:
+        usar_banco(anterior)
+    return resultados
@@ -0,0 +1,51 @@
+import warnings
+
+import compilacao
+from benchmarks import cronometrar
+from benchmarks.ml import CHAMADAS_UNITARIAS, LOTES, gerar_entradas
+from modelos import ARQUIVOS_MODELOS, RegistroModelos
+
+
+def _comparar(original, compilado, X, repeticoes, aquecimento=1):
+    # Mesma entrada nos dois avaliadores; aceleracao = p50 do sklearn / p50 do compilado
+    r = {
+        "sklearn": cronometrar(lambda: original.predict_proba(X), repeticoes, aquecimento),
+        "compilado": cronometrar(lambda: compilado.predict_proba(X), repeticoes, aquecimento),
+    }
+    r["aceleracao"] = r["sklearn"]["p50_ms"] / r["compilado"]["p50_ms"]
+    return r
+
+
+def medir(pasta, lotes=LOTES, chamadas=CHAMADAS_UNITARIAS):
+    # sklearn x avaliador compilado (compilacao.py): uma linha por chamada e lotes,
+    # mais a verificação de equivalência (limiares e bordas incluídos)
+    resultados = {}
+    registro = RegistroModelos()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # versão do scikit-learn e nomes de colunas dos .pkl
+        for nome in ARQUIVOS_MODELOS:
+            versao = registro.obter_versao(nome)
+            modelo, compilado = versao.modelo, versao.compilado
+            if compilado is None:
+                resultados[nome] = {"erro": f"não compilado: {versao.erro_compilacao or type(modelo).__name__}"}
+                continue
+
+            linha = gerar_entradas(modelo, 1)
+            r = {"unitaria": _comparar(modelo, compilado, linha, chamadas, aquecimento=5)}
+            if isinstance(compilado, compilacao.LimiarUmidade):
+                # Caminho da página: um float, sem NumPy
+                umidade = float(linha[0, 0])
+                r["unitaria"]["limiar"] = cronometrar(lambda: compilado.decisao(umidade), chamadas, 5)
+                r["unitaria"]["aceleracao_limiar"] = (r["unitaria"]["sklearn"]["p50_ms"]
+                                                      / r["unitaria"]["limiar"]["p50_ms"])
+
+            for tamanho in lotes:
+                X = gerar_entradas(modelo, tamanho)
+                lote = _comparar(modelo, compilado, X, repeticoes=5)
+                lote["compilado"]["linhas_por_segundo"] = tamanho / (lote["compilado"]["p50_ms"] / 1000)
+                r[f"lote_{tamanho}"] = lote
+
+            X = compilacao.entradas_teste(modelo, max(lotes), semente=1)
+            r["equivalencia"] = compilacao.verificar(modelo, compilado, X)
+            resultados[nome] = r
+    return resultados
@@ -0,0 +1,44 @@
+import warnings
+
+import numpy as np
+
+from benchmarks import cronometrar
+from modelos import ARQUIVOS_MODELOS, RegistroModelos
+
+# Tamanhos de lote medidos (linhas por chamada a predict_proba)
+LOTES = (1_000, 100_000)
+
+# Chamadas de uma linha só, como uma decisão por leitura
+CHAMADAS_UNITARIAS = 500
+
+
+def gerar_entradas(modelo, linhas, semente=0):
+    # Umidade de 0 a 100; as demais colunas (fósforo, potássio) são presença 0/1
+    rng = np.random.default_rng(semente)
+    X = rng.integers(0, 2, (linhas, modelo.n_features_in_)).astype(float)
+    X[:, 0] = rng.uniform(0, 100, linhas)
+    return X
+
+
+def medir(pasta, lotes=LOTES, chamadas=CHAMADAS_UNITARIAS):
+    resultados = {}
+    registro = RegistroModelos()  # registro próprio: a carga medida é sempre a frio
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # versão do scikit-learn e nomes de colunas dos .pkl
+        for nome in ARQUIVOS_MODELOS:
+            versao = registro.obter_versao(nome)
+            modelo = versao.modelo
+            r = {"carga_ms": versao.tempo_carga * 1000, "arquivo_mb": versao.tamanho_arquivo / 1e6}
+
+            linha = gerar_entradas(modelo, 1)
+            r["unitaria"] = cronometrar(lambda: modelo.predict_proba(linha), repeticoes=chamadas, aquecimento=5)
+            r["unitaria"]["linhas_por_segundo"] = 1000 / r["unitaria"]["media_ms"]
+
+            for tamanho in lotes:
+                X = gerar_entradas(modelo, tamanho)
+                lote = cronometrar(lambda: modelo.predict_proba(X), repeticoes=5)
+                lote["linhas_por_segundo"] = tamanho / (lote["p50_ms"] / 1000)
+                lote["por_linha_us"] = lote["p50_ms"] * 1000 / tamanho
+                r[f"lote_{tamanho}"] = lote
+            resultados[nome] = r
+    return resultados
@@ -0,0 +1,43 @@
+import os
+import time
+
+import banco_dados
+import paginas
+from benchmarks import cronometrar
+from benchmarks.banco import preparar, usar_banco
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+
+# Leituras no banco usado pelas páginas durante a medição
+LINHAS_BANCO = 10_000
+
+# Reexecuções de cada página depois da primeira abertura
+REPETICOES = 3
+
+
+def medir(pasta, linhas=LINHAS_BANCO, repeticoes=REPETICOES):
+    # Renderiza cada fase pelo AppTest, como um usuário clicando no menu.
+    # A primeira abertura inclui o import da página; as seguintes são reruns.
+    from streamlit.testing.v1 import AppTest
+
+    anterior = banco_dados.DB_PATH
+    preparar(os.path.join(pasta, "paginas.db"), linhas)
+    resultados = {}
+    try:
+        app = AppTest.from_file(APP, default_timeout=120)
+        inicio = time.perf_counter()
+        app.run()
+        resultados["partida_ms"] = (time.perf_counter() - inicio) * 1000
+
+        for rotulo in paginas.PAGINAS:
+            inicio = time.perf_counter()
+            app.sidebar.radio[0].set_value(rotulo).run()
+            r = {"primeira_ms": (time.perf_counter() - inicio) * 1000}
+            r.update(cronometrar(app.run, repeticoes=repeticoes, aquecimento=0))
+            erros = [str(e.value) for e in app.exception]
+            if erros:
+                r["erros"] = erros
+            resultados[rotulo] = r
+    finally:
+        usar_banco(anterior)
+    return resultados
@@ -0,0 +1,224 @@
+import argparse
+import math
+import time
+import warnings
+
+import numpy as np
+
+# Compilação dos modelos do scikit-learn em avaliadores NumPy puros. Os objetos
+# compilados imitam a parte do sklearn que o app usa (classes_, n_features_in_,
+# predict, predict_proba), então entram no lugar do original sem mudar quem chama.
+
+# Linhas avaliadas por vez na floresta (as matrizes árvores x linhas cabem no cache)
+TAMANHO_BLOCO_FLORESTA = 1_024
+
+# Células máximas na tabela de uma árvore; acima disso a floresta fica no sklearn
+LIMITE_CELULAS_ARVORE = 1 << 16
+
+# Tolerância da verificação (somas de probabilidades em ponto flutuante)
+TOLERANCIA = 1e-9
+
+# Linhas aleatórias comparadas com o .pkl na compilação explícita (CLI)
+AMOSTRA_VERIFICACAO = 200_000
+
+
+class LimiarUmidade:
+    # Regressão logística de uma variável vira um limite de umidade:
+    # irrigar (classe 1) quando coef * umidade + intercept > 0, ou seja, abaixo de
+    # `limite` para coef < 0. A probabilidade é a mesma sigmoide do sklearn.
+    def __init__(self, coef, intercept, classes, nomes=None):
+        self.coef = float(coef)
+        self.intercept = float(intercept)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = 1
+        if nomes is not None:
+            self.feature_names_in_ = np.asarray(nomes, dtype=object)
+        self.limite = -self.intercept / self.coef if self.coef else math.nan
+
+    def decisao(self, umidade):
+        # Uma leitura, sem NumPy: mesmo cálculo (e arredondamento) da decision_function
+        return self.coef * umidade + self.intercept > 0
+
+    def probabilidade(self, umidade):
+        z = self.coef * umidade + self.intercept
+        return 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=float).reshape(-1) * self.coef + self.intercept
+
+    def predict_proba(self, X):
+        z = self.decision_function(X)
+        p1 = 0.5 * (1.0 + np.tanh(0.5 * z))  # sigmoide estável para |z| grande
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(np.intp)]
+
+
+def _limiar32(limiares):
+    # As árvores do sklearn comparam X em float32 com limiares float64: para x float32,
+    # x <= t vale exatamente quando x <= (maior float32 que não passa de t)
+    f = np.asarray(limiares, dtype=np.float64).astype(np.float32)
+    acima = f.astype(np.float64) > limiares
+    f[acima] = np.nextafter(f[acima], np.float32(-np.inf))
+    return f
+
+
+class FlorestaCompilada:
+    # Cada árvore vira uma tabela de células: os limiares dela dividem cada coluna em
+    # faixas, e a folha de cada combinação de faixas é pré-calculada (pelo próprio
+    # tree_.apply do sklearn). Na avaliação, um searchsorted por coluna contra os
+    # limiares de toda a floresta dá a faixa global; `mapas` a converte na célula de
+    # cada árvore, e todas as árvores são somadas de uma vez em NumPy.
+    def __init__(self, limiares, mapas, inicios, tabela, classes, nomes=None):
+        self.limiares = limiares  # por coluna: limiares float32 de toda a floresta, ordenados
+        self.mapas = mapas  # por coluna: [árvores, faixas globais] -> deslocamento na célula
+        self.inicios = inicios  # primeira célula de cada árvore em `tabela`
+        self.tabela = tabela  # [classes, células]: proporção de cada classe na folha da célula
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = len(limiares)
+        if nomes is not None:
+            self.feature_names_in_ = np.asarray(nomes, dtype=object)
+
+    @classmethod
+    def de_sklearn(cls, floresta, limite_celulas=LIMITE_CELULAS_ARVORE):
+        n = floresta.n_features_in_
+        arvores = [e.tree_ for e in floresta.estimators_]
+        por_arvore = [[np.unique(_limiar32(a.threshold[a.feature == f])) for f in range(n)] for a in arvores]
+        limiares = [np.unique(np.concatenate([locais[f] for locais in por_arvore])) for f in range(n)]
+
+        mapas = [np.zeros((len(arvores), len(limiares[f]) + 1), dtype=np.intp) for f in range(n)]
+        inicios, tabelas, celulas = [], [], 0
+        for i, (arvore, locais) in enumerate(zip(arvores, por_arvore)):
+            faixas = [len(l) + 1 for l in locais]
+            if math.prod(faixas) > limite_celulas:
+                return None
+            passos = np.cumprod([1] + faixas[:0:-1])[::-1]
+            for f in range(n):
+                # Faixa local = quantos limiares da árvore ficam abaixo de x
+                posicoes = np.searchsorted(limiares[f], locais[f])
+                mapas[f][i] = np.searchsorted(posicoes, np.arange(len(limiares[f]) + 1)) * passos[f]
+            # Um ponto por célula: o limiar que abre a faixa (ou +inf na última)
+            pontos = [np.append(l, np.inf).astype(np.float32) for l in locais]
+            grade = np.stack(np.meshgrid(*pontos, indexing="ij"), axis=-1).reshape(-1, n)
+            valor = arvore.value[:, 0, :].astype(np.float64)
+            valor /= np.maximum(valor.sum(axis=1, keepdims=True), np.finfo(float).tiny)
+            tabelas.append(valor[arvore.apply(grade)])
+            inicios.append(celulas)
+            celulas += len(grade)
+
+        return cls(limiares, mapas, np.asarray(inicios, dtype=np.intp),
+                   np.ascontiguousarray(np.concatenate(tabelas).T), floresta.classes_,
+                   getattr(floresta, "feature_names_in_", None))
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+        saida = np.empty((len(X), len(self.classes_)))
+        for p in range(0, len(X), TAMANHO_BLOCO_FLORESTA):
+            bloco = X[p:p + TAMANHO_BLOCO_FLORESTA]
+            celulas = np.broadcast_to(self.inicios[:, None], (len(self.inicios), len(bloco))).copy()
+            for f, limiares in enumerate(self.limiares):
+                celulas += self.mapas[f][:, np.searchsorted(limiares, bloco[:, f])]
+            for c, proporcoes in enumerate(self.tabela):
+                saida[p:p + TAMANHO_BLOCO_FLORESTA, c] = proporcoes[celulas].sum(axis=0)
+        saida /= len(self.inicios)
+        return saida
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compilar(modelo):
+    # Versão compilada do modelo, ou None se o tipo não é suportado (ou a floresta é grande demais)
+    nome = type(modelo).__name__
+    if nome == "LogisticRegression" and modelo.coef_.shape == (1, 1):
+        return LimiarUmidade(modelo.coef_[0, 0], modelo.intercept_[0], modelo.classes_,
+                             getattr(modelo, "feature_names_in_", None))
+    if nome == "RandomForestClassifier" and getattr(modelo, "n_outputs_", 1) == 1:
+        return FlorestaCompilada.de_sklearn(modelo)
+    return None
+
+
+def entradas_teste(modelo, linhas, semente=0):
+    # Para o modelo sklearn original: linhas aleatórias cobrindo a faixa de cada coluna
+    # (umidade de 0 a 100 e além dos limiares das árvores), mais linhas exatamente
+    # sobre cada limiar e vizinhas dele, onde um erro de arredondamento apareceria
+    rng = np.random.default_rng(semente)
+    n = modelo.n_features_in_
+    if hasattr(modelo, "estimators_"):
+        limiares = [np.concatenate([e.tree_.threshold[e.tree_.feature == f] for e in modelo.estimators_])
+                    for f in range(n)]
+    else:
+        limiares = [np.array([-modelo.intercept_[0] / modelo.coef_[0, 0]])]
+    limiares[0] = np.concatenate([limiares[0], np.round(np.arange(0, 100.05, 0.1), 1)])
+
+    X = np.empty((linhas, n))
+    for f, valores in enumerate(limiares):
+        minimo, maximo = min(valores.min(), 0.0), max(valores.max(), 100.0 if f == 0 else 0.0)
+        margem = 0.1 * (maximo - minimo) or 1.0
+        X[:, f] = rng.uniform(minimo - margem, maximo + margem, linhas)
+
+    bordas = []
+    for f, valores in enumerate(limiares):
+        exatos = np.concatenate([valores, np.nextafter(valores, -np.inf), np.nextafter(valores, np.inf),
+                                 _limiar32(valores), np.nextafter(_limiar32(valores), np.float32(np.inf))])
+        linha_borda = X[rng.integers(0, linhas, len(exatos))] if linhas else np.zeros((len(exatos), n))
+        linha_borda[:, f] = exatos
+        bordas.append(linha_borda)
+    return np.vstack([X, *bordas])
+
+
+def verificar(original, compilado, X):
+    # Compara com o .pkl: mesma classe em todas as linhas e probabilidades iguais até TOLERANCIA
+    import pandas as pd
+
+    nomes = getattr(original, "feature_names_in_", None)
+    entrada = pd.DataFrame(X, columns=nomes) if nomes is not None else X
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        proba_original = original.predict_proba(entrada)
+        classe_original = original.predict(entrada)
+    proba = compilado.predict_proba(X)
+    classe = compilado.predict(X)
+    relatorio = {
+        "linhas": len(X),
+        "classes_iguais": bool(np.array_equal(classe, classe_original)),
+        "diferenca_max": float(np.abs(proba - proba_original).max()) if len(X) else 0.0,
+    }
+    relatorio["equivalente"] = relatorio["classes_iguais"] and relatorio["diferenca_max"] <= TOLERANCIA
+    return relatorio
+
+
+def compilar_verificado(modelo, linhas=AMOSTRA_VERIFICACAO):
+    # (compilado ou None, relatório da verificação)
+    compilado = compilar(modelo)
+    if compilado is None:
+        return None, {"equivalente": False, "motivo": f"{type(modelo).__name__} não compilável"}
+    relatorio = verificar(modelo, compilado, entradas_teste(modelo, linhas))
+    return (compilado if relatorio["equivalente"] else None), relatorio
+
+
+def main():
+    # Compilação explícita: verifica cada .pkl numa amostra grande e mostra o ganho
+    from modelos import ARQUIVOS_MODELOS, RegistroModelos
+
+    parser = argparse.ArgumentParser(description="Compila os modelos .pkl e verifica a equivalência.")
+    parser.add_argument("--linhas", type=int, default=AMOSTRA_VERIFICACAO, help="linhas aleatórias comparadas")
+    args = parser.parse_args()
+
+    registro = RegistroModelos()
+    falhou = False
+    for nome in ARQUIVOS_MODELOS:
+        modelo = registro.obter(nome)
+        inicio = time.perf_counter()
+        compilado, relatorio = compilar_verificado(modelo, args.linhas)
+        relatorio["segundos"] = time.perf_counter() - inicio
+        if isinstance(compilado, LimiarUmidade):
+            relatorio["limite_umidade"] = compilado.limite
+        print(f"{nome} ({type(modelo).__name__}): " + ", ".join(f"{k}={v}" for k, v in relatorio.items()))
+        falhou |= not relatorio["equivalente"]
+    raise SystemExit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# Constantes do script R da Fase 1
+CULTURAS = {
+    "Arroz": {"fator": 2.607142857142857, "ciclo": 140},
+    "Feijão": {"fator": 4.5625, "ciclo": 80},
+}
+
+# Custo por litro de cada insumo (R$)
+INSUMOS = {"Fertilizante": 47, "Pesticida": 389}
+
+# Cenários de preço: multiplicador aplicado ao custo por litro
+CENARIOS_PRECO = {"-20%": 0.8, "-10%": 0.9, "Base": 1.0, "+10%": 1.1, "+20%": 1.2}
+
+# Caracteres lidos por vez de arquivos de consumo
+TAMANHO_BLOCO = 1 << 20
+
+
+def ler_consumo(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    # Lê valores de consumo (separados por espaço, vírgula, ponto e vírgula ou
+    # quebra de linha) em blocos, sem carregar o arquivo inteiro. Uma primeira
+    # linha não numérica é tratada como cabeçalho.
+    resto = ""
+    primeiro = True
+    while True:
+        texto = arquivo.read(tamanho_bloco)
+        if isinstance(texto, bytes):
+            texto = texto.decode("utf-8", errors="replace")
+        if not texto:
+            break
+
+        texto = (resto + texto).replace(",", " ").replace(";", " ")
+        # O último número pode ter sido cortado no meio: fica para o próximo bloco
+        corte = max(texto.rfind(" "), texto.rfind("\n"), texto.rfind("\t"))
+        texto, resto = texto[:corte + 1], texto[corte + 1:]
+
+        if primeiro and texto.strip():
+            primeiro = False
+            linha = texto.lstrip().split("\n", 1)[0]
+            try:
+                float(linha.split()[0])
+            except ValueError:
+                texto = texto.lstrip().split("\n", 1)[1] if "\n" in texto.lstrip() else ""
+
+        if texto.strip():
+            yield np.array(texto.split(), dtype=float)
+
+    if resto.strip():
+        yield np.array(resto.split(), dtype=float)
+
+
+def acumular(blocos, culturas=CULTURAS):
+    # Soma dos litros anuais de cada cultura, bloco a bloco: (quantidade, somas[C])
+    fatores = np.array([c["fator"] for c in culturas.values()])
+    n = 0
+    somas = np.zeros(len(fatores))
+    for bloco in blocos:
+        bloco = np.asarray(bloco, dtype=float)
+        n += len(bloco)
+        somas += (fatores[:, None] * bloco[None, :]).sum(axis=1)
+    return n, somas
+
+
+def comparar(n, somas, culturas=CULTURAS, insumos=INSUMOS, cenarios=CENARIOS_PRECO):
+    # Todas as combinações cultura x insumo x cenário de preço, por broadcasting
+    if n == 0:
+        raise ValueError("Nenhum valor de consumo informado.")
+
+    medias = np.floor(somas / n)                                   # [C]
+    excedentes = somas - n * medias                                # [C]
+    custos = np.outer(list(insumos.values()), list(cenarios.values()))  # [I, P]
+    gastos = somas[:, None, None] * custos[None, :, :]             # [C, I, P]
+
+    c, i, p = np.indices(gastos.shape).reshape(3, -1)
+    nomes_culturas = np.array(list(culturas))
+    return pd.DataFrame({
+        "cultura": nomes_culturas[c],
+        "ciclo": np.array([v["ciclo"] for v in culturas.values()])[c],
+        "insumo": np.array(list(insumos))[i],
+        "cenario": np.array(list(cenarios))[p],
+        "custo_litro": custos[i, p],
+        "media": medias[c].astype(int),
+        "excedente": excedentes[c],
+        "gasto_total": gastos.ravel(),
+    })
+
+
+def analisar(blocos, cenarios=CENARIOS_PRECO):
+    # Atalho: acumula os blocos e devolve a tabela comparativa
+    n, somas = acumular(blocos)
+    return comparar(n, somas, cenarios=cenarios)
+
+
+def litros_anuais(litros, cultura):
+    return np.asarray(litros, dtype=float) * CULTURAS[cultura]["fator"]
@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Arquivo histórico de umidade (timestamp, umidade, precisa_irrigar)
+ARQUIVO = "dataset_umidade.csv"
+
+# Pasta, ao lado do CSV, com as colunas já convertidas (um .bin por coluna + meta.json)
+PASTA_CACHE = ".cache_dados"
+
+# Tipo de cada coluna no cache; precisa_irrigar inválido/vazio vira -1
+COLUNAS = {
+    "timestamp": np.dtype("datetime64[s]"),
+    "umidade": np.dtype(np.float32),
+    "precisa_irrigar": np.dtype(np.int8),
+}
+
+# Linhas do CSV convertidas por vez (memória constante, qualquer tamanho de arquivo)
+TAMANHO_BLOCO = 500_000
+
+
+def _assinatura(caminho):
+    info = os.stat(caminho)
+    return [info.st_mtime_ns, info.st_size]
+
+
+def _pasta(caminho):
+    caminho = os.path.abspath(caminho)
+    return os.path.join(os.path.dirname(caminho), PASTA_CACHE, os.path.basename(caminho))
+
+
+def _ler_meta(pasta):
+    try:
+        with open(os.path.join(pasta, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _tipar(bloco):
+    # Bloco do CSV -> arrays com os tipos do cache (valores inválidos viram NaT/NaN/-1)
+    return {
+        "timestamp": pd.to_datetime(bloco["timestamp"], format="ISO8601", errors="coerce")
+                       .to_numpy(COLUNAS["timestamp"]),
+        "umidade": pd.to_numeric(bloco["umidade"], errors="coerce").to_numpy(COLUNAS["umidade"]),
+        "precisa_irrigar": pd.to_numeric(bloco["precisa_irrigar"], errors="coerce")
+                             .fillna(-1).to_numpy(COLUNAS["precisa_irrigar"]),
+    }
+
+
+def converter(caminho=ARQUIVO, tamanho_bloco=TAMANHO_BLOCO):
+    # Lê o CSV uma única vez, em blocos, e grava cada coluna como binário cru.
+    # O meta.json é escrito por último: sem ele (ou com assinatura antiga) o cache não vale.
+    pasta = _pasta(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    assinatura = _assinatura(caminho)
+    sufixo = f".{os.getpid()}.tmp"  # outro processo pode estar convertendo o mesmo arquivo
+
+    arquivos = {coluna: open(os.path.join(pasta, f"{coluna}.bin{sufixo}"), "wb") for coluna in COLUNAS}
+    linhas = 0
+    try:
+        for bloco in pd.read_csv(caminho, usecols=list(COLUNAS), dtype={"timestamp": str},
+                                 chunksize=tamanho_bloco):
+            for coluna, valores in _tipar(bloco).items():
+                arquivos[coluna].write(valores.tobytes())
+            linhas += len(bloco)
+    finally:
+        for arquivo in arquivos.values():
+            arquivo.close()
+
+    # os.replace troca o arquivo sem invalidar memmaps já abertos do cache anterior
+    for coluna in COLUNAS:
+        os.replace(os.path.join(pasta, f"{coluna}.bin{sufixo}"), os.path.join(pasta, f"{coluna}.bin"))
+    meta = {"assinatura": assinatura, "linhas": linhas, "colunas": {c: t.str for c, t in COLUNAS.items()}}
+    with open(os.path.join(pasta, f"meta.json{sufixo}"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(os.path.join(pasta, f"meta.json{sufixo}"), os.path.join(pasta, "meta.json"))
+    return meta
+
+
+# Caminho absoluto do CSV -> (assinatura, linhas, {coluna: memmap})
+_abertos = {}
+_abertos_lock = threading.Lock()
+
+
+def _abrir(caminho):
+    # Colunas mapeadas em memória: nada é lido do disco até alguém indexar o array
+    chave = os.path.abspath(caminho)
+    assinatura = _assinatura(caminho)
+    aberto = _abertos.get(chave)
+    if aberto is not None and aberto[0] == assinatura:
+        return aberto
+
+    with _abertos_lock:
+        aberto = _abertos.get(chave)
+        if aberto is not None and aberto[0] == assinatura:
+            return aberto
+
+        pasta = _pasta(caminho)
+        meta = _ler_meta(pasta)
+        if meta is None or meta["assinatura"] != assinatura:
+            meta = converter(caminho)
+
+        linhas = meta["linhas"]
+        colunas = {
+            coluna: np.memmap(os.path.join(pasta, f"{coluna}.bin"), dtype=tipo, mode="r", shape=(linhas,))
+            if linhas else np.zeros(0, dtype=tipo)
+            for coluna, tipo in COLUNAS.items()
+        }
+        aberto = _abertos[chave] = (meta["assinatura"], linhas, colunas)
+        return aberto
+
+
+def pronto(caminho=ARQUIVO):
+    # O cache em disco corresponde à versão atual do CSV?
+    meta = _ler_meta(_pasta(caminho))
+    return meta is not None and meta["assinatura"] == _assinatura(caminho)
+
+
+def colunas(nomes=None, caminho=ARQUIVO):
+    # Arrays somente leitura, sem cópia (para treino e estatísticas em NumPy)
+    _, _, arrays = _abrir(caminho)
+    return {nome: arrays[nome] for nome in (nomes or COLUNAS)}
+
+
+def total_linhas(caminho=ARQUIVO):
+    return _abrir(caminho)[1]
+
+
+def carregar(colunas=None, linhas=None, caminho=ARQUIVO):
+    # DataFrame só com as colunas e linhas pedidas (linhas: slice, índices ou máscara)
+    _, _, arrays = _abrir(caminho)
+    selecao = slice(None) if linhas is None else linhas
+    return pd.DataFrame({nome: np.asarray(arrays[nome][selecao]) for nome in (colunas or COLUNAS)})
+
+
+_conversoes = {}
+_conversoes_lock = threading.Lock()
+
+
+def converter_em_segundo_plano(caminho=ARQUIVO):
+    # Uma conversão por arquivo de cada vez; devolve a thread
+    chave = os.path.abspath(caminho)
+    with _conversoes_lock:
+        thread = _conversoes.get(chave)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_abrir, args=(caminho,), name="conversao-dataset", daemon=True)
+            _conversoes[chave] = thread
+            thread.start()
+    return thread
+
+
+def previa(n=20, caminho=ARQUIVO):
+    # Primeiras linhas sem esperar a conversão: enquanto o cache não existe,
+    # lê só o começo do CSV e deixa a conversão completa para uma thread
+    if pronto(caminho):
+        return carregar(linhas=slice(0, n), caminho=caminho)
+    converter_em_segundo_plano(caminho)
+    bloco = pd.read_csv(caminho, usecols=list(COLUNAS), dtype={"timestamp": str}, nrows=n)
+    return pd.DataFrame(_tipar(bloco))
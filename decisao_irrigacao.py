@@ -0,0 +1,84 @@
+import time
+from collections import deque
+
+import numpy as np
+
+import banco_dados
+import metricas
+from envio_alerta import LIMITE_UMIDADE
+from modelos import obter_avaliador
+
+# Latência dos últimos lotes de decisão (ms)
+LATENCIAS = deque(maxlen=500)
+
+
+def decidir_umidades(umidades, modelo=None):
+    # Decide vários valores de umidade de uma só vez.
+    # Retorna (precisa_irrigar: bool[], probabilidade: float[] ou None, origem).
+    X = np.asarray(umidades, dtype=float).reshape(-1, 1)
+    if len(X) == 0:
+        return np.zeros(0, dtype=bool), None, "vazio"
+
+    if modelo is not None:
+        # predict_proba já traz tudo que o predict faria: uma única chamada
+        with metricas.medir("modelo_predicao", modelo="irrigacao", lote=metricas.faixa_lote(len(X))):
+            proba = modelo.predict_proba(X)
+        classes = modelo.classes_
+        decisao = classes[np.argmax(proba, axis=1)] == 1
+        probabilidade = proba[:, list(classes).index(1)]
+        return decisao, probabilidade, "modelo"
+
+    return X[:, 0] < LIMITE_UMIDADE, None, "regra"
+
+
+def decidir_plantacoes():
+    # Pega a última umidade de cada sensor ativo, decide todos num só lote e
+    # consolida por plantação (irriga se qualquer sensor dela pedir irrigação)
+    inicio = time.perf_counter()
+
+    sensores = banco_dados.ultimas_leituras("umidade")
+    try:
+        modelo = obter_avaliador("irrigacao")
+    except Exception:
+        modelo = None
+
+    decisao, probabilidade, origem = decidir_umidades(sensores["VALOR"].to_numpy(), modelo)
+    sensores = sensores.rename(columns={"VALOR": "UMIDADE"})
+    sensores["IRRIGAR"] = decisao
+    sensores["PROBABILIDADE"] = probabilidade if probabilidade is not None else decisao.astype(float)
+
+    plantacoes = (
+        sensores.groupby("ID_PLANTACAO")
+        .agg(
+            SENSORES=("ID_SENSOR", "count"),
+            SENSORES_SECOS=("IRRIGAR", "sum"),
+            UMIDADE_MEDIA=("UMIDADE", "mean"),
+            UMIDADE_MIN=("UMIDADE", "min"),
+            PROBABILIDADE_MAX=("PROBABILIDADE", "max"),
+            ULTIMA_LEITURA=("DATA_HORA", "max"),
+        )
+        .reset_index()
+    )
+    plantacoes["IRRIGAR"] = plantacoes["SENSORES_SECOS"] > 0
+
+    latencia_ms = (time.perf_counter() - inicio) * 1000
+    LATENCIAS.append(latencia_ms)
+
+    return {
+        "plantacoes": plantacoes,
+        "sensores": sensores,
+        "origem": origem,
+        "latencia_ms": latencia_ms,
+    }
+
+
+def resumo_latencias():
+    if not LATENCIAS:
+        return {}
+    valores = np.fromiter(LATENCIAS, dtype=float)
+    return {
+        "lotes": len(valores),
+        "p50_ms": float(np.percentile(valores, 50)),
+        "p95_ms": float(np.percentile(valores, 95)),
+        "max_ms": float(valores.max()),
+    }
@@ -1,7 +1,196 @@
-from sns_alerta import enviar_alerta
-
-def monitorar_umidade(valor):
-    print(f"Umidade atual: {valor}%")
-
-    if valor < 40:
-        enviar_alerta(f"Umidade muito baixa: {valor}%. Acionar irrigação!")
+import argparse
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+
+from sns_alerta import enviar_alerta
+
+# Regra do firmware: umidade abaixo disso liga a bomba (usada nas Fases 3, 4 e 5)
+LIMITE_UMIDADE = 40.0
+
+# A bomba só desliga quando a média volta acima de LIMITE_UMIDADE + HISTERESE,
+# assim valores ruidosos perto de 40% não ficam ligando e desligando a bomba
+HISTERESE = 3.0
+
+# Leituras por sensor na média móvel
+JANELA_SUAVIZACAO = 5
+
+Evento = namedtuple("Evento", ["tipo", "id_sensor", "media", "valor"])
+
+
+def monitorar_umidade(valor, id_sensor=None):
+    print(f"Umidade atual: {valor}%")
+
+    if valor < LIMITE_UMIDADE:
+        # Não bloqueia: devolve o Future com o MessageId do SNS
+        return enviar_alerta(f"Umidade muito baixa: {valor}%. Acionar irrigação!", chave=id_sensor)
+
+
+class _EstadoSensor:
+    __slots__ = ("valores", "soma", "bomba")
+
+    def __init__(self, janela):
+        self.valores = deque(maxlen=janela)
+        self.soma = 0.0
+        self.bomba = False
+
+
+class MonitorUmidade:
+    # Média móvel + histerese por sensor. Consome lotes de (id_sensor, valor, instante)
+    # e gera eventos "bomba_ligada" / "bomba_desligada".
+
+    def __init__(self, janela=JANELA_SUAVIZACAO, limite=LIMITE_UMIDADE, histerese=HISTERESE, ao_ligar=None):
+        self.janela = janela
+        self.limite_liga = limite
+        self.limite_desliga = limite + histerese
+        self.ao_ligar = ao_ligar  # ex.: alertar_sns, chamado a cada bomba ligada
+        self._estados = {}
+
+        self.lidas = 0
+        self.eventos = 0
+        self.atraso_s = 0.0         # idade da última leitura processada
+        self.atraso_leituras = 0    # leituras ainda não consumidas na fonte (quando ela informa)
+        self._inicio = time.perf_counter()
+
+    def processar(self, id_sensor, valor):
+        estado = self._estados.get(id_sensor)
+        if estado is None:
+            estado = self._estados[id_sensor] = _EstadoSensor(self.janela)
+
+        valores = estado.valores
+        if len(valores) == self.janela:
+            estado.soma -= valores[0]
+        valores.append(valor)
+        estado.soma += valor
+        media = estado.soma / len(valores)
+
+        if not estado.bomba and media < self.limite_liga:
+            estado.bomba = True
+            evento = Evento("bomba_ligada", id_sensor, media, valor)
+            if self.ao_ligar is not None:
+                self.ao_ligar(evento)
+            return evento
+        if estado.bomba and media >= self.limite_desliga:
+            estado.bomba = False
+            return Evento("bomba_desligada", id_sensor, media, valor)
+        return None
+
+    def consumir(self, fonte):
+        # fonte: iterável de lotes (listas) de (id_sensor, valor, instante_epoch ou None)
+        processar = self.processar
+        for lote in fonte:
+            for id_sensor, valor, _ in lote:
+                evento = processar(id_sensor, valor)
+                if evento is not None:
+                    self.eventos += 1
+                    yield evento
+            if lote:
+                self.lidas += len(lote)
+                instante = lote[-1][2]
+                if instante is not None:
+                    self.atraso_s = max(0.0, time.time() - instante)
+
+    def bombas_ligadas(self):
+        return [id_sensor for id_sensor, estado in self._estados.items() if estado.bomba]
+
+    def estatisticas(self):
+        decorrido = time.perf_counter() - self._inicio
+        return {
+            "lidas": self.lidas,
+            "eventos": self.eventos,
+            "sensores": len(self._estados),
+            "bombas_ligadas": len(self.bombas_ligadas()),
+            "leituras_por_segundo": self.lidas / decorrido if decorrido > 0 else 0.0,
+            "atraso_s": self.atraso_s,
+            "atraso_leituras": self.atraso_leituras,
+        }
+
+
+def alertar_sns(evento):
+    # Uma bomba ligada vira alerta; duplicados do mesmo sensor são agrupados pelo despachante
+    return enviar_alerta(
+        f"Umidade muito baixa: {evento.media:.1f}% (sensor {evento.id_sensor}). Acionar irrigação!",
+        chave=evento.id_sensor,
+    )
+
+
+# --- FONTES DE LEITURAS ---
+def _epoch(data_hora):
+    try:
+        return datetime.fromisoformat(str(data_hora)).timestamp()
+    except ValueError:
+        return None
+
+
+def fonte_gerador(leituras, tamanho_lote=1000):
+    # Agrupa um gerador de (id_sensor, valor[, instante]) em lotes
+    lote = []
+    for leitura in leituras:
+        lote.append(leitura if len(leitura) == 3 else (leitura[0], leitura[1], None))
+        if len(lote) == tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def fonte_csv(caminho, id_sensor=0, tamanho_lote=50000):
+    # Reproduz um arquivo no formato do dataset_umidade.csv (timestamp, umidade), na ordem do arquivo
+    import pandas as pd
+
+    for bloco in pd.read_csv(caminho, usecols=["timestamp", "umidade"], chunksize=tamanho_lote):
+        valores = bloco["umidade"].astype(float).tolist()
+        yield [(id_sensor, valor, None) for valor in valores]
+
+
+def fonte_banco(monitor=None, ultimo_id=0, intervalo=1.0, tamanho_lote=5000, parar=None):
+    # Acompanha T_LEITURA_SENSOR pelo cursor ID_LEITURA (só leituras de umidade).
+    # Roda até o Event `parar` ser sinalizado.
+    import banco_dados
+
+    conn = banco_dados.get_db_connection()
+    while parar is None or not parar.is_set():
+        linhas = conn.execute(
+            "SELECT ID_LEITURA, ID_SENSOR, VALOR, DATA_HORA FROM T_LEITURA_SENSOR "
+            "WHERE ID_LEITURA > ? AND TIPO_MEDICAO = 'umidade' ORDER BY ID_LEITURA LIMIT ?",
+            (ultimo_id, tamanho_lote),
+        ).fetchall()
+        if not linhas:
+            if monitor is not None:
+                monitor.atraso_leituras = 0
+            time.sleep(intervalo)
+            continue
+
+        ultimo_id = linhas[-1][0]
+        if monitor is not None:
+            maximo = conn.execute("SELECT MAX(ID_LEITURA) FROM T_LEITURA_SENSOR").fetchone()[0] or 0
+            monitor.atraso_leituras = maximo - ultimo_id
+        validas = [linha for linha in linhas if linha[2] is not None]
+        lote = [(id_sensor, valor, None) for _, id_sensor, valor, _ in validas]
+        if lote:
+            # Horário da última leitura que entrou no lote (não da última lida, que pode ter VALOR nulo)
+            lote[-1] = (lote[-1][0], lote[-1][1], _epoch(validas[-1][3]))
+        yield lote
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor contínuo de umidade (bomba + alertas).")
+    origem = parser.add_mutually_exclusive_group(required=True)
+    origem.add_argument("--csv", help="reproduz um arquivo no formato do dataset_umidade.csv")
+    origem.add_argument("--banco", action="store_true", help="acompanha novas leituras em T_LEITURA_SENSOR")
+    parser.add_argument("--alertar", action="store_true", help="envia alerta SNS quando uma bomba liga")
+    args = parser.parse_args()
+
+    monitor = MonitorUmidade(ao_ligar=alertar_sns if args.alertar else None)
+    fonte = fonte_csv(args.csv) if args.csv else fonte_banco(monitor)
+
+    try:
+        for evento in monitor.consumir(fonte):
+            print(f"[{evento.tipo}] sensor {evento.id_sensor}: média {evento.media:.1f}% (leitura {evento.valor}%)")
+    except KeyboardInterrupt:
+        pass
+    print(monitor.estatisticas())
+
+
+if __name__ == "__main__":
+    main()
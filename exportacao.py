@@ -0,0 +1,262 @@
+import argparse
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import banco_dados
+import metricas
+import retencao
+
+# Formato -> tipo MIME do arquivo exportado
+FORMATOS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+# Porta opcional do endpoint /exportar, que manda o arquivo direto do banco para o
+# navegador em blocos (nada fica inteiro na memória nem em disco)
+PORTA_EXPORTACAO = os.environ.get("FARMTECH_EXPORTACAO_PORTA")
+
+# Interface onde o endpoint escuta. Ele entrega todas as leituras sem autenticação,
+# então só localhost por padrão; outra interface (ex.: 0.0.0.0) tem de ser pedida
+ENDERECO_EXPORTACAO = os.environ.get("FARMTECH_EXPORTACAO_ENDERECO", "127.0.0.1")
+
+# Endereço do endpoint visto pelo navegador (padrão: localhost na PORTA_EXPORTACAO)
+URL_EXPORTACAO = os.environ.get("FARMTECH_EXPORTACAO_URL")
+
+# Bytes acumulados antes de cada escrita no destino
+TAMANHO_BUFFER = 1 << 16
+
+# Caracteres fora disto saem do nome do arquivo (ele vai num cabeçalho HTTP)
+_NOME_INVALIDO = re.compile(r"[^A-Za-z0-9_-]+")
+
+# Relatórios das últimas exportações (mais recente no fim)
+RELATORIOS = deque(maxlen=20)
+
+
+class _Saida:
+    # Destino binário com buffer e contagem de bytes. `tell` é o que o ParquetWriter
+    # precisa para escrever num destino sem seek (resposta HTTP, pipe...)
+    def __init__(self, escrever):
+        self._escrever = escrever
+        self._buffer = bytearray()
+        self.bytes = 0
+        self.closed = False
+
+    def write(self, dados):
+        if isinstance(dados, str):
+            dados = dados.encode("utf-8")
+        self._buffer += dados
+        self.bytes += len(dados)
+        if len(self._buffer) >= TAMANHO_BUFFER:
+            self.flush()
+        return len(dados)
+
+    def flush(self):
+        if self._buffer:
+            self._escrever(bytes(self._buffer))
+            self._buffer.clear()
+
+    def tell(self):
+        return self.bytes
+
+    def writable(self):
+        return True
+
+    def close(self):
+        self.flush()
+        self.closed = True
+
+
+def _gravar_csv(saida, blocos):
+    linhas = 0
+    for bloco in blocos:
+        saida.write(bloco.to_csv(index=False, header=linhas == 0))
+        linhas += len(bloco)
+    if linhas == 0:
+        saida.write(",".join(banco_dados.COLUNAS_LEITURA) + "\n")
+    return linhas
+
+
+def _gravar_parquet(saida, blocos):
+    # Um row group por bloco: o arquivo cresce sem juntar a tabela na memória
+    import pyarrow.parquet as pq
+
+    esquema = retencao.esquema_parquet()
+    linhas = 0
+    with pq.ParquetWriter(saida, esquema, compression="zstd") as escritor:
+        for bloco in blocos:
+            escritor.write_table(retencao.tabela_parquet(bloco, esquema))
+            linhas += len(bloco)
+    return linhas
+
+
+def exportar(destino, formato="csv", tamanho_bloco=banco_dados.TAMANHO_BLOCO_LEITURAS, **filtros):
+    # destino: caminho ou função que recebe bytes. filtros: id_sensor, tipo_medicao,
+    # data_inicio, data_fim (os mesmos de banco_dados.buscar_leituras). Inclui as
+    # leituras já arquivadas pela retenção.
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(FORMATOS)})")
+    gravar = _gravar_csv if formato == "csv" else _gravar_parquet
+
+    inicio = time.perf_counter()
+    blocos = retencao.iterar_historico(tamanho_bloco=tamanho_bloco, **filtros)
+    if callable(destino):
+        saida = _Saida(destino)
+        linhas = gravar(saida, blocos)
+        saida.close()
+    else:
+        # Arquivo temporário ao lado do destino: o caminho final nunca fica pela metade
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        try:
+            with open(temporario, "wb") as arquivo:
+                saida = _Saida(arquivo.write)
+                linhas = gravar(saida, blocos)
+                saida.close()
+            os.replace(temporario, destino)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    segundos = time.perf_counter() - inicio
+    metricas.observar("exportacao", segundos, formato=formato)
+    relatorio = {
+        "formato": formato,
+        "linhas": linhas,
+        "bytes": saida.bytes,
+        "segundos": segundos,
+        "linhas_por_segundo": linhas / segundos if segundos else 0.0,
+        "mb_por_segundo": saida.bytes / 1e6 / segundos if segundos else 0.0,
+    }
+    RELATORIOS.append(relatorio)
+    return relatorio
+
+
+def exportar_para_arquivo_temporario(formato="csv", **filtros):
+    # Exporta para um arquivo temporário em disco e devolve o arquivo aberto
+    # (apagado ao fechar): a exportação em si não cresce com o tamanho da tabela
+    arquivo = tempfile.TemporaryFile()
+    exportar(arquivo.write, formato, **filtros)
+    arquivo.seek(0)
+    return arquivo
+
+
+def nome_arquivo(formato, id_sensor=None, tipo_medicao=None, **_):
+    partes = ["leituras", f"sensor{id_sensor}" if id_sensor is not None else None, tipo_medicao]
+    partes = [_NOME_INVALIDO.sub("", str(p)) for p in partes if p]
+    return "_".join(p for p in partes if p) + f".{formato}"
+
+
+def _filtros_da_url(consulta):
+    parametros = {chave: valores[-1] for chave, valores in parse_qs(consulta).items() if valores[-1]}
+    filtros = {chave: parametros[chave] for chave in ("tipo_medicao", "data_inicio", "data_fim") if chave in parametros}
+    if "id_sensor" in parametros:
+        filtros["id_sensor"] = int(parametros["id_sensor"])
+    return parametros.get("formato", "csv"), filtros
+
+
+def url_download(formato, **filtros):
+    # Link do endpoint de streaming (None se ele não estiver configurado)
+    if not PORTA_EXPORTACAO:
+        return None
+    base = URL_EXPORTACAO or f"http://localhost:{PORTA_EXPORTACAO}"
+    consulta = {"formato": formato, **{k: v for k, v in filtros.items() if v is not None}}
+    return f"{base.rstrip('/')}/exportar?{urlencode(consulta)}"
+
+
+_servidor = None
+_servidor_erro = None  # falha ao abrir a porta (não tenta de novo a cada rerun)
+_servidor_lock = threading.Lock()
+
+
+def servir(porta, endereco=None):
+    # GET /exportar?formato=csv|parquet&id_sensor=&tipo_medicao=&data_inicio=&data_fim=
+    # Resposta em Transfer-Encoding: chunked, escrita bloco a bloco durante a consulta.
+    # Se a porta não abre, devolve None e o motivo fica em erro_servidor().
+    global _servidor, _servidor_erro
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Exportacao(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/exportar":
+                self.send_error(404)
+                return
+            try:
+                formato, filtros = _filtros_da_url(url.query)
+            except ValueError:
+                self.send_error(400)
+                return
+            if formato not in FORMATOS:
+                self.send_error(400, f"formato deve ser um de: {', '.join(FORMATOS)}")
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", FORMATOS[formato])
+            self.send_header("Content-Disposition", f'attachment; filename="{nome_arquivo(formato, **filtros)}"')
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def enviar(dados):
+                self.wfile.write(f"{len(dados):X}\r\n".encode("ascii") + dados + b"\r\n")
+
+            try:
+                exportar(enviar, formato, **filtros)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                banco_dados.fechar_conexao()  # as threads do servidor não são reaproveitadas
+
+        def log_message(self, *args):
+            pass
+
+    with _servidor_lock:
+        if _servidor is None and _servidor_erro is None:
+            try:
+                _servidor = ThreadingHTTPServer((endereco or ENDERECO_EXPORTACAO, porta), Exportacao)
+            except OSError as e:
+                _servidor_erro = f"{endereco or ENDERECO_EXPORTACAO}:{porta}: {e}"
+            else:
+                threading.Thread(target=_servidor.serve_forever, name="exportacao-http", daemon=True).start()
+    return _servidor
+
+
+def erro_servidor():
+    return _servidor_erro
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta T_LEITURA_SENSOR para CSV ou Parquet em blocos.")
+    parser.add_argument("saida", nargs="?", help="arquivo de destino (padrão: leituras[_filtros].<formato>)")
+    parser.add_argument("--formato", choices=list(FORMATOS), help="padrão: pela extensão da saída, senão csv")
+    parser.add_argument("--sensor", type=int, help="ID_SENSOR")
+    parser.add_argument("--tipo", help="TIPO_MEDICAO (umidade, pH, fosforo...)")
+    parser.add_argument("--inicio", help="DATA_HORA inicial, inclusiva (ex.: 2026-01-01)")
+    parser.add_argument("--fim", help="DATA_HORA final, exclusiva")
+    parser.add_argument("--bloco", type=int, default=banco_dados.TAMANHO_BLOCO_LEITURAS, help="leituras por bloco")
+    parser.add_argument("--servir", type=int, metavar="PORTA", help="em vez de exportar, abre o endpoint /exportar")
+    parser.add_argument("--endereco", default=ENDERECO_EXPORTACAO,
+                        help="interface do endpoint (padrão: 127.0.0.1; 0.0.0.0 expõe na rede sem autenticação)")
+    args = parser.parse_args()
+
+    if args.servir:
+        if servir(args.servir, args.endereco) is None:
+            raise SystemExit(f"Não foi possível abrir o endpoint ({erro_servidor()})")
+        print(f"Exportação em http://{args.endereco}:{args.servir}/exportar?formato=csv")
+        threading.Event().wait()
+
+    filtros = {"id_sensor": args.sensor, "tipo_medicao": args.tipo, "data_inicio": args.inicio, "data_fim": args.fim}
+    formato = args.formato or (os.path.splitext(args.saida)[1].lstrip(".") if args.saida else "csv")
+    saida = args.saida or nome_arquivo(formato, **filtros)
+    relatorio = exportar(saida, formato, args.bloco, **filtros)
+    print(f"{saida}: {relatorio['linhas']} leituras, {relatorio['bytes'] / 1e6:.1f} MB em "
+          f"{relatorio['segundos']:.2f} s ({relatorio['linhas_por_segundo']:,.0f} linhas/s, "
+          f"{relatorio['mb_por_segundo']:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
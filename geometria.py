@@ -0,0 +1,108 @@
+import io
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# --- FORMAS SIMPLES (casos especiais da Fase 1, aceitam escalares ou arrays) ---
+def area_retangulo(largura, comprimento):
+    return np.multiply(largura, comprimento)
+
+
+def area_circulo(raio):
+    return math.pi * np.square(raio)
+
+
+def area_trapezio(base_maior, base_menor, altura):
+    return (np.add(base_maior, base_menor) * altura) / 2
+
+
+# --- POLÍGONOS ---
+def areas_poligonos(x, y, inicios):
+    # Fórmula do laço (shoelace) para muitos polígonos de uma vez.
+    # x, y: vértices de todos os polígonos concatenados, em ordem;
+    # inicios: índice do primeiro vértice de cada polígono.
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    inicios = np.asarray(inicios, dtype=np.int64)
+    if len(inicios) == 0:
+        return np.zeros(0)
+
+    # Próximo vértice de cada ponto; o último de cada polígono volta para o primeiro
+    fins = np.append(inicios[1:], len(x))
+    proximo = np.arange(1, len(x) + 1)
+    proximo[fins - 1] = inicios
+
+    produto = x * y[proximo] - x[proximo] * y
+    return np.abs(np.add.reduceat(produto, inicios)) / 2
+
+
+def area_poligono(vertices):
+    vertices = np.asarray(vertices, dtype=float)
+    return float(areas_poligonos(vertices[:, 0], vertices[:, 1], [0])[0])
+
+
+def ler_csv(arquivo):
+    # Um vértice por linha: campo, x, y (em metros, na ordem do contorno).
+    # Colunas opcionais por campo: cultura, insumo.
+    vertices = pd.read_csv(arquivo)
+    campos = vertices["campo"].to_numpy()
+    inicios = np.flatnonzero(np.r_[True, campos[1:] != campos[:-1]])
+
+    tabela = vertices.iloc[inicios].reset_index(drop=True)
+    tabela["vertices"] = np.diff(np.append(inicios, len(vertices)))
+    tabela["area_m2"] = areas_poligonos(vertices["x"], vertices["y"], inicios)
+    return tabela.drop(columns=["x", "y"])
+
+
+def ler_geojson(arquivo):
+    # FeatureCollection com geometrias Polygon (coordenadas projetadas em metros).
+    # Só o anel externo conta; propriedades "nome", "cultura" e "insumo" são opcionais.
+    dados = json.load(arquivo if hasattr(arquivo, "read") else io.open(arquivo, encoding="utf-8"))
+
+    nomes, culturas, insumos, aneis = [], [], [], []
+    for i, feature in enumerate(dados.get("features", [])):
+        geometria = feature.get("geometry") or {}
+        if geometria.get("type") != "Polygon":
+            continue
+        coordenadas = geometria.get("coordinates") or [[]]
+        anel = np.asarray(coordenadas[0], dtype=float)
+        if anel.ndim != 2 or anel.shape[1] < 2:
+            raise ValueError(f"feature {i + 1}: anel externo sem pares de coordenadas")
+        anel = anel[:, :2]
+        if len(anel) > 1 and (anel[0] == anel[-1]).all():
+            anel = anel[:-1]  # GeoJSON repete o primeiro ponto no fim
+        if len(anel) < 3:
+            raise ValueError(f"feature {i + 1}: o polígono precisa de pelo menos 3 vértices")
+        propriedades = feature.get("properties") or {}
+        nomes.append(propriedades.get("nome", f"campo_{i + 1}"))
+        culturas.append(propriedades.get("cultura"))
+        insumos.append(propriedades.get("insumo"))
+        aneis.append(anel)
+
+    tamanhos = np.array([len(anel) for anel in aneis], dtype=np.int64)
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]]) if len(aneis) else np.zeros(0, dtype=np.int64)
+    pontos = np.concatenate(aneis) if aneis else np.zeros((0, 2))
+
+    return pd.DataFrame({
+        "campo": nomes,
+        "cultura": culturas,
+        "insumo": insumos,
+        "vertices": tamanhos,
+        "area_m2": areas_poligonos(pontos[:, 0], pontos[:, 1], inicios),
+    })
+
+
+def calcular_campos(campos, cultura_padrao="Arroz", insumo_padrao="Fertilizante"):
+    # Completa cultura/insumo ausentes e aplica a taxa (500/250) em todos os campos de uma vez
+    from registro_culturas import calcular_aplicacao
+
+    campos = campos.copy()
+    for coluna, padrao in (("cultura", cultura_padrao), ("insumo", insumo_padrao)):
+        if coluna not in campos:
+            campos[coluna] = padrao
+        campos[coluna] = campos[coluna].fillna(padrao)
+    campos["aplicacao_l"] = calcular_aplicacao(campos["area_m2"], campos["insumo"])
+    return campos
@@ -0,0 +1,107 @@
+import time
+from datetime import datetime
+from itertools import islice
+
+import pandas as pd
+
+import banco_dados
+
+# Linhas gravadas por transação
+TAMANHO_LOTE = 5000
+
+# Colunas aceitas no CSV de importação (mesma ordem do INSERT)
+COLUNAS_LEITURA = ["DATA_HORA", "VALOR", "TIPO_MEDICAO", "ID_SENSOR"]
+
+# Formato histórico do dataset_umidade.csv -> colunas de T_LEITURA_SENSOR
+MAPA_DATASET_UMIDADE = {"timestamp": "DATA_HORA", "umidade": "VALOR"}
+
+
+def _novo_relatorio():
+    return {"lidas": 0, "inseridas": 0, "rejeitadas": 0, "segundos": 0.0, "linhas_por_segundo": 0.0}
+
+
+def _fechar_relatorio(relatorio, inicio):
+    relatorio["segundos"] = time.perf_counter() - inicio
+    if relatorio["segundos"] > 0:
+        relatorio["linhas_por_segundo"] = relatorio["inseridas"] / relatorio["segundos"]
+    return relatorio
+
+
+def _gravar_lote(linhas, anterior):
+    # Um lote por operação do escritor único (milhares de linhas, um commit). O lote
+    # seguinte é preparado enquanto este grava; só um fica pendente por vez.
+    futuro = banco_dados.inserir_em_lote(banco_dados.SQL_INSERIR_LEITURA, linhas)
+    if anterior is not None:
+        anterior.result()
+    return futuro
+
+
+def importar_leituras(leituras, tamanho_lote=TAMANHO_LOTE):
+    # Recebe qualquer iterável (lista, gerador, fila de gateway) de tuplas
+    # (id_sensor, tipo_medicao, valor, data_hora) e grava em lotes
+    ids_validos = set(banco_dados.listar_ids_sensores())
+    relatorio = _novo_relatorio()
+    inicio = time.perf_counter()
+    pendente = None
+
+    iterador = iter(leituras)
+    while True:
+        bloco = list(islice(iterador, tamanho_lote))
+        if not bloco:
+            break
+        relatorio["lidas"] += len(bloco)
+
+        agora = datetime.now()
+        linhas = [
+            (data_hora or agora, valor, tipo_medicao, id_sensor)
+            for id_sensor, tipo_medicao, valor, data_hora in bloco
+            if id_sensor in ids_validos and valor is not None
+        ]
+        relatorio["rejeitadas"] += len(bloco) - len(linhas)
+        if linhas:
+            pendente = _gravar_lote(linhas, pendente)
+            relatorio["inseridas"] += len(linhas)
+
+    if pendente is not None:
+        pendente.result()
+    return _fechar_relatorio(relatorio, inicio)
+
+
+def _normalizar_bloco(bloco, id_sensor, tipo_medicao):
+    # Aceita tanto o layout de T_LEITURA_SENSOR quanto o do dataset_umidade.csv
+    bloco = bloco.rename(columns=MAPA_DATASET_UMIDADE)
+    if "ID_SENSOR" not in bloco:
+        bloco["ID_SENSOR"] = id_sensor
+    if "TIPO_MEDICAO" not in bloco:
+        bloco["TIPO_MEDICAO"] = tipo_medicao
+    if "DATA_HORA" not in bloco:
+        bloco["DATA_HORA"] = str(datetime.now())
+    return bloco[COLUNAS_LEITURA]
+
+
+def importar_csv(arquivo, id_sensor=None, tipo_medicao="umidade", tamanho_lote=TAMANHO_LOTE):
+    # Lê o arquivo em blocos (memória constante) e valida ID_SENSOR de forma vetorial.
+    # id_sensor/tipo_medicao preenchem as colunas que faltarem no arquivo.
+    ids_validos = banco_dados.listar_ids_sensores()
+    relatorio = _novo_relatorio()
+    inicio = time.perf_counter()
+    pendente = None
+
+    for bloco in pd.read_csv(arquivo, chunksize=tamanho_lote):
+        relatorio["lidas"] += len(bloco)
+        bloco = _normalizar_bloco(bloco, id_sensor, tipo_medicao)
+        # VALOR não numérico ("n/a"...) vira NaN e conta como rejeitada, em vez de
+        # interromper a importação com os blocos anteriores já gravados
+        bloco["VALOR"] = pd.to_numeric(bloco["VALOR"], errors="coerce")
+
+        validos = bloco["ID_SENSOR"].isin(ids_validos) & bloco["VALOR"].notna()
+        bloco = bloco[validos].astype({"DATA_HORA": str, "VALOR": float, "TIPO_MEDICAO": str, "ID_SENSOR": int})
+        relatorio["rejeitadas"] += int((~validos).sum())
+
+        if not bloco.empty:
+            pendente = _gravar_lote(bloco.itertuples(index=False, name=None), pendente)
+            relatorio["inseridas"] += len(bloco)
+
+    if pendente is not None:
+        pendente.result()
+    return _fechar_relatorio(relatorio, inicio)
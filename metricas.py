@@ -0,0 +1,232 @@
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Instrumentação de desempenho (latências em histogramas na memória do processo).
+# Desligada por padrão: cada ponto instrumentado custa só um teste de `ativo()`.
+# Liga com FARMTECH_METRICAS=1 ou pelo painel de diagnóstico da barra lateral.
+_ativo = os.environ.get("FARMTECH_METRICAS", "0") == "1"
+
+# Prefixo das métricas exportadas para o Prometheus
+PREFIXO = "farmtech"
+
+# Exportação opcional: arquivo .prom (textfile collector) e/ou porta do endpoint /metrics
+ARQUIVO_PROMETHEUS = os.environ.get("FARMTECH_METRICAS_ARQUIVO")
+PORTA_PROMETHEUS = os.environ.get("FARMTECH_METRICAS_PORTA")
+
+# Interface do endpoint /metrics: só localhost, a menos que outra seja pedida (ex.: 0.0.0.0)
+ENDERECO_PROMETHEUS = os.environ.get("FARMTECH_METRICAS_ENDERECO", "127.0.0.1")
+
+# Limites superiores dos baldes (s): de 10 µs a ~100 s, crescendo √2 a cada balde
+LIMITES = tuple(1e-5 * 2 ** (i / 2) for i in range(47))
+
+# Descrição de cada métrica (nome -> ajuda do Prometheus)
+DESCRICOES = {
+    "pagina_render": "Tempo de execução do script do Streamlit por fase",
+    "sql": "Tempo de cada comando SQL executado pelo banco_dados",
+    "modelo_carga": "Tempo de carga de um modelo .pkl",
+    "modelo_predicao": "Tempo de uma chamada de predição",
+    "sns_publicacao": "Tempo de uma chamada PublishBatch ao SNS",
+    "ingestao": "Tempo de um POST /leituras, da chegada ao commit do grupo",
+    "ingestao_commit": "Tempo de um commit em grupo do servidor de ingestão",
+    "escrita_commit": "Tempo de um commit em grupo do escritor único do SQLite",
+    "escrita_espera": "Tempo de uma escrita, do envio à fila até o commit",
+    "exportacao": "Tempo de uma exportação de leituras (CSV/Parquet)",
+    "retencao": "Tempo de uma execução do arquivamento de leituras antigas",
+    "monitor_consulta": "Tempo de uma consulta de leituras novas do gráfico ao vivo",
+}
+
+
+def ativo():
+    return _ativo
+
+
+def ativar(ligado=True):
+    global _ativo
+    _ativo = bool(ligado)
+
+
+class Histograma:
+    # Contagem por balde de latência, no mesmo formato dos histogramas do Prometheus.
+    # Percentis são estimados por interpolação dentro do balde.
+    def __init__(self):
+        self.contagens = [0] * (len(LIMITES) + 1)  # o último balde é +Inf
+        self.soma = 0.0
+        self.total = 0
+        self.maximo = 0.0
+        self._lock = threading.Lock()
+
+    def observar(self, segundos):
+        i = bisect.bisect_left(LIMITES, segundos)
+        with self._lock:
+            self.contagens[i] += 1
+            self.soma += segundos
+            self.total += 1
+            if segundos > self.maximo:
+                self.maximo = segundos
+
+    def percentil(self, p):
+        with self._lock:
+            contagens, total, maximo = list(self.contagens), self.total, self.maximo
+        if total == 0:
+            return 0.0
+        alvo = p / 100 * total
+        acumulado = 0
+        for i, contagem in enumerate(contagens):
+            if contagem and acumulado + contagem >= alvo:
+                inferior = LIMITES[i - 1] if i > 0 else 0.0
+                superior = LIMITES[i] if i < len(LIMITES) else maximo
+                return min(inferior + (superior - inferior) * (alvo - acumulado) / contagem, maximo)
+            acumulado += contagem
+        return maximo
+
+    def resumo(self):
+        return {
+            "n": self.total,
+            "p50_ms": self.percentil(50) * 1000,
+            "p95_ms": self.percentil(95) * 1000,
+            "p99_ms": self.percentil(99) * 1000,
+            "max_ms": self.maximo * 1000,
+            "total_ms": self.soma * 1000,
+        }
+
+
+# (nome, rótulos ordenados) -> Histograma
+_histogramas = {}
+_histogramas_lock = threading.Lock()
+
+
+def observar(nome, segundos, **rotulos):
+    if not _ativo:
+        return
+    chave = (nome, tuple(sorted(rotulos.items())))
+    histograma = _histogramas.get(chave)
+    if histograma is None:
+        with _histogramas_lock:
+            histograma = _histogramas.setdefault(chave, Histograma())
+    histograma.observar(segundos)
+
+
+@contextmanager
+def _cronometro(nome, rotulos):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        observar(nome, time.perf_counter() - inicio, **rotulos)
+
+
+_NADA = nullcontext()
+
+
+def faixa_lote(n):
+    # Rótulo por ordem de grandeza, para não misturar predições unitárias com lotes grandes
+    return "1" if n == 1 else f"<={10 ** len(str(n - 1))}"
+
+
+def medir(nome, **rotulos):
+    # with metricas.medir("modelo_predicao", modelo="risco"): ...
+    return _cronometro(nome, rotulos) if _ativo else _NADA
+
+
+def resumo():
+    # Uma linha por série, para o painel de diagnóstico
+    with _histogramas_lock:
+        itens = list(_histogramas.items())
+    linhas = []
+    for (nome, rotulos), histograma in sorted(itens):
+        linha = {"Métrica": nome, "Rótulos": ", ".join(f"{k}={v}" for k, v in rotulos)}
+        linha.update(histograma.resumo())
+        linhas.append(linha)
+    return linhas
+
+
+def limpar():
+    with _histogramas_lock:
+        _histogramas.clear()
+
+
+# --- EXPORTAÇÃO (formato texto do Prometheus) ---
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos_prometheus(rotulos, extra=()):
+    pares = [f'{k}="{_escapar(v)}"' for k, v in (*rotulos, *extra)]
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def exportar_prometheus():
+    with _histogramas_lock:
+        itens = sorted(_histogramas.items())
+    linhas = []
+    anterior = None
+    for (nome, rotulos), histograma in itens:
+        metrica = f"{PREFIXO}_{nome}_seconds"
+        if nome != anterior:
+            linhas.append(f"# HELP {metrica} {DESCRICOES.get(nome, nome)}")
+            linhas.append(f"# TYPE {metrica} histogram")
+            anterior = nome
+        with histograma._lock:
+            contagens, soma, total = list(histograma.contagens), histograma.soma, histograma.total
+        acumulado = 0
+        for limite, contagem in zip((*LIMITES, math.inf), contagens):
+            acumulado += contagem
+            le = "+Inf" if limite == math.inf else f"{limite:.6g}"
+            linhas.append(f"{metrica}_bucket{_rotulos_prometheus(rotulos, [('le', le)])} {acumulado}")
+        linhas.append(f"{metrica}_sum{_rotulos_prometheus(rotulos)} {soma:.9f}")
+        linhas.append(f"{metrica}_count{_rotulos_prometheus(rotulos)} {total}")
+    return "\n".join(linhas) + "\n"
+
+
+def salvar_prometheus(caminho):
+    # Troca atômica do arquivo (o textfile collector do node_exporter nunca lê pela metade)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(exportar_prometheus())
+    os.replace(temporario, caminho)
+    return caminho
+
+
+_servidor = None
+_servidor_erro = None  # falha ao abrir a porta (não tenta de novo a cada rerun)
+_servidor_lock = threading.Lock()
+
+
+def servir_prometheus(porta, endereco=None):
+    # Endpoint /metrics numa thread própria; só a primeira chamada do processo abre a porta.
+    # Se a porta não abre (já em uso...), devolve None e o motivo fica em erro_prometheus().
+    global _servidor, _servidor_erro
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Metricas(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            corpo = exportar_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    with _servidor_lock:
+        if _servidor is None and _servidor_erro is None:
+            try:
+                _servidor = ThreadingHTTPServer((endereco or ENDERECO_PROMETHEUS, porta), Metricas)
+            except OSError as e:
+                _servidor_erro = f"{endereco or ENDERECO_PROMETHEUS}:{porta}: {e}"
+            else:
+                threading.Thread(target=_servidor.serve_forever, name="metricas-http", daemon=True).start()
+    return _servidor
+
+
+def erro_prometheus():
+    return _servidor_erro
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import threading
+import time
+
+import metricas
+
+# Modelos conhecidos pelo app (nome -> arquivo .pkl)
+ARQUIVOS_MODELOS = {
+    "irrigacao": "modelo_irrigacao.pkl",
+    "risco": "modelo_risco.pkl",
+}
+
+# Versões publicadas pelo retreino: o ponteiro <nome>.atual nesta pasta diz qual
+# arquivo está em uso; sem ponteiro vale o .pkl do repositório (que nunca é sobrescrito)
+PASTA_VERSOES = "versoes_modelos"
+
+# Intervalo mínimo (s) entre duas verificações do arquivo em disco
+INTERVALO_VERIFICACAO = 2.0
+
+# Compila cada modelo carregado em um avaliador NumPy (ver compilacao.py)
+COMPILAR_MODELOS = os.environ.get("FARMTECH_COMPILAR_MODELOS", "1") != "0"
+
+
+def _hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _ponteiro(nome, pasta=PASTA_VERSOES):
+    return os.path.join(pasta, f"{nome}.atual")
+
+
+def apontar_versao(nome, arquivo, pasta=PASTA_VERSOES):
+    # Troca a versão em uso de uma vez (os.replace): o registro percebe na próxima verificação
+    caminho = _ponteiro(nome, pasta)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(arquivo))
+    os.replace(temporario, caminho)
+
+
+class ModeloCarregado:
+    # Uma versão de um modelo já carregado em memória
+    def __init__(self, nome, caminho, modelo, assinatura, sha256, tempo_carga):
+        self.nome = nome
+        self.caminho = caminho
+        self.modelo = modelo
+        self.assinatura = assinatura  # (mtime_ns, tamanho) do arquivo lido
+        self.sha256 = sha256
+        self.tempo_carga = tempo_carga
+        self.carregado_em = time.time()
+        self.verificado_em = time.monotonic()
+        self.compilado = None  # avaliador NumPy equivalente (None: usa o sklearn)
+        self.erro_compilacao = None
+
+    @property
+    def tamanho_arquivo(self):
+        # Tamanho serializado (bytes do .pkl), não a memória ocupada pelo objeto carregado
+        return self.assinatura[1]
+
+    def resumo(self):
+        return {
+            "Modelo": self.nome,
+            "Arquivo": self.caminho,
+            "Classe": type(self.modelo).__name__,
+            "Versão (sha256)": self.sha256[:12],
+            "Carga (ms)": round(self.tempo_carga * 1000, 1),
+            "Arquivo .pkl (MB)": round(self.tamanho_arquivo / 1e6, 2),
+            "Compilado": type(self.compilado).__name__ if self.compilado is not None else "—",
+            "Carregado em": time.strftime("%H:%M:%S", time.localtime(self.carregado_em)),
+        }
+
+
+class RegistroModelos:
+    # Carrega cada .pkl uma vez por processo e troca de versão quando o arquivo muda.
+    # A troca é só a substituição de uma referência no dicionário: quem já pegou
+    # a versão anterior termina a predição com ela, sem esperar nenhum lock.
+
+    def __init__(self, arquivos=None, pasta_versoes=PASTA_VERSOES):
+        self.arquivos = dict(arquivos or ARQUIVOS_MODELOS)
+        self.pasta_versoes = pasta_versoes
+        self._modelos = {}
+        self._locks = {nome: threading.Lock() for nome in self.arquivos}
+
+    def _assinatura(self, caminho):
+        info = os.stat(caminho)
+        return (info.st_mtime_ns, info.st_size)
+
+    def _caminho(self, nome):
+        # Versão publicada (se o ponteiro existir e o arquivo dela também) ou o .pkl original
+        try:
+            with open(_ponteiro(nome, self.pasta_versoes), encoding="utf-8") as f:
+                publicado = os.path.join(self.pasta_versoes, f.read().strip())
+            if os.path.isfile(publicado):
+                return publicado
+        except FileNotFoundError:
+            pass
+        return self.arquivos[nome]
+
+    def _carregar(self, nome, atual):
+        caminho = self._caminho(nome)
+        assinatura = self._assinatura(caminho)
+        sha256 = _hash_arquivo(caminho)
+
+        # Arquivo só foi "tocado": mesma versão, apenas atualiza a assinatura
+        if atual is not None and atual.sha256 == sha256:
+            atual.caminho = caminho
+            atual.assinatura = assinatura
+            atual.verificado_em = time.monotonic()
+            return atual
+
+        import joblib  # importado só aqui: scikit-learn não pesa na partida do app
+
+        inicio = time.perf_counter()
+        modelo = joblib.load(caminho)
+        tempo_carga = time.perf_counter() - inicio
+        metricas.observar("modelo_carga", tempo_carga, modelo=nome)
+
+        novo = ModeloCarregado(nome, caminho, modelo, assinatura, sha256, tempo_carga)
+        if COMPILAR_MODELOS:
+            # A equivalência com o .pkl é conferida fora da carga: tests/test_compilacao.py
+            # e `python compilacao.py` (milhares de linhas, limiares e bordas incluídos)
+            import compilacao
+
+            try:
+                novo.compilado = compilacao.compilar(modelo)
+            except Exception as e:
+                novo.erro_compilacao = str(e)
+        self._modelos[nome] = novo
+        return novo
+
+    def obter_versao(self, nome):
+        atual = self._modelos.get(nome)
+        if atual is not None:
+            if time.monotonic() - atual.verificado_em < INTERVALO_VERIFICACAO:
+                return atual
+            try:
+                caminho = self._caminho(nome)
+                if caminho == atual.caminho and self._assinatura(caminho) == atual.assinatura:
+                    atual.verificado_em = time.monotonic()
+                    return atual
+            except FileNotFoundError:
+                return atual  # arquivo sendo substituído: segue com a versão em memória
+
+        lock = self._locks[nome]
+        if atual is not None:
+            # Já existe uma versão: se outra thread está recarregando, não espera
+            if not lock.acquire(blocking=False):
+                return atual
+        else:
+            lock.acquire()
+        try:
+            return self._carregar(nome, self._modelos.get(nome))
+        finally:
+            lock.release()
+
+    def obter(self, nome):
+        return self.obter_versao(nome).modelo
+
+    def obter_avaliador(self, nome):
+        # Versão compilada quando existe (mesmas predições, sem o overhead do sklearn)
+        versao = self.obter_versao(nome)
+        return versao.compilado if versao.compilado is not None else versao.modelo
+
+    def aquecer(self):
+        # Carrega todos os modelos e faz uma predição descartável em cada um,
+        # para que a primeira interação do usuário não pague esse custo
+        import numpy as np
+
+        for nome in self.arquivos:
+            try:
+                modelo = self.obter(nome)
+                modelo.predict(np.zeros((1, modelo.n_features_in_)))
+                self.obter_avaliador(nome).predict(np.zeros((1, modelo.n_features_in_)))
+            except Exception:
+                pass  # a página mostra o erro quando tentar usar o modelo
+
+    def carregados(self):
+        return [versao.resumo() for versao in self._modelos.values()]
+
+
+# Registro único do processo (compartilhado entre sessões e reruns)
+REGISTRO = RegistroModelos()
+
+_aquecimento_lock = threading.Lock()
+_aquecimento = None
+
+
+def aquecer_em_segundo_plano():
+    # Só a primeira chamada do processo dispara o aquecimento
+    global _aquecimento
+    with _aquecimento_lock:
+        if _aquecimento is None:
+            _aquecimento = threading.Thread(target=REGISTRO.aquecer, name="aquecimento-modelos", daemon=True)
+            _aquecimento.start()
+    return _aquecimento
+
+
+def obter_modelo(nome):
+    return REGISTRO.obter(nome)
+
+
+def obter_avaliador(nome):
+    return REGISTRO.obter_avaliador(nome)
@@ -0,0 +1,154 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import banco_dados
+import metricas
+
+# Pontos guardados por série (sensor + tipo de medição) para o gráfico ao vivo
+TAMANHO_JANELA = 120
+
+# Segundos entre duas consultas de leituras novas
+INTERVALO_CONSULTA = 1.0
+
+# Leituras mais recentes carregadas na primeira consulta (histórico inicial do gráfico)
+HISTORICO_INICIAL = 20_000
+
+# Leituras lidas por comando; uma consulta lê no máximo LOTES_POR_CONSULTA lotes
+TAMANHO_LOTE = 20_000
+LOTES_POR_CONSULTA = 10
+
+# Sem ninguém olhando o gráfico por tanto tempo, a thread de consulta para
+TEMPO_OCIOSO = 60.0
+
+
+class BufferCircular:
+    # Últimas `tamanho` leituras de uma série em arrays de tamanho fixo:
+    # inserir não aloca nada e a memória por série não cresce
+    def __init__(self, tamanho=TAMANHO_JANELA):
+        self.tamanho = tamanho
+        self.ids = np.zeros(tamanho, dtype=np.int64)
+        self.instantes = np.zeros(tamanho, dtype="datetime64[ms]")
+        self.valores = np.zeros(tamanho, dtype=np.float32)
+        self.total = 0  # leituras já inseridas (a próxima vai na posição total % tamanho)
+
+    def adicionar(self, ids, instantes, valores):
+        n = len(ids)
+        if n > self.tamanho:  # só as últimas cabem; as outras seriam sobrescritas
+            ids, instantes, valores = ids[-self.tamanho:], instantes[-self.tamanho:], valores[-self.tamanho:]
+            self.total += n - self.tamanho
+            n = self.tamanho
+        posicoes = (self.total + np.arange(n)) % self.tamanho
+        self.ids[posicoes] = ids
+        self.instantes[posicoes] = instantes
+        self.valores[posicoes] = valores
+        self.total += n
+
+    def dados(self):
+        # Cópia em ordem cronológica (mais antiga primeiro)
+        n = min(self.total, self.tamanho)
+        ordem = (self.total - n + np.arange(n)) % self.tamanho
+        return self.ids[ordem], self.instantes[ordem], self.valores[ordem]
+
+
+class MonitorAoVivo:
+    # Uma thread por processo consulta só as leituras com ID_LEITURA acima do último
+    # visto e distribui nos buffers de cada série. Todas as sessões do Streamlit leem
+    # dos mesmos buffers: dezenas de telas abertas continuam sendo uma consulta por intervalo.
+    def __init__(self, tamanho_janela=TAMANHO_JANELA, intervalo=INTERVALO_CONSULTA):
+        self.tamanho_janela = tamanho_janela
+        self.intervalo = intervalo
+        self.ultimo_id = None
+        self.estatisticas = {}
+        self._buffers = {}  # (ID_SENSOR, TIPO_MEDICAO) -> BufferCircular
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._acesso = 0.0
+
+    def consultar(self):
+        inicio = time.perf_counter()
+        if self.ultimo_id is None:
+            conn = banco_dados.get_db_connection()
+            maximo = conn.execute("SELECT MAX(ID_LEITURA) FROM T_LEITURA_SENSOR").fetchone()[0] or 0
+            self.ultimo_id = max(0, maximo - HISTORICO_INICIAL)
+
+        novas = 0
+        for _ in range(LOTES_POR_CONSULTA):
+            linhas = banco_dados.leituras_novas(self.ultimo_id, TAMANHO_LOTE)
+            if not linhas:
+                break
+            self._distribuir(linhas)
+            self.ultimo_id = linhas[-1][0]
+            novas += len(linhas)
+            if len(linhas) < TAMANHO_LOTE:
+                break
+
+        segundos = time.perf_counter() - inicio
+        metricas.observar("monitor_consulta", segundos)
+        self.estatisticas = {"leituras_novas": novas, "ultimo_id": self.ultimo_id, "series": len(self._buffers),
+                             "segundos": segundos, "em": time.time()}
+        return novas
+
+    def _distribuir(self, linhas):
+        lote = pd.DataFrame(linhas, columns=["ID_LEITURA", "ID_SENSOR", "TIPO_MEDICAO", "DATA_HORA", "VALOR"])
+        ids = lote["ID_LEITURA"].to_numpy(np.int64)
+        instantes = pd.to_datetime(lote["DATA_HORA"], format="ISO8601", errors="coerce").to_numpy("datetime64[ms]")
+        valores = pd.to_numeric(lote["VALOR"], errors="coerce").to_numpy(np.float32)
+        with self._lock:
+            for chave, indices in lote.groupby(["ID_SENSOR", "TIPO_MEDICAO"], sort=False).indices.items():
+                buffer = self._buffers.get(chave)
+                if buffer is None:
+                    buffer = self._buffers[chave] = BufferCircular(self.tamanho_janela)
+                buffer.adicionar(ids[indices], instantes[indices], valores[indices])
+
+    def _executar(self):
+        while time.monotonic() - self._acesso < TEMPO_OCIOSO:
+            try:
+                self.consultar()
+            except Exception as e:
+                self.estatisticas = dict(self.estatisticas, erro=str(e))
+            time.sleep(self.intervalo)
+
+    def _garantir(self):
+        # Marca o acesso e (re)inicia a thread de consulta se ela parou por ociosidade
+        self._acesso = time.monotonic()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self.ultimo_id is None:
+                    self.consultar()  # a primeira tela já abre com o histórico
+                self._thread = threading.Thread(target=self._executar, name="monitor-ao-vivo", daemon=True)
+                self._thread.start()
+
+    def series(self, tipo_medicao=None):
+        # IDs dos sensores com leituras no buffer (de um tipo de medição, se pedido)
+        self._garantir()
+        with self._lock:
+            chaves = list(self._buffers)
+        return sorted(int(sensor) for sensor, tipo in chaves if tipo_medicao is None or tipo == tipo_medicao)
+
+    def serie(self, id_sensor, tipo_medicao):
+        # DataFrame (DATA_HORA, VALOR, ID_LEITURA) da janela atual de uma série
+        self._garantir()
+        with self._lock:
+            buffer = self._buffers.get((id_sensor, tipo_medicao))
+            ids, instantes, valores = buffer.dados() if buffer is not None else (
+                np.zeros(0, np.int64), np.zeros(0, "datetime64[ms]"), np.zeros(0, np.float32))
+        return pd.DataFrame({"DATA_HORA": instantes, "VALOR": valores, "ID_LEITURA": ids})
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def obter_monitor():
+    # Um monitor por processo, compartilhado entre todas as sessões
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = MonitorAoVivo()
+        return _monitor
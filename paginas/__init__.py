@@ -0,0 +1,47 @@
+import importlib
+import sys
+import time
+from collections import deque
+
+import metricas
+
+# Páginas do menu (rótulo -> módulo). Cada módulo só é importado na primeira
+# vez que a página é aberta, junto com as dependências pesadas dele.
+PAGINAS = {
+    "Home": "paginas.home",
+    "Fase 1: Calculo Area": "paginas.fase1_area",
+    "Fase 2: Banco de Dados": "paginas.fase2_banco",
+    "Fase 3: IoT & Sensores": "paginas.fase3_iot",
+    "Fase 4: ML & Decisão": "paginas.fase4_ml",
+    "Fase 5: Cloud AWS": "paginas.fase5_cloud",
+    "Fase 6: Visão Computacional": "paginas.fase6_visao",
+}
+
+# Tempo (ms) de importação de cada página na primeira abertura
+TEMPOS_IMPORTACAO = {}
+
+# Duração (ms) da primeira execução do script no processo (partida a frio)
+INICIALIZACAO_MS = None
+
+# Duração (ms) das últimas execuções do script: (página, ms)
+TEMPOS_EXECUCAO = deque(maxlen=200)
+
+
+def carregar(rotulo):
+    nome = PAGINAS[rotulo]
+    modulo = sys.modules.get(nome)
+    if modulo is None:
+        inicio = time.perf_counter()
+        modulo = importlib.import_module(nome)
+        TEMPOS_IMPORTACAO[rotulo] = (time.perf_counter() - inicio) * 1000
+    return modulo
+
+
+def registrar_execucao(rotulo, inicio):
+    global INICIALIZACAO_MS
+    duracao = (time.perf_counter() - inicio) * 1000
+    if INICIALIZACAO_MS is None:
+        INICIALIZACAO_MS = duracao
+    TEMPOS_EXECUCAO.append((rotulo, duracao))
+    metricas.observar("pagina_render", duracao / 1000, pagina=rotulo)
+    return duracao
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+from paginas import PAGINAS
+
+# Mede, em processos novos, quanto custa importar o app base e cada página a frio:
+#   python -m paginas
+
+_MEDIR = "import time; t = time.perf_counter(); import {modulo}; print((time.perf_counter() - t) * 1000)"
+
+
+def medir(modulo):
+    saida = subprocess.run([sys.executable, "-c", _MEDIR.format(modulo=modulo)], capture_output=True, text=True)
+    return float(saida.stdout.strip().splitlines()[-1]) if saida.returncode == 0 else float("nan")
+
+
+def main():
+    base = medir("streamlit")
+    print(f"{'streamlit (base)':<32}{base:>10.1f} ms")
+    for rotulo, modulo in PAGINAS.items():
+        print(f"{rotulo:<32}{medir('streamlit, ' + modulo) - base:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
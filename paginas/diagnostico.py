@@ -0,0 +1,40 @@
+import streamlit as st
+import pandas as pd
+
+import banco_dados
+import metricas
+
+
+# --- DIAGNÓSTICO DE DESEMPENHO (barra lateral) ---
+def exibir_painel():
+    if metricas.PORTA_PROMETHEUS and metricas.servir_prometheus(int(metricas.PORTA_PROMETHEUS)) is None:
+        st.sidebar.warning(f"Endpoint /metrics não iniciado ({metricas.erro_prometheus()}).")
+
+    with st.sidebar.expander("📈 Diagnóstico de Desempenho"):
+        ligado = st.toggle("Coletar métricas", value=metricas.ativo(),
+                           help="Tempos de página, SQL, modelos e SNS (vale para todo o servidor).")
+        if ligado != metricas.ativo():
+            metricas.ativar(ligado)
+
+        escrita = banco_dados.estatisticas_escrita()
+        if escrita is not None:
+            st.caption(f"Escritor SQLite: fila {escrita['fila']} · {escrita['commits']} commits · "
+                       f"{escrita['operacoes']} operações · p99 do commit "
+                       f"{escrita.get('commit_p99_ms', 0):.1f} ms")
+
+        linhas = metricas.resumo()
+        if not linhas:
+            st.caption("Nenhuma medição ainda." if ligado else "Coleta desligada.")
+            return
+
+        tabela = pd.DataFrame(linhas).sort_values("total_ms", ascending=False)
+        st.dataframe(tabela.round(2), use_container_width=True, hide_index=True)
+
+        texto = metricas.exportar_prometheus()
+        if metricas.ARQUIVO_PROMETHEUS and ligado:
+            metricas.salvar_prometheus(metricas.ARQUIVO_PROMETHEUS)
+        col1, col2 = st.columns(2)
+        col1.download_button("Prometheus", texto, file_name="farmtech.prom", mime="text/plain")
+        if col2.button("Zerar"):
+            metricas.limpar()
+            st.rerun()
@@ -0,0 +1,185 @@
+import time
+
+import streamlit as st
+import numpy as np
+
+import custos
+import geometria
+import registro_culturas  # tabela T_CULTURA, persistente e compartilhada entre sessões
+
+
+# --- FASE 1: DADOS E METEOROLOGIA ---
+def exibir():
+    st.header("🌦️ Fase 1: Gestão Inicial & Análise")
+    st.markdown("Integração dos scripts de Gestão Agrícola (Python) e Cálculo de Custos (Lógica R).")
+
+    # Criando abas para separar os dois códigos que você mandou
+    tab_gestao, tab_analise = st.tabs(["🌱 Gestão Agrícola (CRUD)", "📊 Análise Financeira (R)"])
+
+    # --- TAB 1: O CÓDIGO PYTHON ---
+    with tab_gestao:
+        st.subheader("Gestão Agrícola FarmTech 2025®")
+        
+        # Formulário de Cadastro 
+        with st.expander("📝 Cadastrar Nova Cultura", expanded=True):
+            col1, col2 = st.columns(2)
+            with col1:
+                cultura_opt = st.selectbox("Selecione a Cultura:", ["Arroz", "Feijão"])
+                insumo_opt = st.selectbox("Insumo:", ["Fertilizante", "Pesticida"])
+            
+            with col2:
+                tipo_geo = st.selectbox("Formato da Área:", ["Retângulo", "Círculo", "Trapézio"])
+                
+                # Inputs dinâmicos baseados na geometria
+                area_calc = 0.0
+                if tipo_geo == "Retângulo":
+                    l = st.number_input("Largura (m)", min_value=0.0)
+                    c = st.number_input("Comprimento (m)", min_value=0.0)
+                    area_calc = float(geometria.area_retangulo(l, c))
+                elif tipo_geo == "Círculo":
+                    r = st.number_input("Raio (m)", min_value=0.0)
+                    area_calc = float(geometria.area_circulo(r))
+                elif tipo_geo == "Trapézio":
+                    B = st.number_input("Base Maior (m)", min_value=0.0)
+                    b = st.number_input("Base Menor (m)", min_value=0.0)
+                    h = st.number_input("Altura (m)", min_value=0.0)
+                    area_calc = float(geometria.area_trapezio(B, b, h))
+            
+            st.info(f"Área Calculada: {area_calc:.2f} m²")
+
+            if st.button("Salvar Registro"):
+                if area_calc > 0:
+                    # Lógica de Aplicação (taxa por insumo) e gravação do registro
+                    registro_culturas.adicionar(cultura_opt, area_calc, insumo_opt)
+                    st.success(f"{cultura_opt} cadastrado com sucesso!")
+                    time.sleep(1) 
+                    st.rerun()
+                else:
+                    st.error("A área deve ser maior que zero.")
+
+        # Campos irregulares: área de todos os polígonos do arquivo calculada de uma vez
+        with st.expander("🗺️ Campos Irregulares (Polígonos)"):
+            st.caption("CSV com um vértice por linha (campo, x, y e, opcionais, cultura, insumo) "
+                       "ou GeoJSON com polígonos. Coordenadas em metros.")
+            arquivo_campos = st.file_uploader("Arquivo de Campos", type=["csv", "geojson", "json"])
+            g1, g2 = st.columns(2)
+            campos_cultura = g1.selectbox("Cultura (se ausente):", ["Arroz", "Feijão"])
+            campos_insumo = g2.selectbox("Insumo (se ausente):", ["Fertilizante", "Pesticida"])
+
+            if arquivo_campos is not None:
+                try:
+                    if arquivo_campos.name.endswith(".csv"):
+                        campos = geometria.ler_csv(arquivo_campos)
+                    else:
+                        campos = geometria.ler_geojson(arquivo_campos)
+                    campos = geometria.calcular_campos(campos, campos_cultura, campos_insumo)
+                except (KeyError, ValueError) as e:
+                    st.error(f"Arquivo de campos inválido: {e}")
+                else:
+                    k1, k2, k3 = st.columns(3)
+                    k1.metric("Campos", f"{len(campos):,}")
+                    k2.metric("Área Total", f"{campos['area_m2'].sum():,.2f} m²")
+                    k3.metric("Aplicação Total", f"{campos['aplicacao_l'].sum():,.2f} L")
+                    st.dataframe(campos.head(1000), use_container_width=True, hide_index=True)
+
+                    if st.button("Salvar Campos no Registro"):
+                        gravados = registro_culturas.adicionar_lote(campos["cultura"], campos["area_m2"], campos["insumo"])
+                        st.success(f"{gravados} campos cadastrados com sucesso!")
+
+        # Importação em lote (Aplicacao_L calculada para o arquivo inteiro de uma vez)
+        with st.expander("📥 Importar Culturas (CSV)"):
+            st.caption("Colunas: Cultura, Area_m2, Insumo (Fertilizante ou Pesticida).")
+            arquivo_culturas = st.file_uploader("Arquivo de Culturas", type=["csv"])
+            if arquivo_culturas is not None and st.button("Importar Culturas"):
+                relatorio = registro_culturas.importar(arquivo_culturas)
+                st.success(f"{relatorio['inseridas']} culturas importadas em {relatorio['segundos']:.2f} s.")
+                if relatorio["rejeitadas"]:
+                    st.warning(f"{relatorio['rejeitadas']} linhas rejeitadas (área inválida ou insumo desconhecido).")
+
+        # Visualização e Exclusão 
+        st.divider()
+        st.subheader("📋 Culturas Cadastradas")
+        
+        totais = registro_culturas.totais()
+        if totais["registros"]:
+            t1, t2, t3 = st.columns(3)
+            t1.metric("Registros", f"{totais['registros']:,}")
+            t2.metric("Área Total", f"{totais['area_m2']:,.2f} m²")
+            t3.metric("Aplicação Total", f"{totais['aplicacao_l']:,.2f} L")
+
+            # Só as últimas linhas são carregadas para exibição
+            st.dataframe(registro_culturas.listar(), use_container_width=True)
+            if totais["registros"] > 1000:
+                st.caption("Exibindo os 1.000 registros mais recentes.")
+            
+            # T_CULTURA é compartilhada: limpar apaga os registros de todas as sessões,
+            # então o botão só libera depois da confirmação
+            confirmar = st.checkbox("Confirmo que quero apagar os registros de todos os usuários")
+            if st.button("🗑️ Excluir Todos os Registros (todas as sessões)", disabled=not confirmar):
+                registro_culturas.excluir_todos()
+                st.rerun()
+        else:
+            st.warning("Nenhuma cultura cadastrada.")
+
+    # --- TAB 2: O CÓDIGO R  ---
+    with tab_analise:
+        st.subheader("Cálculo de Gastos e Estatística (Lógica R)")
+        st.caption("Implementação da lógica estatística definida no script R da Fase 1.")
+        
+        col_r1, col_r2 = st.columns(2)
+        
+        with col_r1:
+            r_cultura = st.radio("Cultura (R):", ["Arroz", "Feijão"], horizontal=True)
+            r_insumo = st.radio("Insumo (R):", ["Fertilizante", "Pesticida"], horizontal=True)
+        
+        with col_r2:
+            r_litros_txt = st.text_area("Digite os valores de consumo de litros (separados por espaço):", "10 20 15 30 12")
+            r_arquivo = st.file_uploader("Ou envie um arquivo de consumo (.txt/.csv):", type=["txt", "csv"])
+
+        r_cenarios = st.multiselect("Cenários de Preço:", list(custos.CENARIOS_PRECO), default=["Base"])
+        
+        if st.button("Calcular Estatísticas"):
+            try:
+                # 1. Parsing dos Inputs (arquivos grandes são lidos em blocos)
+                if r_arquivo is not None:
+                    blocos = custos.ler_consumo(r_arquivo)
+                    litros = None
+                else:
+                    litros = np.array(r_litros_txt.split(), dtype=float)
+                    blocos = [litros]
+
+                # 2. Todas as combinações cultura x insumo x cenário de uma vez
+                cenarios = {nome: custos.CENARIOS_PRECO[nome] for nome in set(r_cenarios) | {"Base"}}
+                tabela = custos.analisar(blocos, cenarios=cenarios)
+
+                # 3. Par escolhido no cenário base
+                escolhido = tabela[(tabela["cultura"] == r_cultura) & (tabela["insumo"] == r_insumo)
+                                   & (tabela["cenario"] == "Base")].iloc[0]
+                ciclo = escolhido["ciclo"]
+                media = escolhido["media"]
+                excedente = escolhido["excedente"]
+                gasto_total = escolhido["gasto_total"]
+                
+                # 4. Exibição dos Resultados 
+                st.divider()
+                st.markdown(f"### 📑 Resultados para {r_cultura}")
+                
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Ciclo de Plantio", f"{ciclo} dias")
+                m2.metric("Média Anual", f"{media} L")
+                m3.metric("Custo Total", f"R$ {gasto_total:,.2f}")
+                
+                st.info(f"**Desvio (Excedente):** {excedente:.2f} litros além da média.")
+
+                # Comparativo entre todos os cenários
+                st.markdown("#### ⚖️ Comparativo de Cenários")
+                st.dataframe(tabela[tabela["cenario"].isin(r_cenarios or ["Base"])],
+                             use_container_width=True, hide_index=True)
+                
+                # Gráfico extra 
+                if litros is not None:
+                    st.bar_chart(custos.litros_anuais(litros, r_cultura))
+                    st.caption("Distribuição dos Litros Anuais Calculados")
+
+            except ValueError:
+                st.error("Erro na entrada de dados! Certifique-se de usar apenas números separados por espaço.")
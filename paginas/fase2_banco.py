@@ -0,0 +1,243 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import streamlit as st
+import pandas as pd
+
+# Conexão por thread para leitura, WAL e um escritor único (as escritas devolvem Futures)
+import banco_dados
+import exportacao
+import retencao
+from ingestao import importar_csv
+
+
+# --- FASE 2: BANCO DE DADOS (SQLite) ---
+def exibir():
+    st.header("🗄️ Fase 2: Banco de Dados Estruturado (SQLite)")
+    st.markdown("Gerenciamento de Sensores e Leituras com persistência de dados em arquivo `.db`.")
+
+    # --- INTERFACE (Frontend) ---
+    tab_sensores, tab_leituras, tab_historico, tab_exportar = st.tabs(
+        ["📡 Gerenciar Sensores", "📈 Gerenciar Leituras", "📊 Histórico Agregado", "📤 Exportar"])
+
+    # === ABA 1: SENSORES ===
+    with tab_sensores:
+        st.subheader("Cadastro de Sensores")
+        
+        with st.form("form_sensor"):
+            col1, col2 = st.columns(2)
+            input_tipo = col1.selectbox("Tipo do Sensor", ["Umidade (DHT22)", "Temperatura (DHT22)", "Nutrientes (NPK)", "pH Solo"])
+            input_status = col2.selectbox("Status", ["Ativo", "Inativo", "Manutenção"])
+            input_plantacao = st.number_input("ID da Plantação", min_value=1, value=101)
+            
+            btn_sensor = st.form_submit_button("Inserir Sensor")
+            
+            if btn_sensor:
+                banco_dados.inserir_sensor(input_tipo, input_status, input_plantacao).result()
+                st.success("Sensor inserido com sucesso!")
+                st.rerun()
+
+        st.divider()
+        st.subheader("Sensores Cadastrados")
+        df_sensores = banco_dados.listar_sensores()
+        st.dataframe(df_sensores, use_container_width=True)
+
+    # === ABA 2: LEITURAS (CRUD) ===
+    with tab_leituras:
+        st.subheader("Operações de Leitura (CRUD)")
+        
+        # Carregar IDs de sensores existentes para o selectbox
+        lista_ids = banco_dados.listar_ids_sensores()
+
+        col_crud1, col_crud2 = st.columns([1, 2])
+
+        # Coluna da Esquerda: Formulários de Ação
+        with col_crud1:
+            acao = st.radio("Escolha a Operação:", ["Inserir Nova Leitura", "Importar Lote (CSV)", "Atualizar Valor", "Deletar Leitura"])
+            
+            if acao == "Inserir Nova Leitura":
+                if not lista_ids:
+                    st.warning("Cadastre um sensor primeiro!")
+                else:
+                    sel_sensor = st.selectbox("ID do Sensor", lista_ids)
+                    sel_tipo = st.selectbox("Tipo Medição", ["umidade", "temperatura", "fosforo", "potassio", "pH"])
+                    val_leitura = st.number_input("Valor Medido", format="%.2f")
+                    
+                    if st.button("Salvar Leitura"):
+                        banco_dados.inserir_leitura(sel_sensor, sel_tipo, val_leitura).result()
+                        st.success("Leitura salva!")
+                        time.sleep(0.5)
+                        st.rerun()
+
+            elif acao == "Importar Lote (CSV)":
+                if not lista_ids:
+                    st.warning("Cadastre um sensor primeiro!")
+                else:
+                    st.caption("Colunas aceitas: DATA_HORA, VALOR, TIPO_MEDICAO, ID_SENSOR "
+                               "(ou o formato do dataset_umidade.csv: timestamp, umidade).")
+                    arquivo_csv = st.file_uploader("Arquivo de Leituras (.csv)", type=["csv"])
+                    lote_sensor = st.selectbox("ID do Sensor (se ausente no arquivo)", lista_ids)
+                    lote_tipo = st.selectbox("Tipo Medição (se ausente no arquivo)", ["umidade", "temperatura", "fosforo", "potassio", "pH"])
+
+                    if arquivo_csv is not None and st.button("Importar Leituras"):
+                        with st.spinner("Importando leituras..."):
+                            relatorio = importar_csv(arquivo_csv, id_sensor=lote_sensor, tipo_medicao=lote_tipo)
+                        st.success(f"{relatorio['inseridas']} leituras importadas "
+                                   f"({relatorio['linhas_por_segundo']:,.0f} linhas/s).")
+                        if relatorio["rejeitadas"]:
+                            st.warning(f"{relatorio['rejeitadas']} linhas rejeitadas (sensor inexistente ou valor vazio).")
+
+            elif acao == "Atualizar Valor":
+                id_upd = st.number_input("ID da Leitura para Atualizar", min_value=1, step=1)
+                novo_valor = st.number_input("Novo Valor", format="%.2f")
+                if st.button("Atualizar"):
+                    if banco_dados.atualizar_leitura(id_upd, novo_valor).result():
+                        st.success("Atualizado!")
+                    else:
+                        st.error(f"Leitura {id_upd} não encontrada.")
+                    time.sleep(0.5)
+                    st.rerun()
+
+            elif acao == "Deletar Leitura":
+                id_del = st.number_input("ID da Leitura para Deletar", min_value=1, step=1)
+                if st.button("Deletar", type="primary"):
+                    if banco_dados.deletar_leitura(id_del).result():
+                        st.warning("Deletado!")
+                    else:
+                        st.error(f"Leitura {id_del} não encontrada.")
+                    time.sleep(0.5)
+                    st.rerun()
+
+        # Coluna da Direita: Visualização da Tabela
+        with col_crud2:
+            st.write("### 📋 Registros Atuais")
+
+            # Filtros aplicados direto no SQL (usam os índices da migração)
+            f1, f2, f3 = st.columns(3)
+            filtro_sensor = f1.selectbox("Sensor", ["Todos"] + lista_ids)
+            filtro_tipo = f2.selectbox("Medição", ["Todas", "umidade", "temperatura", "fosforo", "potassio", "pH"])
+            filtro_datas = f3.date_input("Período", value=())
+
+            filtros = {
+                "id_sensor": None if filtro_sensor == "Todos" else filtro_sensor,
+                "tipo_medicao": None if filtro_tipo == "Todas" else filtro_tipo,
+            }
+            if len(filtro_datas) == 2:
+                filtros["data_inicio"] = datetime.combine(filtro_datas[0], datetime.min.time())
+                filtros["data_fim"] = datetime.combine(filtro_datas[1] + timedelta(days=1), datetime.min.time())
+
+            # Pilha de cursores: o topo é o ID_LEITURA a partir do qual a página atual começa
+            if st.session_state.get("filtros_leituras") != filtros:
+                st.session_state.filtros_leituras = filtros
+                st.session_state.cursores_leituras = [None]
+            cursores = st.session_state.cursores_leituras
+
+            # Join para mostrar qual sensor é (opcional, mas fica bonito).
+            # Com um período escolhido, as leituras já arquivadas entram na página.
+            try:
+                if "data_inicio" in filtros:
+                    df_leituras = retencao.buscar_historico(antes_de=cursores[-1], **filtros)
+                else:
+                    df_leituras = banco_dados.buscar_leituras(antes_de=cursores[-1], **filtros)
+                    if os.path.isdir(retencao.PASTA_ARQUIVO):
+                        st.caption("Sem período escolhido, só as leituras no banco; escolha datas para incluir as arquivadas.")
+                st.dataframe(df_leituras, use_container_width=True, height=400)
+            except:
+                df_leituras = pd.DataFrame()
+                st.info("Nenhuma leitura registrada ainda.")
+
+            p1, p2, p3 = st.columns([1, 1, 2])
+            if p1.button("⬅️ Anterior", disabled=len(cursores) == 1):
+                cursores.pop()
+                st.rerun()
+            if p2.button("Próxima ➡️", disabled=len(df_leituras) < banco_dados.TAMANHO_PAGINA):
+                cursores.append(int(df_leituras["ID_LEITURA"].iloc[-1]))
+                st.rerun()
+            p3.caption(f"Página {len(cursores)}")
+
+    # === ABA 3: HISTÓRICO (lido das tabelas de agregados, não das leituras brutas) ===
+    with tab_historico:
+        st.subheader("Histórico Agregado por Período")
+
+        h1, h2, h3 = st.columns(3)
+        hist_granularidade = h1.selectbox("Granularidade", ["hora", "dia", "minuto"])
+        hist_sensor = h2.selectbox("Sensor ", ["Todos"] + banco_dados.listar_ids_sensores())
+        hist_tipo = h3.selectbox("Medição ", ["umidade", "temperatura", "fosforo", "potassio", "pH"])
+
+        df_hist = banco_dados.buscar_agregados(
+            hist_granularidade,
+            id_sensor=None if hist_sensor == "Todos" else hist_sensor,
+            tipo_medicao=hist_tipo,
+        )
+
+        if df_hist.empty:
+            st.info("Nenhuma leitura agregada para esse filtro.")
+        else:
+            st.line_chart(df_hist.set_index("INICIO")[["MINIMO", "MEDIA", "MAXIMO"]])
+            st.dataframe(df_hist, use_container_width=True, height=300)
+
+    # === ABA 4: EXPORTAÇÃO (lida do banco em blocos, memória constante) ===
+    with tab_exportar:
+        st.subheader("Exportar Leituras")
+
+        e1, e2, e3, e4 = st.columns(4)
+        exp_sensor = e1.selectbox("Sensor  ", ["Todos"] + banco_dados.listar_ids_sensores())
+        exp_tipo = e2.selectbox("Medição  ", ["Todas", "umidade", "temperatura", "fosforo", "potassio", "pH"])
+        exp_datas = e3.date_input("Período ", value=())
+        exp_formato = e4.selectbox("Formato", list(exportacao.FORMATOS))
+
+        filtros_exp = {
+            "id_sensor": None if exp_sensor == "Todos" else exp_sensor,
+            "tipo_medicao": None if exp_tipo == "Todas" else exp_tipo,
+        }
+        if len(exp_datas) == 2:
+            filtros_exp["data_inicio"] = str(datetime.combine(exp_datas[0], datetime.min.time()))
+            filtros_exp["data_fim"] = str(datetime.combine(exp_datas[1] + timedelta(days=1), datetime.min.time()))
+
+        # Com o endpoint de streaming ligado, o navegador baixa direto dele (bloco a bloco);
+        # sem ele, o arquivo é gerado em disco só quando o botão é clicado
+        url = exportacao.url_download(exp_formato, **filtros_exp)
+        if url and exportacao.servir(int(exportacao.PORTA_EXPORTACAO)) is None:
+            st.warning(f"Download em streaming indisponível ({exportacao.erro_servidor()}).")
+            url = None
+        if url:
+            st.link_button("⬇️ Baixar (streaming)", url)
+        else:
+            st.download_button(
+                "⬇️ Baixar",
+                data=lambda: exportacao.exportar_para_arquivo_temporario(exp_formato, **filtros_exp),
+                file_name=exportacao.nome_arquivo(exp_formato, **filtros_exp),
+                mime=exportacao.FORMATOS[exp_formato],
+                on_click="ignore",
+            )
+            st.caption("Para arquivos muito grandes, ligue o download em streaming com "
+                       "FARMTECH_EXPORTACAO_PORTA ou use `python exportacao.py`.")
+
+        if exportacao.RELATORIOS:
+            ultimo = exportacao.RELATORIOS[-1]
+            st.caption(f"Última exportação: {ultimo['linhas']:,} leituras ({ultimo['formato']}, "
+                       f"{ultimo['bytes'] / 1e6:.1f} MB) em {ultimo['segundos']:.2f} s · "
+                       f"{ultimo['linhas_por_segundo']:,.0f} linhas/s")
+
+        # Leituras antigas saem do SQLite para Parquet (mês/sensor); a exportação acima já as inclui
+        with st.expander("🗃️ Retenção e Arquivo"):
+            resumo_arquivo = retencao.resumo()
+            r1, r2, r3 = st.columns(3)
+            r1.metric("Leituras arquivadas", f"{resumo_arquivo['linhas_arquivadas']:,}")
+            r2.metric("Arquivo (Parquet)", f"{resumo_arquivo['mb_arquivo']:.1f} MB")
+            r3.metric("Banco (SQLite)", f"{resumo_arquivo['mb_banco']:.1f} MB")
+            if not resumo_arquivo["vacuum_incremental"]:
+                st.caption("Vacuum incremental desligado neste banco: rode "
+                           "`python retencao.py --converter-vacuum` uma vez para o arquivo encolher.")
+
+            dias = st.number_input("Arquivar leituras com mais de (dias)", min_value=1,
+                                   value=retencao.IDADE_MAXIMA_DIAS)
+            if st.button("Arquivar agora"):
+                with st.spinner("Arquivando leituras antigas..."):
+                    relatorio = retencao.arquivar(dias)
+                if relatorio["status"] != "concluído":
+                    st.info("Já existe um arquivamento em andamento.")
+                else:
+                    st.success(f"{relatorio['arquivadas']:,} leituras arquivadas em {relatorio['segundos']:.1f} s "
+                               f"({relatorio['linhas_por_segundo']:,.0f} linhas/s).")
@@ -0,0 +1,129 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+import monitor_ao_vivo
+from envio_alerta import LIMITE_UMIDADE  # regra única da bomba (< 40%)
+
+# Medições do gráfico ao vivo (TIPO_MEDICAO -> legenda)
+MEDICOES = {"umidade": "Umidade", "pH": "pH", "fosforo": "Fósforo", "potassio": "Potássio"}
+
+
+# --- FASE 3: IOT E AUTOMAÇÃO ---
+def exibir():
+    st.header("📡 Fase 3: Monitoramento IoT & Controle")
+    st.markdown("Interface de Gêmeo Digital: Simula a lógica do firmware ESP32 em tempo real.")
+
+    # Layout: Coluna da Esquerda (Simulador Físico) | Coluna da Direita (Painel de Monitoramento)
+    col_simulacao, col_painel = st.columns([1, 2])
+
+    with col_simulacao:
+        st.subheader("🎛️ Simulador de Hardware")
+        st.caption("Ajuste os valores como se fossem os sensores físicos:")
+        
+        # 1. Simula o DHT22 (Umidade)
+        # No C++: float umidade = dht.readHumidity();
+        input_umidade = st.slider("Umidade do Solo (%)", min_value=0.0, max_value=100.0, value=50.0, step=0.1)
+        
+        # 2. Simula o sensor de pH (LDR)
+        # No C++: int ph = analogRead(SENSOR_PH); (0 a 4095 no ESP32)
+        input_ph_raw = st.slider("Leitura pH (LDR / Analógico)", 0, 4095, 2000)
+        
+        # 3. Simula os Botões de Nutrientes
+        # No C++: digitalRead(...) == LOW;
+        st.markdown("**Sensores de Nutrientes**")
+        tem_fosforo = st.checkbox("Fósforo Presente?", value=True)
+        tem_potassio = st.checkbox("Potássio Presente?", value=True)
+
+    with col_painel:
+        st.subheader("📊 Painel de Controle (Dashboard)")
+        
+        # --- LÓGICA DO FIRMWARE TRADUZIDA PARA PYTHON ---
+        # No C++: if (umidade < 40.0) { digitalWrite(LED_BOMBA, HIGH); }
+        estado_bomba = "DESLIGADA"
+        cor_bomba = "off" # cinza
+        
+        if input_umidade < LIMITE_UMIDADE:
+            estado_bomba = "LIGADA 💧"
+            cor_bomba = "normal" # verde no st.metric não tem cor direta, mas usamos delta
+            delta_bomba = "Ativa"
+            msg_bomba = "⚠️ Umidade Crítica! Bomba acionada automaticamente."
+            tipo_msg = st.warning
+        else:
+            delta_bomba = "Inativa"
+            msg_bomba = "✅ Umidade adequada. Bomba em stand-by."
+            tipo_msg = st.success
+
+        # Exibição dos Cards (Metrics)
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Umidade Atual", f"{input_umidade:.1f}%", delta="- Seco" if input_umidade < LIMITE_UMIDADE else "+ Úmido")
+        
+        # Conversão visual simples do LDR para escala 0-14 (apenas estimativa visual)
+        # Supondo que 0=Ácido(0) e 4095=Alcalino(14)
+        ph_estimado = (input_ph_raw / 4095) * 14
+        m2.metric("Nível pH (Est.)", f"{ph_estimado:.1f}", delta=f"Raw: {input_ph_raw}")
+        
+        m3.metric("Status Bomba", estado_bomba, delta=delta_bomba, delta_color="inverse" if input_umidade < LIMITE_UMIDADE else "normal")
+
+        # Exibição do Alerta da Bomba
+        tipo_msg(msg_bomba)
+
+        st.divider()
+
+        # --- MONITOR DE NUTRIENTES ---
+        st.write("#### 🧪 Monitor de Nutrientes")
+        
+        c_fos, c_pot = st.columns(2)
+        
+        # Lógica C++: if (!fosforo) Serial.println("Alerta...");
+        with c_fos:
+            if tem_fosforo:
+                st.success("Fósforo (P): **OK**")
+            else:
+                st.error("Fósforo (P): **AUSENTE!**")
+                st.caption("Ação: Aplicar fertilizante rico em P.")
+
+        with c_pot:
+            if tem_potassio:
+                st.success("Potássio (K): **OK**")
+            else:
+                st.error("Potássio (K): **AUSENTE!**")
+                st.caption("Ação: Aplicar fertilizante rico em K.")
+
+    # Gráfico em tempo real: só este trecho é reexecutado a cada intervalo
+    st.divider()
+    _serial_plotter(input_umidade)
+
+
+@st.fragment(run_every=monitor_ao_vivo.INTERVALO_CONSULTA)
+def _serial_plotter(input_umidade):
+    # As leituras vêm do monitor compartilhado do processo (uma consulta por intervalo
+    # para todas as sessões); trocar sensor ou medição reexecuta só o fragmento
+    monitor = monitor_ao_vivo.obter_monitor()
+    col_tipo, col_sensor = st.columns(2)
+    tipo = col_tipo.selectbox("Medição", MEDICOES, format_func=MEDICOES.get, key="fase3_medicao")
+    sensores = monitor.series(tipo)
+
+    if not sensores:
+        st.caption("Simulação do Serial Plotter (nenhuma leitura no banco ainda)")
+        # Criando dados aleatórios próximos do valor selecionado para dar efeito de "leitura real"
+        dados_grafico = pd.DataFrame({
+            'Umidade': [input_umidade + np.random.uniform(-1, 1) for _ in range(20)],
+            'Linha de Corte': [LIMITE_UMIDADE] * 20
+        })
+        st.line_chart(dados_grafico, color=["#3366cc", "#ff0000"])
+        return
+
+    id_sensor = col_sensor.selectbox("Sensor", sensores, key="fase3_sensor")
+    serie = monitor.serie(id_sensor, tipo)
+    dados_grafico = pd.DataFrame({MEDICOES[tipo]: serie["VALOR"].to_numpy()}, index=serie["DATA_HORA"])
+    if tipo == "umidade":
+        dados_grafico["Linha de Corte"] = LIMITE_UMIDADE
+        st.line_chart(dados_grafico, color=["#3366cc", "#ff0000"])
+    else:
+        st.line_chart(dados_grafico)
+
+    estatisticas = monitor.estatisticas
+    st.caption(f"Serial Plotter ao vivo: sensor {id_sensor}, últimas {len(serie)} leituras · "
+               f"{estatisticas.get('leituras_novas', 0)} novas na última consulta "
+               f"(até ID {estatisticas.get('ultimo_id')}, {estatisticas.get('segundos', 0) * 1000:.1f} ms)")
@@ -0,0 +1,126 @@
+import streamlit as st
+import pandas as pd
+
+import compilacao
+import dataset_umidade
+import metricas
+import risco
+import treino_irrigacao
+from decisao_irrigacao import decidir_plantacoes, resumo_latencias
+from envio_alerta import LIMITE_UMIDADE  # regra única da bomba (< 40%)
+from modelos import REGISTRO, obter_avaliador
+
+
+# --- FASE 4: MACHINE LEARNING ---
+def exibir():
+    # 1. Título e Descrição (Adaptado do seu st.title)
+    st.header("💧 Previsão de Irrigação - FarmTech Solutions")
+    st.markdown("Este sistema decide se é necessário irrigar com base na umidade do solo.")
+
+    # 2. Carregar modelo (Com proteção para não travar o app se faltar o arquivo)
+    # O registro mantém o modelo em memória entre reruns e recarrega se o .pkl mudar;
+    # quando compilado, a regressão logística vira um limite de umidade pré-calculado
+    modelo = None
+    try:
+        modelo = obter_avaliador("irrigacao")
+    except FileNotFoundError:
+        st.error("⚠️ O arquivo 'modelo_irrigacao.pkl' não foi encontrado na pasta.")
+    except Exception as e:
+        st.error(f"Erro ao carregar modelo: {e}")
+
+    # 3. Entrada manual
+    umidade = st.slider("Umidade do Solo (%)", min_value=0.0, max_value=100.0, step=0.1)
+
+    # 4. Previsão
+    if st.button("Verificar Necessidade de Irrigação"):
+        if modelo is not None:
+            # Seu código original de predição
+            with metricas.medir("modelo_predicao", modelo="irrigacao", lote="1"):
+                if isinstance(modelo, compilacao.LimiarUmidade):
+                    resultado = int(modelo.decisao(umidade))
+                else:
+                    resultado = modelo.predict([[umidade]])[0]
+            
+            if resultado == 1:
+                st.warning("🚨 Irrigação Necessária!")
+            else:
+                st.success("✅ Solo não precisa ser irrigado.")
+        else:
+            # Fallback caso o modelo não tenha carregado
+            st.info("O modelo não está carregado, mas baseado na regra (Umidade < 40%):")
+            if umidade < LIMITE_UMIDADE:
+                st.warning("🚨 Irrigação Necessária! (Simulação)")
+            else:
+                st.success("✅ Solo não precisa ser irrigado. (Simulação)")
+
+    # 4b. Decisão em lote: última umidade de todos os sensores ativos, por plantação
+    st.divider()
+    st.subheader("🌾 Decisão por Plantação (todos os sensores)")
+
+    if st.button("Calcular Decisões do Campo"):
+        resultado = decidir_plantacoes()
+
+        if resultado["sensores"].empty:
+            st.info("Nenhuma leitura de umidade de sensores ativos na Fase 2.")
+        else:
+            if resultado["origem"] == "regra":
+                st.info("O modelo não está carregado, decisões pela regra (Umidade < 40%).")
+            d1, d2, d3 = st.columns(3)
+            d1.metric("Plantações a Irrigar", int(resultado["plantacoes"]["IRRIGAR"].sum()))
+            d2.metric("Sensores Avaliados", len(resultado["sensores"]))
+            d3.metric("Latência do Lote", f"{resultado['latencia_ms']:.1f} ms",
+                      delta=f"p95 {resumo_latencias()['p95_ms']:.1f} ms", delta_color="off")
+            st.dataframe(resultado["plantacoes"], use_container_width=True, hide_index=True)
+            with st.expander("Detalhe por sensor"):
+                st.dataframe(resultado["sensores"], use_container_width=True, hide_index=True)
+
+    # 4c. Risco por plantação (modelo_risco.pkl): notas em cache até chegar leitura nova
+    st.divider()
+    st.subheader("⚠️ Plantações com Maior Risco")
+
+    if st.button("Atualizar Ranking de Risco"):
+        try:
+            cache = risco.obter_cache("plantacao")
+            ranking = cache.ranking(20)
+        except Exception as e:
+            st.error(f"Erro ao calcular o risco: {e}")
+        else:
+            if ranking.empty:
+                st.info("Nenhuma plantação com leituras de umidade, fósforo e potássio em sensores ativos.")
+            else:
+                r1, r2, r3 = st.columns(3)
+                r1.metric("Plantações Avaliadas", cache.estatisticas["entidades"])
+                r2.metric("Reavaliadas Agora", cache.estatisticas["reavaliadas"])
+                r3.metric("Tempo", f"{cache.estatisticas['segundos'] * 1000:.0f} ms")
+                st.dataframe(ranking.reset_index().round(3), use_container_width=True, hide_index=True)
+
+    # Custo de carga e memória de cada modelo (para planejar florestas maiores)
+    with st.expander("⚙️ Modelos em Memória"):
+        if REGISTRO.carregados():
+            st.dataframe(pd.DataFrame(REGISTRO.carregados()), use_container_width=True, hide_index=True)
+            if isinstance(modelo, compilacao.LimiarUmidade):
+                st.caption(f"Irrigação compilada: irrigar com umidade abaixo de {modelo.limite:.2f}%.")
+        else:
+            st.caption("Nenhum modelo carregado ainda.")
+
+    with st.expander("🔁 Retreino Incremental"):
+        st.caption("Reajusta o modelo só com as linhas novas do dataset_umidade.csv (rótulo precisa_irrigar). "
+                   "Cada versão é gravada em versoes_modelos/ e o registro passa a usá-la sozinho; "
+                   "o modelo_irrigacao.pkl original não é alterado.")
+        if st.button("Retreinar agora"):
+            treino_irrigacao.treinar_em_segundo_plano()
+            st.info("Retreino iniciado em segundo plano.")
+        if treino_irrigacao.RELATORIOS:
+            st.dataframe(pd.DataFrame(list(treino_irrigacao.RELATORIOS)[::-1]), use_container_width=True, hide_index=True)
+
+    # 5. Exibir CSV original para contexto
+    st.divider()
+    st.subheader("📊 Base de Dados Simulada")
+    
+    try:
+        # Só as 20 primeiras linhas: o arquivo inteiro é convertido uma vez, em segundo plano
+        st.dataframe(dataset_umidade.previa(20), use_container_width=True)
+        if dataset_umidade.pronto():
+            st.caption(f"{dataset_umidade.total_linhas():,} registros no histórico.")
+    except FileNotFoundError:
+        st.warning("O arquivo 'dataset_umidade.csv' não foi encontrado para visualização.")
@@ -0,0 +1,77 @@
+import streamlit as st
+
+from envio_alerta import LIMITE_UMIDADE  # regra única da bomba (< 40%)
+
+
+# --- FASE 5: CLOUD COMPUTING ---
+def exibir():
+    st.header("☁️ Fase 5: Integração Cloud (AWS SNS)")
+    st.markdown("Serviço de mensageria para disparar alertas de segurança via nuvem.")
+
+    col_monitor, col_log = st.columns([1, 1])
+
+    with col_monitor:
+        st.subheader("Monitoramento de Umidade")
+        st.info("O sistema verifica automaticamente se a umidade está abaixo de 40%.")
+
+        # Slider para simular o sensor
+        umidade_aws = st.slider("Simular Sensor de Umidade (%)", 0, 100, 35)
+
+        # Botão para testar o envio
+        if st.button("Verificar e Disparar Alerta", type="primary"):
+            
+            # Lógica de Monitoramento
+            if umidade_aws < LIMITE_UMIDADE:
+                st.warning(f"⚠️ Umidade Crítica detectada: {umidade_aws}%")
+                st.toast("Conectando à AWS...", icon="☁️")
+                
+                # --- AQUI CHAMAMOS O SEU ARQUIVO EXTERNO ---
+                # O envio vai para a fila do despachante; a página não espera a AWS
+                try:
+                    from sns_alerta import enviar_alerta
+                    
+                    mensagem_envio = f"ALERTA FARMTECH: Umidade do solo crítica ({umidade_aws}%). Acionar irrigação imediatamente."
+                    envio = enviar_alerta(mensagem_envio, chave="sensor-simulado")
+                    if envio is st.session_state.get("alerta_aws"):
+                        st.info("Alerta duplicado agrupado com o envio anterior deste sensor.")
+                    st.session_state.alerta_aws = envio
+                
+                except ImportError:
+                    st.error("Erro: O arquivo 'sns_alerta.py' não foi encontrado na pasta do projeto.")
+            
+            else:
+                st.success(f"✅ Níveis normais ({umidade_aws}%). Nenhum alerta necessário.")
+
+        # Situação do último alerta enfileirado nesta sessão
+        envio = st.session_state.get("alerta_aws")
+        if envio is not None:
+            if not envio.done():
+                st.info("⏳ Alerta na fila de envio para o AWS SNS...")
+                st.button("Atualizar Status")
+            elif envio.exception() is None:
+                retorno = envio.result()
+                st.success(f"✅ Alerta enviado para AWS SNS! ID: {retorno}")
+                st.json({"Status": "Sent", "MessageId": retorno, "Topic": "FarmTech-Alerts"})
+            else:
+                st.error(f"❌ Falha na conexão AWS: {envio.exception()}")
+                st.caption("Dica: Verifique se o arquivo 'aws_credentials.json' está na pasta com as chaves corretas.")
+
+    with col_log:
+        st.subheader("Arquitetura da Solução")
+        st.markdown("""
+        **Como funciona essa integração:**
+        1. O Script Python detecta a condição crítica (`< 40%`).
+        2. O sistema lê as credenciais seguras do arquivo `json`.
+        3. Utiliza a biblioteca **Boto3** para conectar ao serviço SNS.
+        4. O SNS dispara o e-mail/SMS para o agrônomo responsável.
+        """)
+        
+        # Mostra o código JSON de exemplo para fins didáticos (ocultando chaves reais se quiser)
+        with st.expander("Ver Estrutura do JSON de Credenciais"):
+            st.code("""
+{
+    "AWS_ACCESS_KEY": "AKIA...",
+    "AWS_SECRET_KEY": "wJalr...",
+    "SNS_ARN": "arn:aws:sns:us-east-1:..."
+}
+            """, language="json")
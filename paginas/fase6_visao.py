@@ -0,0 +1,76 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from visao import obter_pipeline
+
+
+# --- FASE 6: VISÃO COMPUTACIONAL ---
+def exibir():
+    pipeline = obter_pipeline()
+    st.header("👁️ Fase 6: Detecção Visual de Doenças")
+    st.markdown(f"""
+    Módulo de análise de imagens para identificar doenças em folhas de batata.
+    Backend em uso: **{pipeline.descricao}** (`{pipeline.backend}`).
+    """)
+
+    # Layout de duas colunas: Upload na esquerda, Resultado na direita
+    col_upload, col_resultado = st.columns([1, 1.5], gap="large")
+
+    with col_upload:
+        st.subheader("📷 Coleta de Imagens")
+        st.info("Faça o upload de imagens claras de folhas de batata (uma ou várias da mesma coleta).")
+        
+        # Widget para subir as fotos
+        uploaded_files = st.file_uploader("Escolha as imagens (.jpg, .png)", type=["jpg", "png", "jpeg"],
+                                          accept_multiple_files=True)
+
+        if uploaded_files:
+            # Mostra as primeiras imagens carregadas
+            st.image([f for f in uploaded_files[:6]], caption=[f.name for f in uploaded_files[:6]], width=150)
+            if len(uploaded_files) > 6:
+                st.caption(f"... e mais {len(uploaded_files) - 6} imagens.")
+
+    with col_resultado:
+        st.subheader("🧠 Análise das Imagens")
+
+        if not uploaded_files:
+            st.warning("👈 Aguardando upload de imagens para iniciar a análise.")
+        else:
+            # Botão para disparar a análise
+            if st.button("🔍 Iniciar Diagnóstico", type="primary"):
+                # 1. Decodificação em paralelo + inferência em lotes (fotos repetidas vêm do cache)
+                with st.spinner(f"Analisando imagens ({pipeline.backend})..."):
+                    resultados, estatisticas = pipeline.diagnosticar(
+                        [(f.name, f.getvalue()) for f in uploaded_files]
+                    )
+
+                # 2. Desempenho do lote
+                st.divider()
+                k1, k2, k3 = st.columns(3)
+                k1.metric("Imagens", estatisticas["imagens"], delta=f"{estatisticas['do_cache']} do cache", delta_color="off")
+                k2.metric("Imagens/s", f"{estatisticas['imagens_por_segundo']:.1f}")
+                k3.metric("Latência Média", f"{np.mean([r['latencia_ms'] for r in resultados]):.1f} ms")
+
+                # 3. Exibição dos Resultados
+                if len(resultados) == 1:
+                    resultado_final = resultados[0]
+                    st.write(f"### Diagnóstico: **{resultado_final['label']}**")
+
+                    # Barra de confiança
+                    st.progress(resultado_final["conf"], text=f"Confiança do Modelo: {resultado_final['conf']*100:.1f}%")
+
+                    if resultado_final["tipo"] == "ok":
+                        st.success(f"✅ {resultado_final['msg']}")
+                    else:
+                        st.error(f"🚨 {resultado_final['msg']}")
+                else:
+                    tabela = pd.DataFrame(resultados)[["arquivo", "label", "conf", "latencia_ms", "cache"]]
+                    st.dataframe(tabela, use_container_width=True, hide_index=True,
+                                 column_config={"conf": st.column_config.ProgressColumn("Confiança", min_value=0, max_value=1)})
+
+                if any(r["tipo"] == "doenca" for r in resultados):
+                    # Se houver doença, mostra alerta vermelho e OPÇÃO DE AWS
+                    st.markdown("---")
+                    st.subheader("⚠️ Ação Crítica Necessária")
+                    st.write("A doença detectada requer notificação imediata ao agrônomo responsável.")
@@ -0,0 +1,9 @@
+import streamlit as st
+
+
+# --- HOME ---
+def exibir():
+    st.header("Bem-vindo ao Painel de Controle")
+    st.write("Este dashboard centraliza todas as etapas do projeto, desde a coleta de dados até a inteligência artificial.")
+    
+    st.info("Selecione uma fase no menu lateral para interagir com os módulos específicos.")
@@ -0,0 +1,95 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import banco_dados
+
+# Taxa de aplicação por insumo (mL por m²)
+TAXAS = {"Fertilizante": 500, "Pesticida": 250}
+
+# Colunas exibidas na Fase 1 (mesmos nomes do DataFrame antigo da sessão)
+COLUNAS = ["Cultura", "Area_m2", "Insumo", "Aplicacao_L"]
+
+# Linhas lidas por vez na importação
+TAMANHO_LOTE = 10000
+
+SQL_INSERIR = '''
+    INSERT INTO T_CULTURA (CULTURA, AREA_M2, INSUMO, APLICACAO_L, DATA_CADASTRO)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+SQL_LISTAR = '''
+    SELECT CULTURA AS Cultura, AREA_M2 AS Area_m2, INSUMO AS Insumo, APLICACAO_L AS Aplicacao_L
+    FROM T_CULTURA
+    ORDER BY ID_CULTURA DESC
+    LIMIT ?
+'''
+
+SQL_TOTAIS = '''
+    SELECT COUNT(*) AS REGISTROS, COALESCE(SUM(AREA_M2), 0) AS AREA_M2, COALESCE(SUM(APLICACAO_L), 0) AS APLICACAO_L
+    FROM T_CULTURA
+'''
+
+
+def calcular_aplicacao(areas, insumos):
+    # Litros de insumo para cada área, de uma vez para o lote inteiro
+    taxas = pd.Series(insumos).map(TAXAS).to_numpy(dtype=float)
+    return np.asarray(areas, dtype=float) * taxas / 1000  # Convertendo para Litros
+
+
+def adicionar(cultura, area_m2, insumo):
+    # Append simples: custo constante, não importa quantos registros já existem
+    aplicacao = float(calcular_aplicacao([area_m2], [insumo])[0])
+    banco_dados.executar_escrita(SQL_INSERIR, (cultura, area_m2, insumo, aplicacao, datetime.now())).result()
+    return aplicacao
+
+
+def adicionar_lote(culturas, areas_m2, insumos):
+    # Vários registros numa transação só; devolve quantos foram gravados
+    bloco = pd.DataFrame({"Cultura": culturas, "Area_m2": areas_m2, "Insumo": insumos})
+    return _gravar(bloco)[0]
+
+
+def _gravar(bloco):
+    # Calcula Aplicacao_L para o bloco inteiro, descarta linhas inválidas e grava pelo
+    # escritor único do banco. Retorna (inseridas, rejeitadas).
+    bloco = bloco.assign(Area_m2=pd.to_numeric(bloco["Area_m2"], errors="coerce"))
+    bloco = bloco.assign(Aplicacao_L=calcular_aplicacao(bloco["Area_m2"], bloco["Insumo"]))
+    validos = bloco["Aplicacao_L"].notna() & (bloco["Area_m2"] > 0) & bloco["Cultura"].notna()
+    bloco = bloco[validos].assign(DATA_CADASTRO=str(datetime.now()))
+
+    linhas = bloco[COLUNAS + ["DATA_CADASTRO"]].itertuples(index=False, name=None)
+    banco_dados.inserir_em_lote(SQL_INSERIR, linhas).result()
+    return len(bloco), int((~validos).sum())
+
+
+def importar(arquivo, tamanho_lote=TAMANHO_LOTE):
+    # CSV com colunas Cultura, Area_m2, Insumo; Aplicacao_L é calculada por lote.
+    # Linhas com insumo desconhecido ou área <= 0 são descartadas.
+    relatorio = {"lidas": 0, "inseridas": 0, "rejeitadas": 0}
+    inicio = time.perf_counter()
+
+    for bloco in pd.read_csv(arquivo, usecols=["Cultura", "Area_m2", "Insumo"], chunksize=tamanho_lote):
+        relatorio["lidas"] += len(bloco)
+        inseridas, rejeitadas = _gravar(bloco)
+        relatorio["inseridas"] += inseridas
+        relatorio["rejeitadas"] += rejeitadas
+
+    relatorio["segundos"] = time.perf_counter() - inicio
+    return relatorio
+
+
+def listar(limite=1000):
+    # Só as últimas linhas vão para a tela; os totais vêm de totais()
+    return pd.read_sql(SQL_LISTAR, banco_dados.get_db_connection(), params=(limite,))
+
+
+def totais():
+    linha = banco_dados.get_db_connection().execute(SQL_TOTAIS).fetchone()
+    return {"registros": linha[0], "area_m2": linha[1], "aplicacao_l": linha[2]}
+
+
+def excluir_todos():
+    banco_dados.executar_escrita("DELETE FROM T_CULTURA").result()
@@ -0,0 +1,367 @@
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import agregados
+import banco_dados
+import metricas
+
+# Pasta das leituras arquivadas: <PASTA_ARQUIVO>/mes=AAAA-MM/sensor=<ID_SENSOR>/parte-<ids>.parquet
+PASTA_ARQUIVO = "arquivo_leituras"
+
+# Leituras com DATA_HORA mais antiga que isso saem do SQLite para o arquivo
+IDADE_MAXIMA_DIAS = 90
+
+# Leituras apagadas por transação (cada lote passa pelo escritor único)
+TAMANHO_LOTE_DELETE = 20_000
+
+# Leituras guardadas na memória (somando todos os sensores) antes de gravar as partes do mês
+LIMITE_BUFFER = 500_000
+
+# Páginas devolvidas ao sistema por passo do incremental_vacuum
+PAGINAS_VACUUM = 2_000
+
+# Mês sendo arquivado: arquivos já gravados, leituras ainda não apagadas do banco
+ARQUIVO_CONTROLE = "_pendente.json"
+
+SQL_ARQUIVAR = """
+    SELECT ID_LEITURA, DATA_HORA, VALOR, TIPO_MEDICAO, ID_SENSOR
+    FROM T_LEITURA_SENSOR
+    WHERE DATA_HORA >= ? AND DATA_HORA < ? AND ID_LEITURA <= ?
+    ORDER BY ID_LEITURA
+"""
+
+SQL_APAGAR_ARQUIVADAS = """
+    DELETE FROM T_LEITURA_SENSOR WHERE ID_LEITURA IN (
+        SELECT ID_LEITURA FROM T_LEITURA_SENSOR
+        WHERE DATA_HORA >= ? AND DATA_HORA < ? AND ID_LEITURA <= ?
+        LIMIT ?
+    )
+"""
+
+
+def esquema_parquet():
+    # Mesmo esquema nas partições e nas exportações
+    import pyarrow as pa
+
+    return pa.schema([
+        ("ID_LEITURA", pa.int64()),
+        ("DATA_HORA", pa.timestamp("us")),
+        ("VALOR", pa.float64()),
+        ("TIPO_MEDICAO", pa.string()),
+        ("ID_SENSOR", pa.int64()),
+    ])
+
+
+def tabela_parquet(bloco, esquema=None):
+    import pyarrow as pa
+
+    bloco = bloco.assign(DATA_HORA=pd.to_datetime(bloco["DATA_HORA"], format="ISO8601", errors="coerce"))
+    return pa.Table.from_pandas(bloco, schema=esquema or esquema_parquet(), preserve_index=False)
+
+
+# --- PARTIÇÕES ---
+def _mes(instante):
+    return f"{instante.year:04d}-{instante.month:02d}"
+
+
+def _meses(inicio, fim):
+    # Primeiro dia de cada mês entre `inicio` e `fim` (exclusivo)
+    mes = datetime(inicio.year, inicio.month, 1)
+    while mes < fim:
+        proximo = datetime(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+        yield mes, proximo
+        mes = proximo
+
+
+def particoes(data_inicio=None, data_fim=None, id_sensor=None, pasta=PASTA_ARQUIVO):
+    # Arquivos .parquet que podem ter leituras do filtro: o mês e o sensor
+    # saem do nome das pastas, sem abrir nenhum arquivo
+    mes_inicio = _mes(pd.Timestamp(data_inicio)) if data_inicio is not None else None
+    # data_fim é exclusivo: o último mês possível é o do instante imediatamente anterior
+    mes_fim = _mes(pd.Timestamp(data_fim) - pd.Timedelta(microseconds=1)) if data_fim is not None else None
+    sensor = f"sensor={id_sensor}" if id_sensor is not None else "sensor=*"
+
+    arquivos = []
+    for pasta_mes in sorted(glob.glob(os.path.join(pasta, "mes=*"))):
+        mes = os.path.basename(pasta_mes)[len("mes="):]
+        if (mes_inicio and mes < mes_inicio) or (mes_fim and mes > mes_fim):
+            continue
+        arquivos.extend(sorted(glob.glob(os.path.join(pasta_mes, sensor, "*.parquet"))))
+    return arquivos
+
+
+def iterar_arquivadas(id_sensor=None, tipo_medicao=None, data_inicio=None, data_fim=None,
+                      tamanho_bloco=banco_dados.TAMANHO_BLOCO_LEITURAS, pasta=PASTA_ARQUIVO):
+    # Leituras arquivadas do filtro, em blocos, lendo só as partições que casam
+    import pyarrow.parquet as pq
+
+    for arquivo in particoes(data_inicio, data_fim, id_sensor, pasta):
+        for lote in pq.ParquetFile(arquivo).iter_batches(batch_size=tamanho_bloco):
+            bloco = lote.to_pandas()
+            filtro = pd.Series(True, index=bloco.index)
+            if tipo_medicao is not None:
+                filtro &= bloco["TIPO_MEDICAO"] == tipo_medicao
+            if data_inicio is not None:
+                filtro &= bloco["DATA_HORA"] >= pd.Timestamp(data_inicio)
+            if data_fim is not None:
+                filtro &= bloco["DATA_HORA"] < pd.Timestamp(data_fim)
+            if not filtro.all():
+                bloco = bloco[filtro]
+            if len(bloco):
+                yield bloco.reset_index(drop=True)
+
+
+def iterar_historico(id_sensor=None, tipo_medicao=None, data_inicio=None, data_fim=None,
+                     tamanho_bloco=banco_dados.TAMANHO_BLOCO_LEITURAS, pasta=PASTA_ARQUIVO):
+    # Arquivo + tabela viva, como se fossem uma tabela só (mesmas colunas de
+    # banco_dados.iterar_leituras); as arquivadas, mais antigas, vêm primeiro
+    filtros = {"id_sensor": id_sensor, "tipo_medicao": tipo_medicao, "data_inicio": data_inicio, "data_fim": data_fim}
+    yield from iterar_arquivadas(**filtros, tamanho_bloco=tamanho_bloco, pasta=pasta)
+    yield from banco_dados.iterar_leituras(**filtros, tamanho_bloco=tamanho_bloco)
+
+
+def buscar_historico(limite=banco_dados.TAMANHO_PAGINA, antes_de=None, id_sensor=None, tipo_medicao=None,
+                     data_inicio=None, data_fim=None, pasta=PASTA_ARQUIVO):
+    # Mesma página de banco_dados.buscar_leituras (ID_LEITURA decrescente, keyset),
+    # juntando as leituras arquivadas do período. Só lê as partições dos meses e
+    # sensores do filtro; sem datas, percorre o arquivo inteiro.
+    filtros = {"id_sensor": id_sensor, "tipo_medicao": tipo_medicao, "data_inicio": data_inicio, "data_fim": data_fim}
+    vivas = banco_dados.buscar_leituras(limite, antes_de, **filtros)
+    candidatas = []
+    for bloco in iterar_arquivadas(**filtros, pasta=pasta):
+        if antes_de is not None:
+            bloco = bloco[bloco["ID_LEITURA"] < antes_de]
+        candidatas.append(bloco.nlargest(limite, "ID_LEITURA"))
+    if not candidatas:
+        return vivas
+    arquivadas = pd.concat(candidatas, ignore_index=True)
+    modelos = dict(banco_dados.get_db_connection().execute("SELECT ID_SENSOR, TIPO FROM T_SENSOR").fetchall())
+    arquivadas["MODELO_SENSOR"] = arquivadas["ID_SENSOR"].map(modelos)
+    vivas = vivas.assign(DATA_HORA=pd.to_datetime(vivas["DATA_HORA"], format="ISO8601", errors="coerce"))
+    pagina = pd.concat([vivas, arquivadas[vivas.columns]], ignore_index=True)
+    return pagina.nlargest(limite, "ID_LEITURA").reset_index(drop=True)
+
+
+# --- ARQUIVAMENTO ---
+def _gravar_partes(buffers, mes, pasta):
+    # Um arquivo por sensor com o que foi acumulado; nomes .tmp até o mês terminar
+    import pyarrow.parquet as pq
+
+    esquema = esquema_parquet()
+    gravados = []
+    for id_sensor, blocos in buffers.items():
+        bloco = pd.concat(blocos, ignore_index=True)
+        destino = os.path.join(pasta, f"mes={mes}", f"sensor={id_sensor}")
+        os.makedirs(destino, exist_ok=True)
+        nome = f"parte-{bloco['ID_LEITURA'].iloc[0]:012d}-{bloco['ID_LEITURA'].iloc[-1]:012d}.parquet"
+        temporario = os.path.join(destino, nome + ".tmp")
+        pq.write_table(tabela_parquet(bloco, esquema), temporario, compression="zstd")
+        gravados.append(temporario)
+    buffers.clear()
+    return gravados
+
+
+def _apagar(inicio, fim, maximo, tamanho_lote):
+    # Lotes curtos pelo escritor único: as sessões continuam gravando entre um lote e outro
+    apagadas = 0
+    while True:
+        n = banco_dados.executar_escrita(SQL_APAGAR_ARQUIVADAS, (inicio, fim, maximo, tamanho_lote)).result()
+        apagadas += n
+        if n < tamanho_lote:
+            return apagadas
+
+
+def _concluir_pendente(pasta, tamanho_lote):
+    # Termina um mês interrompido: publica os arquivos e apaga do banco o que eles contêm.
+    # Partes .tmp fora do controle são de uma gravação que não chegou ao fim e são descartadas.
+    controle = os.path.join(pasta, ARQUIVO_CONTROLE)
+    pendente = None
+    if os.path.exists(controle):
+        with open(controle, encoding="utf-8") as f:
+            pendente = json.load(f)
+        for temporario in pendente["arquivos"]:
+            if os.path.exists(temporario):
+                os.replace(temporario, temporario[:-len(".tmp")])
+    for temporario in glob.glob(os.path.join(pasta, "mes=*", "sensor=*", "*.tmp")):
+        os.remove(temporario)
+    if pendente is None:
+        return 0
+    # Antes do primeiro DELETE: a correção dos agregados deixa de recalcular esses baldes
+    banco_dados.obter_escritor().enviar(agregados.marcar_arquivado, pendente["fim"]).result()
+    apagadas = _apagar(pendente["inicio"], pendente["fim"], pendente["maximo"], tamanho_lote)
+    os.remove(controle)
+    return apagadas
+
+
+def arquivar_periodo(inicio, fim, pasta=PASTA_ARQUIVO, tamanho_lote=TAMANHO_LOTE_DELETE):
+    # Leituras com inicio <= DATA_HORA < fim (dentro de um mês) vão para as partições
+    # daquele mês e depois saem do banco. ID_LEITURA <= maximo garante que só é apagado
+    # o que foi lido, mesmo com leituras atrasadas chegando durante o arquivamento.
+    # O máximo é a marca d'água dos agregados: leitura ainda não somada fica no banco.
+    inicio, fim = str(inicio), str(fim)
+    mes = inicio[:7]
+    conn = banco_dados.get_db_connection()
+    maximo = conn.execute(agregados.SQL_MARCA_DAGUA).fetchone()[0] or 0
+
+    cursor = conn.execute(SQL_ARQUIVAR, (inicio, fim, maximo))
+    buffers, no_buffer, arquivos, linhas = {}, 0, [], 0
+    while True:
+        registros = cursor.fetchmany(banco_dados.TAMANHO_BLOCO_LEITURAS)
+        if not registros:
+            break
+        bloco = pd.DataFrame.from_records(registros, columns=banco_dados.COLUNAS_LEITURA)
+        for id_sensor, parte in bloco.groupby("ID_SENSOR", sort=False):
+            buffers.setdefault(int(id_sensor), []).append(parte)
+        no_buffer += len(bloco)
+        linhas += len(bloco)
+        if no_buffer >= LIMITE_BUFFER:
+            arquivos += _gravar_partes(buffers, mes, pasta)
+            no_buffer = 0
+    if not linhas:
+        return {"mes": mes, "arquivadas": 0, "apagadas": 0, "arquivos": 0}
+    arquivos += _gravar_partes(buffers, mes, pasta)
+
+    # Dois passos: o controle registra o que vai ser apagado antes de publicar os arquivos
+    os.makedirs(pasta, exist_ok=True)
+    controle = os.path.join(pasta, ARQUIVO_CONTROLE)
+    with open(controle + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"inicio": inicio, "fim": fim, "maximo": maximo, "arquivos": arquivos}, f)
+    os.replace(controle + ".tmp", controle)
+    apagadas = _concluir_pendente(pasta, tamanho_lote)
+    return {"mes": mes, "arquivadas": linhas, "apagadas": apagadas, "arquivos": len(arquivos)}
+
+
+def _passo_vacuum(conn, paginas):
+    # fetchall: o incremental_vacuum só anda enquanto o resultado é lido
+    return conn.execute(f"PRAGMA incremental_vacuum({int(paginas)})").fetchall()
+
+
+def _checkpoint(conn):
+    return conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+
+
+def recuperar_espaco(paginas=PAGINAS_VACUUM):
+    # incremental_vacuum em passos curtos até não sobrar página livre.
+    # Só funciona com auto_vacuum=INCREMENTAL (bancos novos já nascem assim;
+    # os antigos precisam de um converter_vacuum() uma vez).
+    conn = banco_dados.get_db_connection()
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return None
+    tamanho_pagina = conn.execute("PRAGMA page_size").fetchone()[0]
+    escritor = banco_dados.obter_escritor()
+    livres_antes = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    while True:
+        livres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if not livres:
+            break
+        escritor.enviar(_passo_vacuum, paginas, isolada=True).result()
+        if conn.execute("PRAGMA freelist_count").fetchone()[0] >= livres:
+            break  # nada mais a devolver (outra conexão segurando páginas)
+    # Com WAL o arquivo só encolhe quando as páginas voltam do log para o banco
+    escritor.enviar(_checkpoint, isolada=True).result()
+    return livres_antes * tamanho_pagina
+
+
+def converter_vacuum():
+    # Uma vez por banco antigo: liga o auto_vacuum incremental (reescreve o arquivo inteiro)
+    def converter(conn):
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    return banco_dados.obter_escritor().enviar(converter, isolada=True).result()
+
+
+_arquivamento_lock = threading.Lock()
+
+
+def arquivar(idade_dias=IDADE_MAXIMA_DIAS, pasta=PASTA_ARQUIVO, tamanho_lote=TAMANHO_LOTE_DELETE, agora=None):
+    # Arquiva, mês a mês, tudo o que for mais antigo que `idade_dias` e recupera o espaço.
+    # Uma execução por vez (o controle de pendências é um só por pasta).
+    if not _arquivamento_lock.acquire(blocking=False):
+        return {"status": "em andamento"}
+    try:
+        return _arquivar(idade_dias, pasta, tamanho_lote, agora)
+    finally:
+        _arquivamento_lock.release()
+
+
+def _arquivar(idade_dias, pasta, tamanho_lote, agora):
+    inicio_execucao = time.perf_counter()
+    relatorio = {"status": "concluído", "corte": None, "meses": [], "arquivadas": 0, "apagadas": 0}
+    relatorio["apagadas"] += _concluir_pendente(pasta, tamanho_lote)
+    # Leituras antigas recém-importadas entram nos agregados antes de sair do banco
+    banco_dados.atualizar_agregados()
+
+    corte = (agora or datetime.now()) - timedelta(days=idade_dias)
+    relatorio["corte"] = str(corte)
+    conn = banco_dados.get_db_connection()
+    mais_antiga = conn.execute("SELECT MIN(DATA_HORA) FROM T_LEITURA_SENSOR").fetchone()[0]
+    if mais_antiga is not None and str(mais_antiga) < str(corte):
+        for inicio, fim in _meses(pd.Timestamp(mais_antiga).to_pydatetime(), corte):
+            resultado = arquivar_periodo(inicio, min(fim, corte), pasta, tamanho_lote)
+            if resultado["arquivadas"]:
+                relatorio["meses"].append(resultado)
+                relatorio["arquivadas"] += resultado["arquivadas"]
+                relatorio["apagadas"] += resultado["apagadas"]
+
+    relatorio["bytes_recuperados"] = recuperar_espaco()
+    relatorio["segundos"] = time.perf_counter() - inicio_execucao
+    relatorio["linhas_por_segundo"] = relatorio["arquivadas"] / relatorio["segundos"]
+    metricas.observar("retencao", relatorio["segundos"])
+    return relatorio
+
+
+def resumo(pasta=PASTA_ARQUIVO):
+    # Tamanho do arquivo (lido só dos rodapés dos .parquet) e do banco
+    import pyarrow.parquet as pq
+
+    arquivos = particoes(pasta=pasta)
+    conn = banco_dados.get_db_connection()
+    paginas, tamanho_pagina, livres, auto_vacuum = (
+        conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        for pragma in ("page_count", "page_size", "freelist_count", "auto_vacuum")
+    )
+    return {
+        "meses": len({os.path.basename(os.path.dirname(os.path.dirname(a))) for a in arquivos}),
+        "arquivos": len(arquivos),
+        "linhas_arquivadas": sum(pq.ParquetFile(a).metadata.num_rows for a in arquivos),
+        "mb_arquivo": sum(os.path.getsize(a) for a in arquivos) / 1e6,
+        "mb_banco": paginas * tamanho_pagina / 1e6,
+        "mb_livres_banco": livres * tamanho_pagina / 1e6,
+        "vacuum_incremental": auto_vacuum == 2,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arquiva leituras antigas em Parquet por mês e sensor.")
+    parser.add_argument("--dias", type=float, default=IDADE_MAXIMA_DIAS, help="idade máxima no SQLite")
+    parser.add_argument("--pasta", default=PASTA_ARQUIVO)
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_DELETE, help="leituras apagadas por transação")
+    parser.add_argument("--converter-vacuum", action="store_true",
+                        help="liga o auto_vacuum incremental num banco antigo (VACUUM completo, uma vez)")
+    parser.add_argument("--resumo", action="store_true", help="só mostra o tamanho do arquivo e do banco")
+    args = parser.parse_args()
+
+    if args.converter_vacuum:
+        print(f"auto_vacuum = {converter_vacuum()}")
+    if not args.resumo:
+        relatorio = arquivar(args.dias, args.pasta, args.lote)
+        for mes in relatorio["meses"]:
+            print(f"{mes['mes']}: {mes['arquivadas']} leituras em {mes['arquivos']} arquivos")
+        recuperados = relatorio["bytes_recuperados"]
+        print(f"{relatorio['arquivadas']} leituras arquivadas e {relatorio['apagadas']} apagadas em "
+              f"{relatorio['segundos']:.1f} s ({relatorio['linhas_por_segundo']:,.0f} linhas/s); "
+              + ("vacuum incremental desligado (use --converter-vacuum)" if recuperados is None
+                 else f"{recuperados / 1e6:.1f} MB devolvidos ao disco"))
+    print(resumo(args.pasta))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import banco_dados
+import compilacao
+import metricas
+from modelos import obter_avaliador
+
+# Colunas de entrada do modelo_risco.pkl, na ordem do treino
+ATRIBUTOS = ["umidade", "fosforo", "potassio"]
+
+# Medições lidas por entidade (o pH entra na tabela, mas o modelo não o usa)
+TIPOS = ATRIBUTOS + ["pH"]
+
+# Classes do modelo (0, 1, 2) e o peso de cada uma na nota de risco (0 a 1)
+NIVEIS = ["Baixo", "Médio", "Alto"]
+PESOS_NIVEIS = np.array([0.0, 0.5, 1.0])
+
+# Threads na avaliação das árvores (-1 = todos os núcleos)
+N_JOBS = -1
+
+# Entidades avaliadas por chamada ao modelo
+TAMANHO_LOTE = 100_000
+
+# Entidade de agregação -> coluna de ultimas_leituras
+ENTIDADES = {"plantacao": "ID_PLANTACAO", "sensor": "ID_SENSOR"}
+
+
+def pontuar(X, modelo=None, n_jobs=N_JOBS):
+    # X: [N, 3] (umidade, fósforo, potássio) -> probabilidades [N, 3], em lotes.
+    # A floresta compilada já avalia todas as árvores vetorizadas em NumPy; o
+    # RandomForest do sklearn (sem compilação) avalia as árvores em paralelo.
+    from joblib import parallel_config
+
+    modelo = modelo or obter_avaliador("risco")
+    X = np.asarray(X, dtype=float).reshape(-1, len(ATRIBUTOS))
+    if len(X) == 0:
+        return np.zeros((0, len(NIVEIS)))
+    if not isinstance(modelo, compilacao.FlorestaCompilada):
+        X = pd.DataFrame(X, columns=ATRIBUTOS)
+
+    partes = []
+    with parallel_config(n_jobs=n_jobs, prefer="threads"):
+        for p in range(0, len(X), TAMANHO_LOTE):
+            lote = X[p:p + TAMANHO_LOTE]
+            with metricas.medir("modelo_predicao", modelo="risco", lote=metricas.faixa_lote(len(lote))):
+                partes.append(modelo.predict_proba(lote))
+    return np.concatenate(partes)
+
+
+def nota(probabilidades):
+    # Risco esperado entre 0 (certamente baixo) e 1 (certamente alto)
+    return probabilidades @ PESOS_NIVEIS
+
+
+def montar_atributos(por="plantacao"):
+    # Última leitura de cada sensor ativo por tipo, média por entidade.
+    # VERSAO é o maior ID_LEITURA usado: muda só quando chega leitura nova da entidade.
+    coluna = ENTIDADES[por]
+    partes = []
+    for tipo in TIPOS:
+        ultimas = banco_dados.ultimas_leituras(tipo)
+        partes.append(ultimas[[coluna, "ID_SENSOR", "ID_LEITURA", "VALOR"]].assign(TIPO=tipo))
+    leituras = pd.concat(partes, ignore_index=True)
+
+    grupos = leituras.groupby([coluna, "TIPO"])
+    valores = grupos["VALOR"].mean().unstack().reindex(columns=TIPOS)
+    valores.columns.name = None
+    tabela = valores.assign(
+        VERSAO=leituras.groupby(coluna)["ID_LEITURA"].max(),
+        SENSORES=leituras.groupby(coluna)["ID_SENSOR"].nunique(),
+    )
+    tabela.index.name = coluna
+    return tabela
+
+
+class CacheRisco:
+    # Notas por entidade guardadas até mudar a leitura usada por aquela entidade.
+    # Sem leitura nova nem alterada no banco, nem os atributos são recalculados.
+    def __init__(self, por="plantacao"):
+        self.por = por
+        self.tabela = None
+        self._chave = None
+        self._lock = threading.Lock()
+        self.estatisticas = {}
+
+    def atualizar(self, modelo=None):
+        inicio = time.perf_counter()
+        with self._lock:
+            # A versão das alterações é lida antes dos dados: uma alteração no meio
+            # do caminho deixa a chave velha e a próxima chamada recalcula
+            alteracoes = banco_dados.versao_alteracoes()
+            conn = banco_dados.get_db_connection()
+            ultimo_id = conn.execute("SELECT MAX(ID_LEITURA) FROM T_LEITURA_SENSOR").fetchone()[0]
+            chave = (ultimo_id, alteracoes)
+            if self.tabela is not None and chave == self._chave:
+                self.estatisticas = {"entidades": len(self.tabela), "reavaliadas": 0,
+                                     "segundos": time.perf_counter() - inicio}
+                return self.tabela
+
+            tabela = montar_atributos(self.por)
+            completas = tabela[ATRIBUTOS].notna().all(axis=1).to_numpy()
+
+            # Reaproveita as probabilidades das entidades com a mesma VERSAO e os mesmos
+            # atributos (um valor corrigido mantém a VERSAO, mas muda o atributo)
+            colunas_proba = [f"P_{nivel.upper()}" for nivel in NIVEIS]
+            proba = np.full((len(tabela), len(NIVEIS)), np.nan)
+            pendentes = completas.copy()
+            if self.tabela is not None:
+                anterior = self.tabela.reindex(tabela.index)
+                iguais = (anterior["VERSAO"].to_numpy() == tabela["VERSAO"].to_numpy()) & completas
+                iguais &= (anterior[ATRIBUTOS].to_numpy() == tabela[ATRIBUTOS].to_numpy()).all(axis=1)
+                proba[iguais] = anterior[colunas_proba].to_numpy()[iguais]
+                pendentes &= ~iguais
+
+            inicio_modelo = time.perf_counter()
+            if pendentes.any():
+                proba[pendentes] = pontuar(tabela.loc[pendentes, ATRIBUTOS].to_numpy(), modelo)
+            segundos_modelo = time.perf_counter() - inicio_modelo
+
+            tabela[colunas_proba] = proba
+            tabela["RISCO"] = nota(proba)
+            tabela["NIVEL"] = pd.Series(np.array(NIVEIS, dtype=object)[np.nan_to_num(proba).argmax(axis=1)],
+                                        index=tabela.index).where(completas)
+
+            self.tabela, self._chave = tabela, chave
+            self.estatisticas = {
+                "entidades": len(tabela),
+                "incompletas": int((~completas).sum()),
+                "reavaliadas": int(pendentes.sum()),
+                "modelo_s": segundos_modelo,
+                "segundos": time.perf_counter() - inicio,
+            }
+            return tabela
+
+    def ranking(self, n=20, modelo=None):
+        # Entidades com maior nota de risco primeiro (as incompletas ficam de fora)
+        tabela = self.atualizar(modelo)
+        return tabela[tabela["RISCO"].notna()].sort_values("RISCO", ascending=False).head(n)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def obter_cache(por="plantacao"):
+    # Um cache por processo e tipo de entidade, compartilhado entre sessões
+    with _caches_lock:
+        if por not in _caches:
+            _caches[por] = CacheRisco(por)
+        return _caches[por]
+
+
+def ranking_plantacoes(n=20):
+    return obter_cache("plantacao").ranking(n)
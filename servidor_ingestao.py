@@ -0,0 +1,379 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+
+import numpy as np
+
+import banco_dados
+import metricas
+
+# Serviço HTTP de ingestão para as placas ESP32, rodando ao lado do Streamlit:
+#   python servidor_ingestao.py --porta 8765
+#   python servidor_ingestao.py carga --dispositivos 2000 --duracao 30
+#
+# POST /leituras aceita um objeto, uma lista de objetos ou um objeto com "leituras"
+# (os campos de fora valem para todas as leituras da lista):
+#   {"id_sensor": 3, "tipo_medicao": "umidade", "valor": 41.2}
+#   {"id_sensor": 3, "leituras": [{"tipo_medicao": "umidade", "valor": 41.2}, {"tipo_medicao": "pH", "valor": 6.8}]}
+# A resposta só sai depois do commit do grupo em que as leituras entraram.
+
+PORTA = 8765
+
+# Commit em grupo: a cada TAMANHO_GRUPO linhas ou INTERVALO_GRUPO_MS desde a primeira pendente
+TAMANHO_GRUPO = 1000
+INTERVALO_GRUPO_MS = 50
+
+# Linhas aguardando commit; acima disso a requisição recebe 503 com Retry-After
+CAPACIDADE_BUFFER = 50_000
+
+TAMANHO_MAXIMO_CORPO = 1 << 20
+
+# Com um ID_SENSOR desconhecido, relê T_SENSOR no máximo a cada tantos segundos
+INTERVALO_SENSORES = 1.0
+
+
+def _data_hora(valor):
+    # DATA_HORA no formato do resto do banco (str de um datetime local, sem fuso), que os
+    # filtros por faixa e os agregados comparam como texto. Aceita epoch (RTC/NTP da placa)
+    # ou ISO 8601; com fuso, converte para o horário local. Inválido -> ValueError.
+    if isinstance(valor, bool):
+        raise ValueError(valor)
+    if isinstance(valor, (int, float)):
+        return str(datetime.fromtimestamp(valor))
+    dt = datetime.fromisoformat(valor)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return str(dt)
+
+
+class ServicoIngestao:
+    def __init__(self, tamanho_grupo=TAMANHO_GRUPO, intervalo_ms=INTERVALO_GRUPO_MS, capacidade=CAPACIDADE_BUFFER):
+        self.tamanho_grupo = tamanho_grupo
+        self.intervalo = intervalo_ms / 1000
+        self.capacidade = capacidade
+
+        self._buffer = []     # linhas no formato de SQL_INSERIR_LEITURA
+        self._futuros = []    # um Future por requisição com linhas no buffer
+        self._chegou = None
+        self._cheio = None
+        # Uma thread só grava no SQLite: commits nunca disputam o lock de escrita entre si
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestao-sqlite")
+
+        self._sensores = set()
+        self._inexistentes = {}  # ID_SENSOR -> quando foi procurado sem sucesso
+        self._recarga = None
+        self.latencias = deque(maxlen=100_000)  # ms, da chegada da requisição ao commit
+        self.estatisticas = {"requisicoes": 0, "leituras": 0, "rejeitadas": 0, "recusadas": 0,
+                             "commits": 0, "segundos_commit": 0.0}
+
+    # --- BANCO (thread de gravação) ---
+    def _carregar_sensores(self):
+        return set(banco_dados.listar_ids_sensores())
+
+    def _gravar(self, linhas):
+        conn = banco_dados.get_db_connection()
+        inicio = time.perf_counter()
+        with conn:
+            conn.executemany(banco_dados.SQL_INSERIR_LEITURA, linhas)
+        return time.perf_counter() - inicio
+
+    async def _gravador(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._buffer:
+                self._chegou.clear()
+                await self._chegou.wait()
+            try:
+                await asyncio.wait_for(self._cheio.wait(), self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+
+            linhas, futuros = self._buffer, self._futuros
+            self._buffer, self._futuros = [], []
+            self._cheio.clear()
+            try:
+                segundos = await loop.run_in_executor(self._executor, self._gravar, linhas)
+            except Exception as e:
+                for futuro in futuros:
+                    futuro.set_exception(e)
+                continue
+            self.estatisticas["commits"] += 1
+            self.estatisticas["segundos_commit"] += segundos
+            self.estatisticas["leituras"] += len(linhas)
+            metricas.observar("ingestao_commit", segundos)
+            for futuro in futuros:
+                futuro.set_result(None)
+
+    # --- VALIDAÇÃO ---
+    async def _recarregar_sensores(self):
+        # Requisições simultâneas com sensores novos esperam a mesma releitura de T_SENSOR
+        if self._recarga is None:
+            loop = asyncio.get_running_loop()
+            self._recarga = loop.run_in_executor(self._executor, self._carregar_sensores)
+            try:
+                self._sensores = await self._recarga
+            finally:
+                self._recarga = None
+        else:
+            await self._recarga
+
+    async def _conferir_sensores(self, ids):
+        # IDs desconhecidos fazem reler T_SENSOR (placa recém-cadastrada); um ID que
+        # continua sem cadastro só é procurado de novo depois de INTERVALO_SENSORES
+        agora = time.monotonic()
+        desconhecidos = {i for i in ids - self._sensores
+                         if agora - self._inexistentes.get(i, -INTERVALO_SENSORES) >= INTERVALO_SENSORES}
+        if desconhecidos:
+            await self._recarregar_sensores()
+            for i in desconhecidos - self._sensores:
+                self._inexistentes[i] = agora
+            if len(self._inexistentes) > 100_000:
+                self._inexistentes.clear()
+        return self._sensores
+
+    async def _validar(self, dados):
+        # Devolve (linhas válidas, quantidade rejeitada)
+        if isinstance(dados, dict) and "leituras" in dados:
+            if not isinstance(dados["leituras"], list):
+                return [], 1
+            comuns = {k: v for k, v in dados.items() if k != "leituras"}
+            itens = [dict(comuns, **item) if isinstance(item, dict) else item for item in dados["leituras"]]
+        else:
+            itens = dados if isinstance(dados, list) else [dados]
+
+        agora = str(datetime.now())
+        linhas = []
+        for item in itens:
+            try:
+                id_sensor = int(item["id_sensor"])
+                tipo = str(item.get("tipo_medicao") or item["tipo"])
+                valor = float(item["valor"])
+                data_hora = item.get("data_hora")
+                if data_hora is not None:
+                    data_hora = _data_hora(data_hora)
+            except (KeyError, TypeError, ValueError, OverflowError, OSError):
+                continue
+            if valor == valor:
+                linhas.append((data_hora or agora, valor, tipo, id_sensor))
+
+        sensores = await self._conferir_sensores({linha[3] for linha in linhas})
+        linhas = [linha for linha in linhas if linha[3] in sensores]
+        return linhas, len(itens) - len(linhas)
+
+    # --- HTTP ---
+    async def _responder(self, writer, status, corpo, manter=True, cabecalhos=()):
+        dados = json.dumps(corpo).encode("utf-8")
+        linhas = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-Type: application/json",
+                  f"Content-Length: {len(dados)}", f"Connection: {'keep-alive' if manter else 'close'}",
+                  *cabecalhos]
+        writer.write(("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1") + dados)
+        await writer.drain()
+
+    async def _ingerir(self, corpo):
+        inicio = time.perf_counter()
+        self.estatisticas["requisicoes"] += 1
+        try:
+            dados = json.loads(corpo)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"erro": "JSON inválido"}, ()
+
+        linhas, rejeitadas = await self._validar(dados)
+        self.estatisticas["rejeitadas"] += rejeitadas
+        if not linhas:
+            return HTTPStatus.BAD_REQUEST, {"aceitas": 0, "rejeitadas": rejeitadas}, ()
+
+        # Contrapressão: com o buffer cheio a placa guarda a leitura e tenta de novo depois
+        if len(self._buffer) + len(linhas) > self.capacidade:
+            self.estatisticas["recusadas"] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"erro": "buffer cheio"}, ("Retry-After: 1",)
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._buffer.extend(linhas)
+        self._futuros.append(futuro)
+        self._chegou.set()
+        if len(self._buffer) >= self.tamanho_grupo:
+            self._cheio.set()
+        try:
+            await futuro
+        except Exception:
+            # O grupo inteiro falhou no commit: a placa guarda a leitura e reenvia
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"erro": "falha ao gravar"}, ()
+
+        latencia = time.perf_counter() - inicio
+        self.latencias.append(latencia * 1000)
+        metricas.observar("ingestao", latencia)
+        return HTTPStatus.ACCEPTED, {"aceitas": len(linhas), "rejeitadas": rejeitadas}, ()
+
+    async def _atender(self, reader, writer):
+        try:
+            while True:
+                try:
+                    cabecalho = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                linhas = cabecalho.decode("latin-1").split("\r\n")
+                metodo, caminho, versao = (linhas[0].split(" ") + ["", "", ""])[:3]
+                cabecalhos = {}
+                for linha in linhas[1:]:
+                    nome, _, valor = linha.partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                manter = cabecalhos.get("connection", "").lower() != "close" and versao == "HTTP/1.1"
+
+                try:
+                    tamanho = int(cabecalhos.get("content-length") or 0)
+                except ValueError:
+                    tamanho = -1
+                if tamanho < 0:
+                    await self._responder(writer, HTTPStatus.BAD_REQUEST, {"erro": "Content-Length inválido"},
+                                          manter=False)
+                    break
+                if tamanho > TAMANHO_MAXIMO_CORPO:
+                    await self._responder(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"erro": "corpo grande demais"},
+                                          manter=False)
+                    break
+                corpo = await reader.readexactly(tamanho) if tamanho else b""
+
+                caminho = caminho.split("?")[0]
+                if metodo == "POST" and caminho == "/leituras":
+                    status, resposta, extras = await self._ingerir(corpo)
+                elif metodo == "GET" and caminho == "/saude":
+                    status, resposta, extras = HTTPStatus.OK, self.resumo(), ()
+                else:
+                    status, resposta, extras = HTTPStatus.NOT_FOUND, {"erro": "rota desconhecida"}, ()
+                await self._responder(writer, status, resposta, manter, extras)
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def resumo(self):
+        resumo = dict(self.estatisticas, buffer=len(self._buffer))
+        if self.estatisticas["commits"]:
+            resumo["linhas_por_commit"] = self.estatisticas["leituras"] / self.estatisticas["commits"]
+        if self.latencias:
+            valores = np.fromiter(self.latencias, dtype=float)
+            resumo.update(p50_ms=float(np.percentile(valores, 50)), p99_ms=float(np.percentile(valores, 99)),
+                          max_ms=float(valores.max()))
+        return resumo
+
+    async def iniciar(self, host="0.0.0.0", porta=PORTA):
+        self._chegou = asyncio.Event()
+        self._cheio = asyncio.Event()
+        self._tarefa_gravador = asyncio.create_task(self._gravador())
+        return await asyncio.start_server(self._atender, host, porta, backlog=4096)
+
+
+async def servir(host="0.0.0.0", porta=PORTA, **opcoes):
+    servico = ServicoIngestao(**opcoes)
+    servidor = await servico.iniciar(host, porta)
+    print(f"Ingestão ouvindo em http://{host}:{porta}/leituras (grupo: {servico.tamanho_grupo} linhas "
+          f"ou {servico.intervalo * 1000:.0f} ms)")
+    async with servidor:
+        while True:
+            await asyncio.sleep(10)
+            print(servico.resumo())
+
+
+# --- GERADOR DE CARGA ---
+def _corpo(frota, ciclo, i):
+    # POST de um nó: as 4 medições do ciclo, como o firmware mandaria
+    valores = {"umidade": round(float(ciclo.umidade[i]), 1), "pH": round(float(ciclo.ph_raw[i]) / 4095 * 14, 2),
+               "fosforo": float(ciclo.fosforo[i]), "potassio": float(ciclo.potassio[i])}
+    return json.dumps([{"id_sensor": int(frota.ids[medicao][i]), "tipo_medicao": medicao, "valor": valor}
+                       for medicao, valor in valores.items()]).encode("utf-8")
+
+
+async def _conexao(host, porta, frota, estado, nos, fim, latencias, falhas):
+    # Uma conexão keep-alive que envia, em sequência, o POST de vários nós a cada segundo
+    reader, writer = await asyncio.open_connection(host, porta)
+    try:
+        while time.monotonic() < fim:
+            inicio_ciclo = time.monotonic()
+            for i in nos:
+                corpo = _corpo(frota, estado["ciclo"], i)
+                requisicao = (f"POST /leituras HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                              f"Content-Length: {len(corpo)}\r\n\r\n").encode("latin-1") + corpo
+                t = time.perf_counter()
+                writer.write(requisicao)
+                cabecalho = await reader.readuntil(b"\r\n\r\n")
+                tamanho = int(cabecalho.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+                await reader.readexactly(tamanho)
+                latencias.append((time.perf_counter() - t) * 1000)
+                if not cabecalho.startswith(b"HTTP/1.1 202"):
+                    falhas.append(cabecalho.split(b"\r\n")[0].decode())
+            await asyncio.sleep(max(0.0, 1.0 - (time.monotonic() - inicio_ciclo)))
+    finally:
+        writer.close()
+
+
+async def carga(host="127.0.0.1", porta=PORTA, dispositivos=1000, conexoes=200, duracao=10.0):
+    # Frota do simulador_esp32 cadastrada no banco; cada nó faz um POST por segundo
+    from simulador_esp32 import MEDICOES, FrotaESP32
+
+    frota = FrotaESP32(dispositivos)
+    frota.registrar_sensores()
+    estado = {"ciclo": frota.passo()}
+    fim = time.monotonic() + duracao
+
+    async def relogio():
+        while time.monotonic() < fim:
+            await asyncio.sleep(1.0)
+            estado["ciclo"] = frota.passo()
+
+    latencias, falhas = [], []
+    grupos = np.array_split(np.arange(dispositivos), min(conexoes, dispositivos))
+    inicio = time.perf_counter()
+    await asyncio.gather(relogio(), *(_conexao(host, porta, frota, estado, grupo, fim, latencias, falhas)
+                                      for grupo in grupos))
+    decorrido = time.perf_counter() - inicio
+
+    valores = np.array(latencias) if latencias else np.zeros(1)
+    return {
+        "dispositivos": dispositivos,
+        "requisicoes": len(latencias),
+        "leituras_por_segundo": len(latencias) * len(MEDICOES) / decorrido,
+        "falhas": len(falhas),
+        "p50_ms": float(np.percentile(valores, 50)),
+        "p99_ms": float(np.percentile(valores, 99)),
+        "max_ms": float(valores.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão HTTP de leituras das placas ESP32.")
+    sub = parser.add_subparsers(dest="comando")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--grupo", type=int, default=TAMANHO_GRUPO, help="linhas por commit")
+    parser.add_argument("--intervalo-ms", type=float, default=INTERVALO_GRUPO_MS, help="espera máxima do grupo")
+    parser.add_argument("--capacidade", type=int, default=CAPACIDADE_BUFFER, help="linhas no buffer antes do 503")
+
+    teste = sub.add_parser("carga", help="gera carga contra um serviço já rodando")
+    teste.add_argument("--dispositivos", type=int, default=1000)
+    teste.add_argument("--conexoes", type=int, default=200)
+    teste.add_argument("--duracao", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.comando == "carga":
+        host = "127.0.0.1" if args.host == "0.0.0.0" else args.host
+        relatorio = asyncio.run(carga(host, args.porta, args.dispositivos, args.conexoes, args.duracao))
+        for chave, valor in relatorio.items():
+            print(f"{chave}: {valor}")
+        return
+
+    try:
+        asyncio.run(servir(args.host, args.porta, tamanho_grupo=args.grupo, intervalo_ms=args.intervalo_ms,
+                           capacidade=args.capacidade))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
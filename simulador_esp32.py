@@ -0,0 +1,225 @@
+import argparse
+import queue
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import banco_dados
+from envio_alerta import LIMITE_UMIDADE  # regra única da bomba (< 40%)
+
+# Medições gravadas por nó a cada ciclo, com o tipo de sensor cadastrado em T_SENSOR
+# (mesmos nomes usados na Fase 2)
+MEDICOES = {
+    "umidade": "Umidade (DHT22)",
+    "pH": "pH Solo",
+    "fosforo": "Nutrientes (NPK)",
+    "potassio": "Nutrientes (NPK)",
+}
+
+# Nós da frota por plantação (ID_PLANTACAO dos sensores cadastrados)
+NOS_POR_PLANTACAO = 10
+
+# Segundos simulados entre duas leituras do mesmo nó (delay do loop do firmware)
+INTERVALO_LEITURA = 2.0
+
+# Ciclos guardados na fila em memória antes de o simulador esperar o consumidor
+TAMANHO_FILA = 64
+
+# Estado da frota num ciclo (arrays com uma posição por nó)
+Ciclo = namedtuple("Ciclo", "data_hora instante umidade ph_raw fosforo potassio bomba")
+
+
+class FrotaESP32:
+    # N placas virtuais rodando a mesma lógica do firmware da Fase 3, todas de uma
+    # vez em arrays NumPy: o solo seca aos poucos, a bomba devolve umidade enquanto
+    # está ligada e liga/desliga pela regra umidade < LIMITE_UMIDADE.
+    def __init__(self, nos, semente=None, secagem=0.15, irrigacao=1.2, ruido=0.3,
+                 intervalo=INTERVALO_LEITURA, inicio=None):
+        self.nos = nos
+        self.intervalo = intervalo
+        self._rng = np.random.default_rng(semente)
+
+        # Cada nó seca num ritmo próprio (sol, tipo de solo...)
+        self.secagem = (secagem * self._rng.uniform(0.5, 1.5, nos)).astype(np.float32)
+        self.irrigacao = np.float32(irrigacao)
+        self.ruido = np.float32(ruido)
+
+        self.umidade = self._rng.uniform(30.0, 70.0, nos).astype(np.float32)
+        self.ph_raw = self._rng.integers(1500, 2600, nos).astype(np.int16)  # ~pH 5 a 9
+        self.fosforo = self._rng.random(nos) > 0.1
+        self.potassio = self._rng.random(nos) > 0.1
+        self.bomba = self.umidade < LIMITE_UMIDADE
+
+        self.relogio = inicio or datetime.now()
+        self.ids = None  # ID_SENSOR de cada medição, depois de registrar_sensores()
+
+    def passo(self):
+        # Um ciclo do loop() do firmware em todos os nós
+        rng = self._rng
+        self.umidade += np.where(self.bomba, self.irrigacao, 0) - self.secagem
+        self.umidade += rng.normal(0, self.ruido, self.nos).astype(np.float32)
+        np.clip(self.umidade, 0.0, 100.0, out=self.umidade)
+
+        # LDR do pH: passeio aleatório dentro da faixa do ADC de 12 bits
+        self.ph_raw = np.clip(self.ph_raw + rng.integers(-20, 21, self.nos), 0, 4095).astype(np.int16)
+
+        # Botões de P/K: nutriente acaba ou é reposto de vez em quando
+        self.fosforo ^= rng.random(self.nos) < 0.002
+        self.potassio ^= rng.random(self.nos) < 0.002
+
+        # No C++: if (umidade < 40.0) { digitalWrite(LED_BOMBA, HIGH); }
+        self.bomba = self.umidade < LIMITE_UMIDADE
+
+        self.relogio += timedelta(seconds=self.intervalo)
+        # data_hora segue o relógio simulado; instante é a hora real em que o ciclo foi gerado
+        return Ciclo(str(self.relogio), time.time(), self.umidade.copy(), self.ph_raw.copy(),
+                     self.fosforo.copy(), self.potassio.copy(), self.bomba.copy())
+
+    def registrar_sensores(self, id_plantacao_inicial=1, nos_por_plantacao=NOS_POR_PLANTACAO):
+        # Cadastra os sensores de todos os nós em T_SENSOR numa transação só.
+        # Umidade, pH e NPK são sensores separados; fósforo e potássio vêm do mesmo.
+        plantacoes = id_plantacao_inicial + np.arange(self.nos) // nos_por_plantacao
+        tipos = list(dict.fromkeys(MEDICOES.values()))
+        agora = datetime.now()
+
+        linhas = [(tipo, "Ativo", agora, int(plantacao)) for plantacao in plantacoes for tipo in tipos]
+        # Uma operação do escritor único: nada grava no meio, então os IDs saem consecutivos
+        ultimo = banco_dados.obter_escritor().enviar(_cadastrar_sensores, linhas).result()
+
+        ids = (ultimo - self.nos * len(tipos) + 1 + np.arange(self.nos * len(tipos))).reshape(self.nos, len(tipos))
+        self.ids = {medicao: ids[:, tipos.index(tipo)] for medicao, tipo in MEDICOES.items()}
+        return self.ids
+
+    def linhas(self, ciclo):
+        # Linhas do ciclo no formato de banco_dados.SQL_INSERIR_LEITURA
+        valores = {
+            "umidade": np.round(ciclo.umidade, 1),
+            "pH": np.round(ciclo.ph_raw / 4095 * 14, 2),  # mesma estimativa do painel da Fase 3
+            "fosforo": ciclo.fosforo.astype(float),
+            "potassio": ciclo.potassio.astype(float),
+        }
+        linhas = []
+        for medicao, valor in valores.items():
+            linhas.extend(zip([ciclo.data_hora] * self.nos, valor.tolist(), [medicao] * self.nos,
+                              self.ids[medicao].tolist()))
+        return linhas
+
+
+def _cadastrar_sensores(conn, linhas):
+    # Executada pelo escritor do banco_dados; devolve o último ID_SENSOR criado
+    conn.executemany(banco_dados.SQL_INSERIR_SENSOR, linhas)
+    return conn.execute("SELECT MAX(ID_SENSOR) FROM T_SENSOR").fetchone()[0]
+
+
+# --- DESTINOS ---
+def gravar_banco(frota):
+    # Um ciclo inteiro da frota por transação em T_LEITURA_SENSOR
+    if frota.ids is None:
+        frota.registrar_sensores()
+    def destino(ciclo):
+        banco_dados.inserir_em_lote(banco_dados.SQL_INSERIR_LEITURA, frota.linhas(ciclo)).result()
+    return destino
+
+
+def publicar_fila(fila):
+    # Publica cada ciclo num queue.Queue; com a fila cheia o simulador espera o consumidor
+    return fila.put
+
+
+def fonte_fila(fila, ids=None, parar=None, espera=0.5):
+    # Lê os ciclos da fila no formato das fontes do envio_alerta (id_sensor, valor, instante),
+    # só a umidade, para alimentar o MonitorUmidade direto
+    while parar is None or not parar.is_set() or not fila.empty():
+        try:
+            ciclo = fila.get(timeout=espera)
+        except queue.Empty:
+            continue
+        nos = ids if ids is not None else range(len(ciclo.umidade))
+        lote = list(zip(nos, ciclo.umidade.tolist(), [None] * len(ciclo.umidade)))
+        if lote:
+            lote[-1] = (lote[-1][0], lote[-1][1], ciclo.instante)
+        yield lote
+
+
+# --- EXECUÇÃO ---
+def executar(frota, destino=None, taxa=None, duracao=None, ciclos=None, parar=None):
+    # Gera ciclos até `duracao` segundos, `ciclos` ciclos ou o Event `parar`.
+    # taxa: leituras por segundo desejadas (None = o mais rápido possível).
+    # Retorna um relatório com a taxa realmente alcançada.
+    leituras_por_ciclo = frota.nos * len(MEDICOES)
+    intervalo = leituras_por_ciclo / taxa if taxa else 0.0
+    relatorio = {"nos": frota.nos, "ciclos": 0, "leituras": 0, "taxa_alvo": taxa,
+                 "segundos": 0.0, "leituras_por_segundo": 0.0, "atraso_max_s": 0.0, "bombas_ligadas": 0}
+
+    inicio = time.perf_counter()
+    proximo = inicio
+    while True:
+        if ciclos is not None and relatorio["ciclos"] >= ciclos:
+            break
+        if duracao is not None and time.perf_counter() - inicio >= duracao:
+            break
+        if parar is not None and parar.is_set():
+            break
+
+        ciclo = frota.passo()
+        if destino is not None:
+            destino(ciclo)
+        relatorio["ciclos"] += 1
+        relatorio["leituras"] += leituras_por_ciclo
+
+        # Ritmo fixo pelo relógio: se atrasar, não dorme e registra o atraso
+        if intervalo:
+            proximo += intervalo
+            folga = proximo - time.perf_counter()
+            if folga > 0:
+                time.sleep(folga)
+            else:
+                relatorio["atraso_max_s"] = max(relatorio["atraso_max_s"], -folga)
+
+    relatorio["segundos"] = time.perf_counter() - inicio
+    if relatorio["segundos"] > 0:
+        relatorio["leituras_por_segundo"] = relatorio["leituras"] / relatorio["segundos"]
+    relatorio["bombas_ligadas"] = int(frota.bomba.sum())
+    return relatorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frota virtual de ESP32 (gerador de carga da Fase 3).")
+    parser.add_argument("--nos", type=int, default=100, help="quantidade de placas simuladas")
+    parser.add_argument("--taxa", type=float, help="leituras por segundo (padrão: o mais rápido possível)")
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos de execução")
+    parser.add_argument("--destino", choices=["banco", "fila", "nenhum"], default="banco",
+                        help="grava em T_LEITURA_SENSOR, publica numa fila em memória ou só gera")
+    parser.add_argument("--semente", type=int)
+    args = parser.parse_args()
+
+    frota = FrotaESP32(args.nos, semente=args.semente)
+
+    if args.destino == "fila":
+        # Consumidor de exemplo: o monitor de umidade lendo a fila em outra thread
+        from envio_alerta import MonitorUmidade
+
+        fila = queue.Queue(maxsize=TAMANHO_FILA)
+        parar = threading.Event()
+        monitor = MonitorUmidade()
+        consumidor = threading.Thread(
+            target=lambda: sum(1 for _ in monitor.consumir(fonte_fila(fila, parar=parar))), daemon=True
+        )
+        consumidor.start()
+        relatorio = executar(frota, publicar_fila(fila), taxa=args.taxa, duracao=args.duracao)
+        parar.set()
+        consumidor.join()
+        relatorio["monitor"] = monitor.estatisticas()
+    else:
+        destino = gravar_banco(frota) if args.destino == "banco" else None
+        relatorio = executar(frota, destino, taxa=args.taxa, duracao=args.duracao)
+
+    for chave, valor in relatorio.items():
+        print(f"{chave}: {valor}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,213 @@
-import boto3
-import streamlit as st 
-
-def enviar_alerta_aws(mensagem):
-    try:
-        # Acessa as chaves de forma segura através do st.secrets
-        # O Streamlit lê automaticamente o arquivo .streamlit/secrets.toml
-        
-        sns = boto3.client(
-            "sns",
-            aws_access_key_id=st.secrets["AWS_ACCESS_KEY"],
-            aws_secret_access_key=st.secrets["AWS_SECRET_KEY"],
-            region_name="us-east-1"
-        )
-
-        response = sns.publish(
-            TopicArn=st.secrets["SNS_ARN"],
-            Message=mensagem,
-            Subject="🚨 Alerta Crítico – FarmTech"
-        )
-        
-        return True, response['MessageId']
-
-    except KeyError as e:
-        return False, f"Chave não encontrada nos Secrets: {e}"
-    except Exception as e:
-        return False, str(e)
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+import metricas
+
+ASSUNTO_PADRAO = "🚨 Alerta Crítico – FarmTech"
+
+# "aws" publica no SNS de verdade; "local" usa o SNSLocal (testes e carga offline)
+BACKEND = os.environ.get("FARMTECH_SNS_BACKEND", "aws")
+
+# Alertas iguais (mesma chave/sensor) dentro desta janela viram um só (s)
+JANELA_AGRUPAMENTO = 60.0
+
+# Retentativas de publicação e espera inicial do backoff exponencial (s)
+TENTATIVAS = 4
+ESPERA_BASE = 0.5
+
+# Máximo de mensagens por chamada (limite do PublishBatch do SNS)
+TAMANHO_LOTE = 10
+
+
+class SNSLocal:
+    # Imita a API do cliente boto3 do SNS, guardando as mensagens em memória
+    def __init__(self, latencia=0.0):
+        self.latencia = latencia
+        self.mensagens = []
+        self._lock = threading.Lock()
+
+    def publish(self, TopicArn, Message, Subject=None):
+        return self.publish_batch(TopicArn, [{"Id": "0", "Message": Message, "Subject": Subject}])["Successful"][0]
+
+    def publish_batch(self, TopicArn, PublishBatchRequestEntries):
+        if self.latencia:
+            time.sleep(self.latencia)
+        sucesso = []
+        with self._lock:
+            for entrada in PublishBatchRequestEntries:
+                message_id = str(uuid.uuid4())
+                self.mensagens.append((TopicArn, entrada.get("Subject"), entrada["Message"], message_id))
+                sucesso.append({"Id": entrada["Id"], "MessageId": message_id})
+        return {"Successful": sucesso, "Failed": []}
+
+
+def _falhou(future):
+    # Um alerta que falhou não deve segurar o reenvio dos duplicados
+    return future.done() and future.exception() is not None
+
+
+def _criar_cliente_aws():
+    # Acessa as chaves de forma segura através do st.secrets
+    # O Streamlit lê automaticamente o arquivo .streamlit/secrets.toml
+    import boto3
+    import streamlit as st
+
+    sns = boto3.client(
+        "sns",
+        aws_access_key_id=st.secrets["AWS_ACCESS_KEY"],
+        aws_secret_access_key=st.secrets["AWS_SECRET_KEY"],
+        region_name="us-east-1"
+    )
+    return sns, st.secrets["SNS_ARN"]
+
+
+def _criar_cliente():
+    if BACKEND == "local":
+        return SNSLocal(), "arn:aws:sns:local:000000000000:FarmTech-Alerts"
+    return _criar_cliente_aws()
+
+
+class DespachanteAlertas:
+    # Fila de alertas com uma thread de envio: quem chama recebe um Future na hora
+    # e o MessageId chega depois, sem segurar a thread do Streamlit.
+
+    def __init__(self, criar_cliente=_criar_cliente, janela=JANELA_AGRUPAMENTO, tentativas=TENTATIVAS,
+                 espera_base=ESPERA_BASE, tamanho_lote=TAMANHO_LOTE):
+        self.criar_cliente = criar_cliente
+        self.janela = janela
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.tamanho_lote = tamanho_lote
+
+        self._fila = queue.Queue()
+        self._recentes = {}  # chave -> (instante, future)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._cliente = None
+        self._topico = None
+        self.estatisticas = {"enviados": 0, "falhas": 0, "agrupados": 0, "retentativas": 0}
+
+    def enviar(self, mensagem, chave=None, assunto=ASSUNTO_PADRAO):
+        # Sem chave explícita, só mensagens idênticas são agrupadas
+        chave = chave if chave is not None else mensagem
+        agora = time.monotonic()
+        with self._lock:
+            recente = self._recentes.get(chave)
+            if recente is not None and agora - recente[0] < self.janela and not _falhou(recente[1]):
+                self.estatisticas["agrupados"] += 1
+                return recente[1]
+
+            future = Future()
+            self._recentes[chave] = (agora, future)
+            if len(self._recentes) > 10000:
+                self._limpar_recentes(agora)
+            self._iniciar()
+        self._fila.put((mensagem, assunto, future))
+        return future
+
+    def pendentes(self):
+        return self._fila.qsize()
+
+    def _limpar_recentes(self, agora):
+        self._recentes = {k: v for k, v in self._recentes.items() if agora - v[0] < self.janela}
+
+    def _iniciar(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._executar, name="despachante-sns", daemon=True)
+            self._thread.start()
+
+    def _obter_cliente(self):
+        # Um único cliente (e uma leitura dos secrets) para todos os envios
+        if self._cliente is None:
+            self._cliente, self._topico = self.criar_cliente()
+        return self._cliente
+
+    def _executar(self):
+        while True:
+            lote = [self._fila.get()]
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            self._publicar(lote)
+
+    def _publicar(self, lote):
+        pendentes = {str(i): item for i, item in enumerate(lote)}
+
+        # Configuração ausente (secrets, credenciais): insistir não resolve
+        try:
+            cliente = self._obter_cliente()
+        except KeyError as e:
+            return self._falhar(pendentes, f"Chave não encontrada nos Secrets: {e}")
+        except Exception as e:
+            return self._falhar(pendentes, str(e))
+
+        erro = None
+        for tentativa in range(self.tentativas):
+            if tentativa:
+                self.estatisticas["retentativas"] += 1
+                time.sleep(self.espera_base * 2 ** (tentativa - 1))
+            inicio = time.perf_counter()
+            try:
+                resposta = cliente.publish_batch(
+                    TopicArn=self._topico,
+                    PublishBatchRequestEntries=[
+                        {"Id": id_, "Message": mensagem, "Subject": assunto}
+                        for id_, (mensagem, assunto, _) in pendentes.items()
+                    ],
+                )
+            except Exception as e:
+                metricas.observar("sns_publicacao", time.perf_counter() - inicio, resultado="erro")
+                erro = str(e)
+                continue
+            metricas.observar("sns_publicacao", time.perf_counter() - inicio, resultado="ok")
+
+            for item in resposta.get("Successful", []):
+                _, _, future = pendentes.pop(item["Id"])
+                future.set_result(item["MessageId"])
+                self.estatisticas["enviados"] += 1
+            for item in resposta.get("Failed", []):
+                erro = item.get("Message", item.get("Code"))
+                if item.get("SenderFault"):
+                    _, _, future = pendentes.pop(item["Id"])
+                    future.set_exception(RuntimeError(erro))
+                    self.estatisticas["falhas"] += 1
+            if not pendentes:
+                return
+
+        self._falhar(pendentes, erro)
+
+    def _falhar(self, pendentes, erro):
+        for _, _, future in pendentes.values():
+            future.set_exception(RuntimeError(erro))
+            self.estatisticas["falhas"] += 1
+
+
+_despachante = None
+_despachante_lock = threading.Lock()
+
+
+def obter_despachante():
+    global _despachante
+    with _despachante_lock:
+        if _despachante is None:
+            _despachante = DespachanteAlertas()
+        return _despachante
+
+
+def enviar_alerta(mensagem, chave=None, assunto=ASSUNTO_PADRAO):
+    # Não bloqueia: devolve um Future cujo resultado é o MessageId do SNS
+    return obter_despachante().enviar(mensagem, chave=chave, assunto=assunto)
+
+
+def enviar_alerta_aws(mensagem, timeout=30):
+    # Interface antiga (síncrona), mantida para quem precisa esperar o envio
+    try:
+        return True, enviar_alerta(mensagem).result(timeout=timeout)
+    except Exception as e:
+        return False, str(e)
@@ -0,0 +1,53 @@
+import os
+import warnings
+
+import joblib
+import numpy as np
+
+import compilacao
+from modelos import ARQUIVOS_MODELOS
+
+# Equivalência dos avaliadores compilados com os .pkl versionados no repositório:
+#   python -m pytest tests
+#   python -m tests.test_compilacao
+
+PASTA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Linhas aleatórias além das bordas (limiares exatos e vizinhos) de entradas_teste
+LINHAS = 50_000
+
+
+def _carregar(nome):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # versão do scikit-learn em que os .pkl foram salvos
+        return joblib.load(os.path.join(PASTA, ARQUIVOS_MODELOS[nome]))
+
+
+def _conferir(nome, tipo):
+    modelo = _carregar(nome)
+    compilado, relatorio = compilacao.compilar_verificado(modelo, LINHAS)
+    assert relatorio["equivalente"], relatorio
+    assert isinstance(compilado, tipo)
+    assert relatorio["linhas"] > LINHAS  # as bordas entraram na comparação
+    return modelo, compilado
+
+
+def test_irrigacao_equivalente():
+    modelo, compilado = _conferir("irrigacao", compilacao.LimiarUmidade)
+    # Caminho escalar da página: mesma decisão do predict em todas as bordas
+    X = compilacao.entradas_teste(modelo, 1_000)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        esperado = modelo.predict(X) == 1
+    assert [compilado.decisao(u) for u in X[:, 0]] == esperado.tolist()
+
+
+def test_risco_equivalente():
+    modelo, compilado = _conferir("risco", compilacao.FlorestaCompilada)
+    np.testing.assert_array_equal(compilado.classes_, modelo.classes_)
+
+
+if __name__ == "__main__":
+    test_irrigacao_equivalente()
+    test_risco_equivalente()
+    print("Avaliadores compilados equivalentes aos .pkl.")
@@ -0,0 +1,200 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import dataset_umidade
+from modelos import PASTA_VERSOES, apontar_versao, obter_modelo
+
+# Rótulos só do dataset_umidade.csv (coluna precisa_irrigar). As leituras de
+# T_LEITURA_SENSOR não entram: o banco não registra decisões nem acionamentos reais
+# da bomba, e rotulá-las pela regra de 40% só ensinaria a regra de volta ao modelo.
+
+# Estado do treino incremental (ao lado das versões publicadas)
+ARQUIVO_ESTADO = os.path.join(PASTA_VERSOES, "treino_irrigacao.npz")
+
+# A umidade é medida com uma casa decimal: 0,0 a 100,0 são 1001 valores possíveis.
+# Guardar quantas leituras de cada valor tiveram cada rótulo é o mesmo que guardar
+# todas as linhas já vistas, e o modelo é reajustado sobre essas contagens.
+VALORES = 1001
+
+# Relatórios das últimas execuções (mais recente no fim)
+RELATORIOS = deque(maxlen=50)
+
+
+def _contar(umidades, rotulos):
+    # Soma as linhas na tabela [rótulo, valor de umidade]
+    umidades = np.asarray(umidades, dtype=np.float64)
+    rotulos = np.asarray(rotulos)
+    validos = np.isfinite(umidades) & ((rotulos == 0) | (rotulos == 1))
+    indices = np.clip(np.rint(umidades[validos] * 10), 0, VALORES - 1).astype(np.int64)
+    return np.bincount(rotulos[validos].astype(np.int64) * VALORES + indices,
+                       minlength=2 * VALORES).reshape(2, VALORES)
+
+
+def carregar_estado(caminho=ARQUIVO_ESTADO):
+    if os.path.exists(caminho):
+        with np.load(caminho) as dados:
+            return {chave: dados[chave] for chave in dados.files}
+    return {
+        "versao": np.int64(0),
+        "linhas_csv": np.int64(0),          # linhas do dataset_umidade.csv já contadas
+        "contagens_csv": np.zeros((2, VALORES), dtype=np.int64),
+        "resumo_csv": np.zeros(0, dtype=np.uint8),  # sha256 dessas linhas
+        "coef": np.zeros(0),
+        "intercept": np.zeros(0),
+    }
+
+
+def salvar_estado(estado, caminho=ARQUIVO_ESTADO):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp.npz"
+    np.savez(temporario, **estado)
+    os.replace(temporario, caminho)
+
+
+def _resumo(colunas, linhas):
+    # sha256 das primeiras `linhas` (só as colunas usadas no treino)
+    h = hashlib.sha256()
+    for nome in ("umidade", "precisa_irrigar"):
+        h.update(np.ascontiguousarray(colunas[nome][:linhas]))
+    return np.frombuffer(h.digest(), dtype=np.uint8)
+
+
+def _novas_do_csv(estado, arquivo):
+    # Só as linhas além das já contadas. Se o trecho já contado mudou (arquivo
+    # reescrito, mesmo com o mesmo tamanho ou maior), recomeça do zero.
+    if not os.path.exists(arquivo):
+        return 0
+    colunas = dataset_umidade.colunas(["umidade", "precisa_irrigar"], caminho=arquivo)
+    total = len(colunas["umidade"])
+    inicio = int(estado["linhas_csv"])
+    if total < inicio or not np.array_equal(estado.get("resumo_csv", ()), _resumo(colunas, inicio)):
+        estado["contagens_csv"][:] = 0
+        inicio = 0
+    estado["contagens_csv"] += _contar(colunas["umidade"][inicio:], colunas["precisa_irrigar"][inicio:])
+    estado["linhas_csv"] = np.int64(total)
+    estado["resumo_csv"] = _resumo(colunas, total)
+    return total - inicio
+
+
+def _ajustar(estado, base):
+    # LogisticRegression com warm start: parte dos coeficientes da versão anterior
+    # e reajusta sobre as contagens (cada valor de umidade vira uma linha com peso)
+    import pandas as pd
+    from sklearn.linear_model import LogisticRegression
+
+    contagens = estado["contagens_csv"]
+    rotulos, indices = np.nonzero(contagens)
+    X = pd.DataFrame({"umidade": indices / 10})
+    pesos = contagens[rotulos, indices]
+
+    modelo = LogisticRegression(**dict(base.get_params() if base is not None else {}, warm_start=True))
+    if len(estado["coef"]):
+        modelo.classes_ = np.array([0, 1])
+        modelo.coef_ = estado["coef"].reshape(1, -1).copy()
+        modelo.intercept_ = estado["intercept"].copy()
+    modelo.fit(X, rotulos, sample_weight=pesos)
+    return modelo
+
+
+def publicar(modelo, versao):
+    # Grava a versão numerada e aponta o app para ela; o .pkl do repositório fica
+    # intacto. O RegistroModelos percebe o ponteiro novo e carrega a versão.
+    import joblib
+
+    os.makedirs(PASTA_VERSOES, exist_ok=True)
+    versionado = os.path.join(PASTA_VERSOES, f"modelo_irrigacao_v{versao:04d}.pkl")
+    temporario = f"{versionado}.{os.getpid()}.tmp"
+    joblib.dump(modelo, temporario)
+    os.replace(temporario, versionado)
+    apontar_versao("irrigacao", versionado)
+    return versionado
+
+
+_treino_lock = threading.Lock()
+
+
+def treinar(arquivo_csv=dataset_umidade.ARQUIVO, forcar=False):
+    # Uma rodada incremental; sem linhas novas (e sem `forcar`) nada é publicado
+    if not _treino_lock.acquire(blocking=False):
+        return {"status": "em andamento"}
+    try:
+        inicio = time.perf_counter()
+        estado = carregar_estado()
+        relatorio = {"inicio": time.strftime("%Y-%m-%d %H:%M:%S"), "versao": int(estado["versao"])}
+        relatorio["linhas_novas"] = _novas_do_csv(estado, arquivo_csv)
+
+        contagens = estado["contagens_csv"]
+        relatorio["linhas_total"] = int(contagens.sum())
+        if not relatorio["linhas_novas"] and not forcar:
+            relatorio["status"] = "sem dados novos"
+        elif not contagens.sum(axis=1).all():
+            relatorio["status"] = "precisa de exemplos das duas classes"
+        else:
+            try:
+                base = obter_modelo("irrigacao")
+            except Exception:
+                base = None
+            inicio_ajuste = time.perf_counter()
+            modelo = _ajustar(estado, base)
+            relatorio["ajuste_s"] = time.perf_counter() - inicio_ajuste
+
+            estado["versao"] = np.int64(estado["versao"] + 1)
+            estado["coef"] = modelo.coef_.ravel().copy()
+            estado["intercept"] = modelo.intercept_.copy()
+            relatorio["versao"] = int(estado["versao"])
+            relatorio["arquivo"] = publicar(modelo, relatorio["versao"])
+            relatorio["coef"] = float(modelo.coef_[0, 0])
+            relatorio["intercept"] = float(modelo.intercept_[0])
+            relatorio["limite_umidade"] = -relatorio["intercept"] / relatorio["coef"]
+            relatorio["status"] = "publicado"
+
+        # O estado só avança depois da publicação: uma falha no meio reprocessa as mesmas linhas
+        salvar_estado(estado)
+        relatorio["segundos"] = time.perf_counter() - inicio
+        relatorio["linhas_por_segundo"] = relatorio["linhas_novas"] / relatorio["segundos"]
+        RELATORIOS.append(relatorio)
+        return relatorio
+    finally:
+        _treino_lock.release()
+
+
+def treinar_em_segundo_plano(intervalo=None, parar=None):
+    # Uma rodada (intervalo=None) ou uma a cada `intervalo` segundos até o Event `parar`
+    parar = parar or threading.Event()
+
+    def executar():
+        while True:
+            try:
+                treinar()
+            except Exception as e:
+                RELATORIOS.append({"inicio": time.strftime("%Y-%m-%d %H:%M:%S"), "status": f"erro: {e}"})
+            if intervalo is None or parar.wait(intervalo):
+                break
+
+    thread = threading.Thread(target=executar, name="treino-irrigacao", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retreino incremental do modelo de irrigação.")
+    parser.add_argument("--intervalo", type=float, help="repete a cada N segundos (padrão: uma rodada)")
+    parser.add_argument("--forcar", action="store_true", help="publica mesmo sem linhas novas")
+    args = parser.parse_args()
+
+    while True:
+        relatorio = treinar(forcar=args.forcar)
+        print(", ".join(f"{chave}={valor}" for chave, valor in relatorio.items()))
+        if args.intervalo is None:
+            break
+        time.sleep(args.intervalo)
+
+
+if __name__ == "__main__":
+    main()
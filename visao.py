@@ -0,0 +1,170 @@
+import hashlib
+import io
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Diagnósticos possíveis para folhas de batata (mesma ordem das saídas do modelo)
+CLASSES = [
+    {"label": "SAUDÁVEL (Healthy)", "tipo": "ok", "msg": "Planta sem sinais de patógenos."},
+    {"label": "PINTA PRETA (Early Blight)", "tipo": "doenca", "msg": "Fungo *Alternaria solani* detectado. Requer fungicida."},
+    {"label": "REQUEIMA (Late Blight)", "tipo": "doenca", "msg": "Doença grave (*Phytophthora infestans*). Ação imediata necessária."},
+]
+
+# Imagens por chamada ao modelo
+TAMANHO_LOTE = 16
+
+# Threads para decodificar/redimensionar (o Pillow libera o GIL nessas etapas)
+THREADS_DECODIFICACAO = 4
+
+# Diagnósticos guardados pelo hash do conteúdo da imagem
+TAMANHO_CACHE = 4096
+
+
+class ModeloCoresFolha:
+    # Modelo local e leve: proporção de lesões marrons (secas) e escuras/acinzentadas
+    # (encharcadas) na área da folha, seguida de uma camada linear + softmax.
+    # Serve de referência até existir um modelo treinado.
+    descricao = "heurística de cores (proporção de lesões marrons e escuras na folha + camada linear)"
+    tamanho = (128, 128)
+
+    # Linhas: classes; colunas: marrom, escuro, viés (~7% de lesão já sai de "saudável")
+    PESOS = np.array([
+        [-30.0, -30.0, 3.0],
+        [30.0, 5.0, -1.0],
+        [5.0, 30.0, -1.0],
+    ], dtype=np.float32)
+
+    def classificar(self, lote):
+        # lote: float32 [N, H, W, 3] em 0..1 -> probabilidades [N, len(CLASSES)]
+        r, g, b = lote[..., 0], lote[..., 1], lote[..., 2]
+        brilho = lote.max(axis=-1)
+        folha = lote.min(axis=-1) < 0.85  # ignora fundo branco/estourado
+        n = np.maximum(folha.sum(axis=(1, 2)), 1)
+
+        marrom = ((r >= g) & (g > b) & (brilho >= 0.25) & folha).sum(axis=(1, 2)) / n
+        escuro = ((brilho < 0.25) & folha).sum(axis=(1, 2)) / n
+
+        atributos = np.stack([marrom, escuro, np.ones_like(marrom)], axis=1).astype(np.float32)
+        logits = atributos @ self.PESOS.T
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+# Backends de inferência disponíveis (nome -> fábrica). Outro modelo pode ser
+# registrado aqui, desde que tenha `tamanho` e `classificar(lote)` (e, para a
+# página, uma `descricao` do que roda de fato).
+BACKENDS = {"cores": ModeloCoresFolha}
+
+
+def registrar_backend(nome, fabrica):
+    BACKENDS[nome] = fabrica
+
+
+# Resultado para arquivos que não abrem como imagem
+INVALIDA = {"label": "IMAGEM INVÁLIDA", "tipo": "erro", "msg": "Não foi possível ler o arquivo.", "conf": 0.0}
+
+
+def _decodificar(conteudo, tamanho):
+    from PIL import Image
+
+    inicio = time.perf_counter()
+    try:
+        with Image.open(io.BytesIO(conteudo)) as imagem:
+            imagem.draft("RGB", tamanho)  # JPEG: decodifica já reduzido, bem mais rápido
+            matriz = np.asarray(imagem.convert("RGB").resize(tamanho), dtype=np.float32) / 255.0
+    except Exception:
+        matriz = None
+    return matriz, time.perf_counter() - inicio
+
+
+class PipelineDiagnostico:
+    def __init__(self, backend="cores", tamanho_lote=TAMANHO_LOTE, threads=THREADS_DECODIFICACAO):
+        self.backend = backend
+        self.modelo = BACKENDS[backend]()
+        self.descricao = getattr(self.modelo, "descricao", type(self.modelo).__name__)
+        self.tamanho_lote = tamanho_lote
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="decodificacao")
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _do_cache(self, chave):
+        with self._cache_lock:
+            resultado = self._cache.get(chave)
+            if resultado is not None:
+                self._cache.move_to_end(chave)
+            return resultado
+
+    def _guardar(self, chave, resultado):
+        with self._cache_lock:
+            self._cache[chave] = resultado
+            if len(self._cache) > TAMANHO_CACHE:
+                self._cache.popitem(last=False)
+
+    def diagnosticar(self, imagens):
+        # imagens: lista de (nome, bytes). Retorna (resultados, estatísticas).
+        inicio = time.perf_counter()
+        resultados = [None] * len(imagens)
+
+        # 1. Cache por conteúdo: a mesma foto nunca é reprocessada
+        pendentes, repetidas = {}, []
+        for i, (nome, conteudo) in enumerate(imagens):
+            chave = hashlib.sha256(conteudo).hexdigest()
+            em_cache = self._do_cache(chave)
+            if em_cache is not None:
+                resultados[i] = dict(em_cache, arquivo=nome, latencia_ms=0.0, cache=True)
+            elif chave in pendentes:
+                repetidas.append((i, nome, chave))  # mesma foto duas vezes no mesmo envio
+            else:
+                pendentes[chave] = (i, nome, conteudo)
+
+        # 2. Decodificação em paralelo e inferência em micro-lotes
+        itens = list(pendentes.items())
+        for p in range(0, len(itens), self.tamanho_lote):
+            lote = itens[p:p + self.tamanho_lote]
+            decodificadas = list(self._executor.map(lambda item: _decodificar(item[1][2], self.modelo.tamanho), lote))
+            validas = [matriz for matriz, _ in decodificadas if matriz is not None]
+
+            t = time.perf_counter()
+            probabilidades = iter(self.modelo.classificar(np.stack(validas)) if validas else [])
+            inferencia_por_imagem = (time.perf_counter() - t) / max(len(validas), 1)
+
+            for (chave, (i, nome, _)), (matriz, tempo_decodificacao) in zip(lote, decodificadas):
+                if matriz is None:
+                    resultados[i] = dict(INVALIDA, arquivo=nome, latencia_ms=tempo_decodificacao * 1000, cache=False)
+                    continue
+                proba = next(probabilidades)
+                classe = int(np.argmax(proba))
+                diagnostico = dict(CLASSES[classe], conf=float(proba[classe]))
+                self._guardar(chave, diagnostico)
+                latencia = (tempo_decodificacao + inferencia_por_imagem) * 1000
+                resultados[i] = dict(diagnostico, arquivo=nome, latencia_ms=latencia, cache=False)
+
+        for i, nome, chave in repetidas:
+            resultados[i] = dict(resultados[pendentes[chave][0]], arquivo=nome, latencia_ms=0.0, cache=True)
+
+        decorrido = time.perf_counter() - inicio
+        estatisticas = {
+            "imagens": len(imagens),
+            "do_cache": len(imagens) - len(pendentes),
+            "segundos": decorrido,
+            "imagens_por_segundo": len(imagens) / decorrido if decorrido > 0 else 0.0,
+        }
+        return resultados, estatisticas
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def obter_pipeline():
+    # Um pipeline por processo: o cache e as threads são compartilhados entre sessões
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = PipelineDiagnostico()
+        return _pipeline